@@ -162,15 +162,22 @@ class SpongeApplication:
         self.metrics.start_server_async()
         logger.info("Prometheus metrics available at http://localhost:9090")
 
-        # Continuous monitoring loop
+        # Continuous monitoring loop. Grant revocation and metrics run at
+        # least every cycle_interval seconds; the self-healing sweep follows
+        # its own adaptive schedule (see SelfHealingSystem.next_check_interval)
+        cycle_interval = 60
+        next_heal_at = 0.0
         try:
             while True:
                 logger.info("Running monitoring cycle...")
 
-                # Check SLOs and auto-heal
-                actions = self.self_healing.monitor_and_heal()
-                if actions:
-                    logger.info(f"Took {len(actions)} self-healing actions")
+                # Check SLOs and auto-heal when the sweep is due
+                now = time.monotonic()
+                if now >= next_heal_at:
+                    actions = self.self_healing.monitor_and_heal()
+                    if actions:
+                        logger.info(f"Took {len(actions)} self-healing actions")
+                    next_heal_at = now + (self.self_healing.next_check_interval or cycle_interval)
 
                 # Revoke expired access grants
                 revoked = self.jit_access.revoke_expired_grants()
@@ -184,8 +191,8 @@ class SpongeApplication:
                 disk = {"/": psutil.disk_usage("/").percent}
                 self.metrics.update_system_metrics(cpu, memory, disk)
 
-                # Sleep for monitoring interval
-                time.sleep(60)  # Check every minute
+                # Sleep until the next cycle, or sooner if a sweep is due first
+                time.sleep(max(0.0, min(cycle_interval, next_heal_at - time.monotonic())))
 
         except KeyboardInterrupt:
             logger.info("Monitoring stopped by user")
@@ -5,8 +5,11 @@ Extends the original storage with advanced features for user selection and manag
 """
 
 import pandas as pd
+import threading
+from collections import OrderedDict
 from datetime import datetime
-from typing import Dict, List, Optional, Any
+from types import MappingProxyType
+from typing import Dict, List, Optional, Any, Mapping, Tuple
 from pathlib import Path
 import logging
 
@@ -15,6 +18,18 @@ from .filters import KnowledgeBaseFilter
 
 logger = logging.getLogger(__name__)
 
+# Memoized search_records() results per knowledge base instance
+SEARCH_CACHE_SIZE = 1024
+
+
+def _freeze(value: Any) -> Any:
+    """Turn a filter config into a hashable cache key"""
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple, set)):
+        return tuple(_freeze(v) for v in value)
+    return value
+
 
 class EnhancedKnowledgeBase(KnowledgeBase):
     """Enhanced knowledge base with filtering and selection"""
@@ -30,6 +45,10 @@ class EnhancedKnowledgeBase(KnowledgeBase):
         self.filter = KnowledgeBaseFilter()
         self.user_selections = []
 
+        # (file mtime, frozen filter config) -> records, least recently used first
+        self._search_cache = OrderedDict()
+        self._search_cache_lock = threading.Lock()
+
     def search(self, filter_config: Dict[str, Any]) -> pd.DataFrame:
         """
         Search knowledge base with filters
@@ -43,6 +62,42 @@ class EnhancedKnowledgeBase(KnowledgeBase):
         df = self.get_all()
         return self.filter.apply_filters(df, filter_config)
 
+    def search_records(self, filter_config: Dict[str, Any]) -> Tuple[Mapping[str, Any], ...]:
+        """
+        Search knowledge base, memoizing results until the file changes
+
+        Args:
+            filter_config: Filter configuration dictionary
+
+        Returns:
+            Read-only matching rows
+        """
+        try:
+            mtime = self.file_path.stat().st_mtime_ns
+        except OSError:
+            mtime = None
+        key = (mtime, _freeze(filter_config))
+
+        with self._search_cache_lock:
+            records = self._search_cache.get(key)
+            if records is not None:
+                self._search_cache.move_to_end(key)
+                return records
+
+        records = tuple(MappingProxyType(row) for row in self.search(filter_config).to_dict('records'))
+
+        with self._search_cache_lock:
+            self._search_cache[key] = records
+            if len(self._search_cache) > SEARCH_CACHE_SIZE:
+                self._search_cache.popitem(last=False)
+
+        return records
+
+    def clear_search_cache(self) -> None:
+        """Drop memoized search results"""
+        with self._search_cache_lock:
+            self._search_cache.clear()
+
     def add_user_selection(self, error_pattern: str, selected: bool = True,
                           notes: Optional[str] = None) -> None:
         """
@@ -5,36 +5,270 @@ Integrates with threat intelligence feeds and reputation services
 to enrich security incidents with threat data.
 """
 
+import ipaddress
 import logging
-import requests
+import math
+import mmap
+import os
 import sqlite3
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
-from dataclasses import dataclass, asdict
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Any, Tuple
+from dataclasses import dataclass
 from pathlib import Path
-import hashlib
 import json
 
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
 logger = logging.getLogger(__name__)
 
+# PRAGMA user_version of the current threat intelligence schema
+SCHEMA_VERSION = 1
+
+# Number of feed lines written per executemany() transaction
+FEED_BATCH_SIZE = 10_000
+
+# Minimum sizing for the negative-lookup Bloom filter over threat_indicators
+BLOOM_MIN_CAPACITY = 1_000_000
+BLOOM_ERROR_RATE = 0.001
+
+# Values per IN (...) query in bulk lookups (SQLite's default variable limit is 999)
+BULK_LOOKUP_CHUNK = 900
+
+# Lifetime of cached IP reputation rows (expires_at is stored as epoch seconds)
+IP_REPUTATION_TTL_SECONDS = 24 * 3600
+FILE_HASH_TTL_SECONDS = 24 * 3600
+
+# How long past expiry a cached reputation may still be served while it is
+# refreshed in the background, and the size of that refresh pool
+IP_REPUTATION_STALE_SECONDS = 6 * 3600
+REFRESH_WORKERS = 8
+
+# (tokens per second, burst capacity) for the free API tiers:
+# AbuseIPDB 1000 checks/day, VirusTotal public API 4 requests/minute
+ABUSEIPDB_RATE_LIMIT = (1000 / 86400, 25)
+VIRUSTOTAL_RATE_LIMIT = (4 / 60, 4)
+
+# SQL statements are kept as module constants so the text is byte-identical on
+# every call and the long-lived connection's statement cache can reuse them.
+SQL_UPSERT_INDICATOR = """
+    INSERT INTO threat_indicators
+    (indicator_type, value, threat_type, severity, confidence,
+     sources, metadata, first_seen, last_seen)
+    VALUES (?, ?, ?, ?, ?, json_array(?), ?, ?, ?)
+    ON CONFLICT(indicator_type, value) DO UPDATE SET
+        sources = CASE
+            WHEN EXISTS (SELECT 1 FROM json_each(threat_indicators.sources)
+                         WHERE json_each.value = json_extract(excluded.sources, '$[0]'))
+            THEN threat_indicators.sources
+            ELSE json_insert(threat_indicators.sources, '$[#]',
+                             json_extract(excluded.sources, '$[0]'))
+        END,
+        metadata = json_patch(threat_indicators.metadata, excluded.metadata),
+        last_seen = excluded.last_seen,
+        threat_type = excluded.threat_type,
+        severity = excluded.severity,
+        confidence = excluded.confidence
+"""
+
+SQL_GET_INDICATOR = """
+    SELECT indicator_type, value, threat_type, severity, confidence,
+           first_seen, last_seen, sources, metadata
+    FROM threat_indicators
+    WHERE indicator_type = ? AND value = ?
+"""
+
+SQL_GET_CACHED_IP = """
+    SELECT ip, reputation_score, is_malicious, abuse_confidence,
+           country, asn, usage_type, reports, last_reported, categories,
+           expires_at
+    FROM ip_reputation_cache
+    WHERE ip = ? AND expires_at > ?
+"""
+
+SQL_INSERT_CACHE = """
+    INSERT OR REPLACE INTO ip_reputation_cache
+    (ip, reputation_score, is_malicious, abuse_confidence, country,
+     asn, usage_type, reports, last_reported, categories, expires_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+SQL_GET_CACHED_HASH = """
+    SELECT result FROM file_hash_cache
+    WHERE hash = ? AND expires_at > ?
+"""
+
+SQL_INSERT_HASH_CACHE = """
+    INSERT OR REPLACE INTO file_hash_cache (hash, hash_type, result, expires_at)
+    VALUES (?, ?, ?, ?)
+"""
+
+# All get_statistics() figures in one round-trip; grouped counts come back
+# as JSON objects
+SQL_STATISTICS = """
+    SELECT
+        (SELECT json_group_object(indicator_type, c) FROM
+            (SELECT indicator_type, COUNT(*) AS c FROM threat_indicators
+             GROUP BY indicator_type)),
+        (SELECT json_group_object(severity, c) FROM
+            (SELECT severity, COUNT(*) AS c FROM threat_indicators
+             GROUP BY severity)),
+        (SELECT COUNT(*) FROM ip_reputation_cache WHERE expires_at > ?),
+        (SELECT COUNT(*) FROM threat_feeds WHERE enabled = 1),
+        (SELECT SUM(indicator_count) FROM threat_feeds WHERE enabled = 1)
+"""
+
+SQL_UPSERT_FEED = """
+    INSERT OR REPLACE INTO threat_feeds
+    (feed_name, feed_url, feed_type, last_updated, indicator_count)
+    VALUES (?, ?, ?, CURRENT_TIMESTAMP, ?)
+"""
+
 
-@dataclass
+class TokenBucket:
+    """
+    Thread-safe token bucket rate limiter
+
+    acquire() blocks until a token is available. Tokens are reserved under
+    the lock and the wait happens outside it, so concurrent callers queue in
+    order without holding the lock while sleeping.
+    """
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self):
+        """Take one token, sleeping until it is available"""
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0
+
+        if wait > 0:
+            time.sleep(wait)
+
+    def drain(self, retry_after: float):
+        """Empty the bucket so no token is available for retry_after seconds"""
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens = min(self._tokens, -retry_after * self.rate)
+
+
+def _retry_after_seconds(response, default: int = 60) -> int:
+    """Parse a Retry-After header given in seconds, falling back to default"""
+    try:
+        return int(response.headers.get('Retry-After', default))
+    except (TypeError, ValueError):
+        return default
+
+
+class _BloomFilter:
+    """
+    Fixed-size in-memory Bloom filter
+
+    Used as a negative-lookup fast path in front of threat_indicators. Adding
+    more than `capacity` keys only raises the false-positive rate; membership
+    tests never return a false negative.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = BLOOM_ERROR_RATE):
+        self._size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self._hashes = max(1, round(self._size / capacity * math.log(2)))
+        self._bits = bytearray((self._size + 7) // 8)
+
+    def _positions(self, key: str):
+        # Double hashing: k probe positions derived from two base hashes
+        h1 = hash(key)
+        h2 = hash((key, self._hashes)) | 1
+        return ((h1 + i * h2) % self._size for i in range(self._hashes))
+
+    def add(self, key: str):
+        for pos in self._positions(key):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, key: str) -> bool:
+        return all(self._bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+
+def _ipv4_to_int(value: str) -> Optional[int]:
+    """Return the integer form of an IPv4 address, or None for anything else"""
+    try:
+        return int(ipaddress.IPv4Address(value))
+    except ValueError:
+        return None
+
+
+def _json_dumps(obj: Any) -> str:
+    """Serialize to a JSON string, using orjson when available"""
+    if HAS_ORJSON:
+        return orjson.dumps(obj).decode()
+    return json.dumps(obj)
+
+
+def _json_loads(data: str) -> Any:
+    """Deserialize a JSON string, using orjson when available"""
+    if HAS_ORJSON:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _is_valid_ip(value: str) -> bool:
+    """Return True if value parses as an IPv4/IPv6 address"""
+    try:
+        ipaddress.ip_address(value)
+        return True
+    except ValueError:
+        return False
+
+
+@dataclass(frozen=True)
 class ThreatIndicator:
     """Threat indicator (IOC)"""
+    # Explicit __slots__ rather than dataclass(slots=True), which needs 3.10+
+    __slots__ = ('indicator_type', 'value', 'threat_type', 'severity', 'confidence',
+                 'first_seen_ts', 'last_seen_ts', 'sources', 'metadata')
+
     indicator_type: str  # 'ip', 'domain', 'hash', 'email', 'url'
     value: str
     threat_type: str  # 'malware', 'phishing', 'c2', 'scanner', 'spam'
     severity: str  # 'low', 'medium', 'high', 'critical'
     confidence: int  # 0-100
-    first_seen: datetime
-    last_seen: datetime
+    first_seen_ts: int  # UNIX epoch seconds (UTC)
+    last_seen_ts: int
     sources: List[str]
     metadata: Dict[str, Any]
 
+    @property
+    def first_seen(self) -> datetime:
+        return datetime.fromtimestamp(self.first_seen_ts, tz=timezone.utc)
+
+    @property
+    def last_seen(self) -> datetime:
+        return datetime.fromtimestamp(self.last_seen_ts, tz=timezone.utc)
 
-@dataclass
+
+@dataclass(frozen=True)
 class IPReputation:
     """IP reputation data"""
+    __slots__ = ('ip', 'reputation_score', 'is_malicious', 'abuse_confidence', 'country',
+                 'asn', 'usage_type', 'reports', 'last_reported', 'categories')
+
     ip: str
     reputation_score: int  # 0-100, lower is worse
     is_malicious: bool
@@ -63,11 +297,45 @@ class ThreatIntelligence:
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
         self.abuseipdb_api_key = abuseipdb_api_key
         self.virustotal_api_key = virustotal_api_key
+
+        # One long-lived connection shared by all helpers; SQLite's page cache
+        # and statement cache stay warm instead of being rebuilt per call.
+        # Writes run in `with self._conn` blocks, which commit or roll back.
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+
+        # Client-side quotas so bursts queue locally instead of earning 429s.
+        # VirusTotal hash and domain lookups share one API key quota.
+        self._abuseipdb_limiter = TokenBucket(*ABUSEIPDB_RATE_LIMIT)
+        self._virustotal_limiter = TokenBucket(*VIRUSTOTAL_RATE_LIMIT)
+
+        # Background refreshes for stale-while-revalidate IP lookups
+        self._refresh_executor = ThreadPoolExecutor(max_workers=REFRESH_WORKERS)
+        self._refreshing = set()
+
+        # Sorted IPv4 snapshot (see build_ip_index); IPs stored since the
+        # snapshot are tracked in _ip_index_pending until the next rebuild.
+        self.ip_index_path = self.db_path.with_name(f"{self.db_path.stem}_ip_index.bin")
+        self._ip_index = None
+        self._ip_index_mmap = None
+        self._ip_index_pending = set()
+
         self._init_database()
+        self._load_indicator_filter()
+        self._load_ip_index(rebuild_if_stale=True)
+
+    def close(self):
+        """Stop background refreshes and close the database connection"""
+        self._refresh_executor.shutdown(wait=True)
+        with self._lock:
+            self._release_ip_index()
+            self._conn.close()
 
     def _init_database(self):
         """Initialize threat intelligence database"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._lock, self._conn as conn:
             conn.execute("""
                 CREATE TABLE IF NOT EXISTS threat_indicators (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -76,14 +344,21 @@ class ThreatIntelligence:
                     threat_type TEXT NOT NULL,
                     severity TEXT NOT NULL,
                     confidence INTEGER NOT NULL,
-                    first_seen TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    last_seen TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    first_seen INTEGER NOT NULL,
+                    last_seen INTEGER NOT NULL,
                     sources TEXT NOT NULL,
                     metadata TEXT NOT NULL,
                     UNIQUE(indicator_type, value)
                 )
             """)
 
+            # expires_at used to be a TIMESTAMP string; the cache is
+            # disposable, so rebuild it rather than converting old rows.
+            columns = {row[1]: row[2] for row in
+                       conn.execute("PRAGMA table_info(ip_reputation_cache)")}
+            if columns.get('expires_at', 'INTEGER') != 'INTEGER':
+                conn.execute("DROP TABLE ip_reputation_cache")
+
             conn.execute("""
                 CREATE TABLE IF NOT EXISTS ip_reputation_cache (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -95,10 +370,34 @@ class ThreatIntelligence:
                     asn TEXT,
                     usage_type TEXT,
                     reports INTEGER NOT NULL,
-                    last_reported TIMESTAMP,
+                    last_reported INTEGER,
                     categories TEXT,
                     cached_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    expires_at TIMESTAMP NOT NULL
+                    expires_at INTEGER NOT NULL
+                )
+            """)
+
+            conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_iprep_ip_expires
+                ON ip_reputation_cache(ip, expires_at)
+            """)
+
+            # Hashes are stored as raw digest bytes (32B for SHA-256) rather
+            # than hex text, halving the key and index size.
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS file_hash_cache (
+                    hash BLOB PRIMARY KEY,
+                    hash_type TEXT NOT NULL,
+                    result TEXT NOT NULL,
+                    expires_at INTEGER NOT NULL
+                ) WITHOUT ROWID
+            """)
+
+            # Highest threat_indicators id included in the on-disk IP index
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS ip_index_state (
+                    id INTEGER PRIMARY KEY CHECK (id = 1),
+                    max_indicator_id INTEGER NOT NULL
                 )
             """)
 
@@ -114,7 +413,18 @@ class ThreatIntelligence:
                 )
             """)
 
-            conn.commit()
+            # Schema v1: timestamps are INTEGER epoch seconds instead of
+            # TIMESTAMP text. Convert stored indicators in place; cached
+            # reputations are disposable and simply dropped.
+            if conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+                conn.execute("""
+                    UPDATE threat_indicators
+                    SET first_seen = CAST(strftime('%s', first_seen) AS INTEGER),
+                        last_seen = CAST(strftime('%s', last_seen) AS INTEGER)
+                    WHERE typeof(first_seen) = 'text' OR typeof(last_seen) = 'text'
+                """)
+                conn.execute("DELETE FROM ip_reputation_cache")
+                conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
 
     def check_ip_reputation(self, ip: str, use_cache: bool = True) -> Optional[IPReputation]:
         """
@@ -127,11 +437,21 @@ class ThreatIntelligence:
         Returns:
             IPReputation object or None
         """
-        # Check cache first
+        # Check cache first. With an API key, recently expired entries are
+        # served stale while a background refresh fetches a fresh copy.
         if use_cache:
-            cached = self._get_cached_ip_reputation(ip)
-            if cached:
-                logger.info(f"Using cached reputation for IP: {ip}")
+            max_stale = IP_REPUTATION_STALE_SECONDS if self.abuseipdb_api_key else 0
+            entry = self._get_cached_ip_entry(ip, max_stale_seconds=max_stale)
+            if entry:
+                cached, expires_at = entry
+                if expires_at <= time.time():
+                    with self._lock:
+                        if ip not in self._refreshing:
+                            self._refreshing.add(ip)
+                            self._refresh_executor.submit(self._refresh_ip_reputation, ip)
+                    logger.info(f"Using stale cached reputation for IP: {ip} (refreshing)")
+                else:
+                    logger.info(f"Using cached reputation for IP: {ip}")
                 return cached
 
         # Check AbuseIPDB if API key available
@@ -152,6 +472,8 @@ class ThreatIntelligence:
                 'Accept': 'application/json'
             }
 
+            import requests  # deferred: DB-only callers never pay its import cost
+            self._abuseipdb_limiter.acquire()
             response = requests.get(
                 'https://api.abuseipdb.com/api/v2/check',
                 headers=headers,
@@ -178,6 +500,12 @@ class ThreatIntelligence:
                 logger.info(f"AbuseIPDB reputation for {ip}: score={reputation.reputation_score}")
                 return reputation
 
+            elif response.status_code == 429:
+                retry_after = _retry_after_seconds(response)
+                self._abuseipdb_limiter.drain(retry_after)
+                logger.warning(f"AbuseIPDB rate limit hit, backing off {retry_after}s")
+                return None
+
             else:
                 logger.error(f"AbuseIPDB API error: {response.status_code}")
                 return None
@@ -186,17 +514,25 @@ class ThreatIntelligence:
             logger.error(f"Error checking AbuseIPDB: {e}")
             return None
 
-    def check_file_hash(self, file_hash: str, hash_type: str = 'sha256') -> Optional[Dict[str, Any]]:
+    def check_file_hash(self, file_hash: str, hash_type: str = 'sha256',
+                        use_cache: bool = True) -> Optional[Dict[str, Any]]:
         """
         Check file hash against VirusTotal
 
         Args:
             file_hash: File hash to check
             hash_type: Hash type (md5, sha1, sha256)
+            use_cache: Whether to use cached results (24h TTL)
 
         Returns:
             Dictionary with scan results or None
         """
+        if use_cache:
+            cached = self._get_cached_file_hash(file_hash)
+            if cached:
+                logger.info(f"Using cached VirusTotal result for {file_hash}")
+                return cached
+
         if not self.virustotal_api_key:
             logger.warning("VirusTotal API key not configured")
             return None
@@ -204,6 +540,8 @@ class ThreatIntelligence:
         try:
             headers = {'x-apikey': self.virustotal_api_key}
 
+            import requests
+            self._virustotal_limiter.acquire()
             response = requests.get(
                 f'https://www.virustotal.com/api/v3/files/{file_hash}',
                 headers=headers,
@@ -228,8 +566,15 @@ class ThreatIntelligence:
                 }
 
                 logger.info(f"VirusTotal scan for {file_hash}: {result['detection_rate']} detections")
+                self._cache_file_hash(file_hash, hash_type, result)
                 return result
 
+            elif response.status_code == 429:
+                retry_after = _retry_after_seconds(response)
+                self._virustotal_limiter.drain(retry_after)
+                logger.warning(f"VirusTotal rate limit hit, backing off {retry_after}s")
+                return None
+
             else:
                 logger.error(f"VirusTotal API error: {response.status_code}")
                 return None
@@ -238,6 +583,39 @@ class ThreatIntelligence:
             logger.error(f"Error checking VirusTotal: {e}")
             return None
 
+    def _get_cached_file_hash(self, file_hash: str) -> Optional[Dict[str, Any]]:
+        """Get cached VirusTotal result for a hash if not expired"""
+        try:
+            digest = bytes.fromhex(file_hash)
+        except ValueError:
+            return None
+
+        try:
+            with self._lock:
+                row = self._conn.execute(SQL_GET_CACHED_HASH,
+                                         (digest, int(time.time()))).fetchone()
+            return _json_loads(row[0]) if row else None
+
+        except Exception as e:
+            logger.error(f"Failed to get cached hash result: {e}")
+            return None
+
+    def _cache_file_hash(self, file_hash: str, hash_type: str, result: Dict[str, Any]):
+        """Cache VirusTotal hash result keyed by the binary digest"""
+        try:
+            digest = bytes.fromhex(file_hash)
+        except ValueError:
+            return
+
+        try:
+            with self._lock, self._conn as conn:
+                conn.execute(SQL_INSERT_HASH_CACHE, (
+                    digest, hash_type, _json_dumps(result),
+                    int(time.time()) + FILE_HASH_TTL_SECONDS))
+
+        except Exception as e:
+            logger.error(f"Failed to cache hash result: {e}")
+
     def check_domain_reputation(self, domain: str) -> Optional[Dict[str, Any]]:
         """
         Check domain reputation
@@ -254,6 +632,8 @@ class ThreatIntelligence:
         try:
             headers = {'x-apikey': self.virustotal_api_key}
 
+            import requests
+            self._virustotal_limiter.acquire()
             response = requests.get(
                 f'https://www.virustotal.com/api/v3/domains/{domain}',
                 headers=headers,
@@ -276,6 +656,12 @@ class ThreatIntelligence:
 
                 return result
 
+            elif response.status_code == 429:
+                retry_after = _retry_after_seconds(response)
+                self._virustotal_limiter.drain(retry_after)
+                logger.warning(f"VirusTotal rate limit hit, backing off {retry_after}s")
+                return None
+
             else:
                 logger.error(f"VirusTotal API error: {response.status_code}")
                 return None
@@ -308,44 +694,8 @@ class ThreatIntelligence:
             True if added successfully
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                # Check if indicator exists
-                cursor = conn.execute("""
-                    SELECT sources, metadata FROM threat_indicators
-                    WHERE indicator_type = ? AND value = ?
-                """, (indicator_type, value))
-
-                existing = cursor.fetchone()
-
-                if existing:
-                    # Update existing indicator
-                    existing_sources = json.loads(existing[0])
-                    if source not in existing_sources:
-                        existing_sources.append(source)
-
-                    existing_metadata = json.loads(existing[1])
-                    if metadata:
-                        existing_metadata.update(metadata)
-
-                    conn.execute("""
-                        UPDATE threat_indicators
-                        SET sources = ?, metadata = ?, last_seen = CURRENT_TIMESTAMP,
-                            threat_type = ?, severity = ?, confidence = ?
-                        WHERE indicator_type = ? AND value = ?
-                    """, (json.dumps(existing_sources), json.dumps(existing_metadata),
-                          threat_type, severity, confidence, indicator_type, value))
-
-                else:
-                    # Insert new indicator
-                    conn.execute("""
-                        INSERT INTO threat_indicators
-                        (indicator_type, value, threat_type, severity, confidence,
-                         sources, metadata)
-                        VALUES (?, ?, ?, ?, ?, ?, ?)
-                    """, (indicator_type, value, threat_type, severity, confidence,
-                          json.dumps([source]), json.dumps(metadata or {})))
-
-                conn.commit()
+            self._upsert_indicators([(indicator_type, value, threat_type, severity,
+                                      confidence, source, _json_dumps(metadata or {}))])
 
             logger.info(f"Added threat indicator: {indicator_type}={value}")
             return True
@@ -354,16 +704,170 @@ class ThreatIntelligence:
             logger.error(f"Failed to add threat indicator: {e}")
             return False
 
+    def _upsert_indicators(self, rows: List[tuple]):
+        """
+        Insert or merge threat indicators in a single transaction
+
+        Each row is (indicator_type, value, threat_type, severity, confidence,
+        source, metadata_json). A single atomic UPSERT refreshes last_seen and
+        merges sources/metadata inside SQLite (JSON1), so there is no
+        read-modify-write race between concurrent writers.
+        """
+        now = int(time.time())
+        with self._lock, self._conn as conn:
+            conn.executemany(SQL_UPSERT_INDICATOR, (row + (now, now) for row in rows))
+
+            for row in rows:
+                self._indicator_filter.add(f"{row[0]}:{row[1]}")
+                if row[0] == 'ip' and self._ip_index is not None:
+                    ip_int = _ipv4_to_int(row[1])
+                    if ip_int is not None:
+                        self._ip_index_pending.add(ip_int)
+
+    def _load_indicator_filter(self):
+        """Populate the in-memory Bloom filter from stored indicators"""
+        with self._lock:
+            count = self._conn.execute("SELECT COUNT(*) FROM threat_indicators").fetchone()[0]
+            self._indicator_filter = _BloomFilter(capacity=max(BLOOM_MIN_CAPACITY, count * 2))
+            self._indicator_max_id = 0
+            self._data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+            self._add_indicators_since(self._indicator_max_id)
+
+    def _add_indicators_since(self, max_id: int):
+        """
+        Add indicators stored with id > max_id to the Bloom filter and, for
+        IPv4 addresses, to the IP index's pending set (caller holds _lock)
+        """
+        cursor = self._conn.execute(
+            "SELECT id, indicator_type, value FROM threat_indicators WHERE id > ?",
+            (max_id,))
+        for row_id, indicator_type, value in cursor:
+            self._indicator_filter.add(f"{indicator_type}:{value}")
+            if indicator_type == 'ip' and self._ip_index is not None:
+                ip_int = _ipv4_to_int(value)
+                if ip_int is not None:
+                    self._ip_index_pending.add(ip_int)
+            max_id = max(max_id, row_id)
+        self._indicator_max_id = max_id
+
+    def _sync_indicators(self):
+        """
+        Catch up with indicators committed by other connections
+
+        Other ThreatIntelligence instances or processes may share the
+        database; without this their new indicators would be hard Bloom
+        filter negatives. PRAGMA data_version only changes when another
+        connection commits, so the common case costs no table access. Ids
+        are AUTOINCREMENT, so new indicators are exactly those past the last
+        id seen.
+        """
+        with self._lock:
+            data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+            if data_version != self._data_version:
+                self._data_version = data_version
+                self._add_indicators_since(self._indicator_max_id)
+
+    def build_ip_index(self) -> int:
+        """
+        Snapshot all IPv4 indicators into a sorted on-disk uint32 array
+
+        The file is memory-mapped and binary-searched by the local feed
+        lookup, so negative IP checks need neither SQLite nor a large
+        in-memory structure. Rebuilt after each IP feed import; can also be
+        run periodically.
+
+        Returns:
+            Number of addresses in the index
+        """
+        with self._lock:
+            max_id = self._conn.execute(
+                "SELECT COALESCE(MAX(id), 0) FROM threat_indicators").fetchone()[0]
+            cursor = self._conn.execute(
+                "SELECT value FROM threat_indicators WHERE indicator_type = 'ip' AND id <= ?",
+                (max_id,))
+            addresses = sorted(ip for ip in (_ipv4_to_int(v) for (v,) in cursor)
+                               if ip is not None)
+
+            tmp_path = self.ip_index_path.with_suffix('.tmp')
+            with open(tmp_path, 'wb') as f:
+                array('I', addresses).tofile(f)
+            # Unmap first: a mapped file cannot be replaced on Windows
+            self._release_ip_index()
+            os.replace(tmp_path, self.ip_index_path)
+
+            # Recorded after the file is in place, so a crash in between only
+            # makes the index look older than it is
+            with self._conn as conn:
+                conn.execute("INSERT OR REPLACE INTO ip_index_state (id, max_indicator_id) "
+                             "VALUES (1, ?)", (max_id,))
+
+            self._load_ip_index()
+
+        logger.info(f"Built IP index with {len(addresses)} addresses")
+        return len(addresses)
+
+    def _load_ip_index(self, rebuild_if_stale: bool = False):
+        """
+        Memory-map the IPv4 index file if one exists
+
+        IPv4 indicators stored after the index was built (e.g. before a
+        restart, or by another process) go into the pending set, so the index
+        never answers "not present" for them.
+
+        Args:
+            rebuild_if_stale: Rebuild instead when the index is missing such
+                indicators or its coverage is unknown
+        """
+        with self._lock:
+            self._release_ip_index()
+            self._ip_index_pending = set()
+
+            if not self.ip_index_path.exists() or self.ip_index_path.stat().st_size == 0:
+                return
+
+            state = self._conn.execute(
+                "SELECT max_indicator_id FROM ip_index_state WHERE id = 1").fetchone()
+            if state is None:
+                # Built without coverage information; it cannot be trusted
+                if rebuild_if_stale:
+                    self.build_ip_index()
+                return
+
+            pending = {ip for ip in (_ipv4_to_int(v) for (v,) in self._conn.execute(
+                "SELECT value FROM threat_indicators WHERE indicator_type = 'ip' AND id > ?",
+                state)) if ip is not None}
+            if pending and rebuild_if_stale:
+                self.build_ip_index()
+                return
+
+            with open(self.ip_index_path, 'rb') as f:
+                self._ip_index_mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self._ip_index = memoryview(self._ip_index_mmap).cast('I')
+            self._ip_index_pending = pending
+
+    def _release_ip_index(self):
+        if self._ip_index is not None:
+            self._ip_index.release()
+            self._ip_index_mmap.close()
+            self._ip_index = None
+            self._ip_index_mmap = None
+
+    def _ip_index_may_contain(self, value: str) -> bool:
+        """False only if value is an IPv4 address known not to be an indicator"""
+        ip_int = _ipv4_to_int(value)
+        with self._lock:
+            if self._ip_index is None or ip_int is None:
+                return True
+            if ip_int in self._ip_index_pending:
+                return True
+            i = bisect_left(self._ip_index, ip_int)
+            return i < len(self._ip_index) and self._ip_index[i] == ip_int
+
     def get_threat_indicator(self, indicator_type: str, value: str) -> Optional[ThreatIndicator]:
         """Get threat indicator from database"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.execute("""
-                    SELECT indicator_type, value, threat_type, severity, confidence,
-                           first_seen, last_seen, sources, metadata
-                    FROM threat_indicators
-                    WHERE indicator_type = ? AND value = ?
-                """, (indicator_type, value))
+            with self._lock, self._conn as conn:
+                cursor = conn.execute(SQL_GET_INDICATOR, (indicator_type, value))
 
                 row = cursor.fetchone()
                 if not row:
@@ -375,10 +879,10 @@ class ThreatIntelligence:
                     threat_type=row[2],
                     severity=row[3],
                     confidence=row[4],
-                    first_seen=datetime.fromisoformat(row[5]),
-                    last_seen=datetime.fromisoformat(row[6]),
-                    sources=json.loads(row[7]),
-                    metadata=json.loads(row[8])
+                    first_seen_ts=row[5],
+                    last_seen_ts=row[6],
+                    sources=_json_loads(row[7]),
+                    metadata=_json_loads(row[8])
                 )
 
         except Exception as e:
@@ -387,20 +891,27 @@ class ThreatIntelligence:
 
     def _get_cached_ip_reputation(self, ip: str) -> Optional[IPReputation]:
         """Get cached IP reputation if not expired"""
+        entry = self._get_cached_ip_entry(ip)
+        return entry[0] if entry else None
+
+    def _get_cached_ip_entry(self, ip: str,
+                             max_stale_seconds: int = 0) -> Optional[Tuple[IPReputation, int]]:
+        """
+        Get cached IP reputation along with its expiry (epoch seconds)
+
+        Rows that expired less than max_stale_seconds ago are still returned
+        so callers can serve them while a refresh runs.
+        """
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.execute("""
-                    SELECT ip, reputation_score, is_malicious, abuse_confidence,
-                           country, asn, usage_type, reports, last_reported, categories
-                    FROM ip_reputation_cache
-                    WHERE ip = ? AND expires_at > CURRENT_TIMESTAMP
-                """, (ip,))
+            with self._lock, self._conn as conn:
+                cursor = conn.execute(SQL_GET_CACHED_IP,
+                                      (ip, int(time.time()) - max_stale_seconds))
 
                 row = cursor.fetchone()
                 if not row:
                     return None
 
-                return IPReputation(
+                reputation = IPReputation(
                     ip=row[0],
                     reputation_score=row[1],
                     is_malicious=bool(row[2]),
@@ -409,37 +920,52 @@ class ThreatIntelligence:
                     asn=row[5],
                     usage_type=row[6],
                     reports=row[7],
-                    last_reported=datetime.fromisoformat(row[8]) if row[8] else None,
-                    categories=json.loads(row[9]) if row[9] else []
+                    last_reported=(datetime.fromtimestamp(row[8], tz=timezone.utc)
+                                   if row[8] is not None else None),
+                    categories=_json_loads(row[9]) if row[9] else []
                 )
+                return reputation, row[10]
 
         except Exception as e:
             logger.error(f"Failed to get cached reputation: {e}")
             return None
 
+    def _refresh_ip_reputation(self, ip: str):
+        """Re-query AbuseIPDB for a stale cache entry (runs on the refresh pool)"""
+        try:
+            reputation = self._check_abuseipdb(ip)
+            if reputation:
+                self._cache_ip_reputation(reputation)
+        finally:
+            with self._lock:
+                self._refreshing.discard(ip)
+
     def _cache_ip_reputation(self, reputation: IPReputation):
         """Cache IP reputation for 24 hours"""
         try:
-            expires_at = datetime.now() + timedelta(hours=24)
+            expires_at = int(time.time()) + IP_REPUTATION_TTL_SECONDS
 
-            with sqlite3.connect(self.db_path) as conn:
-                conn.execute("""
-                    INSERT OR REPLACE INTO ip_reputation_cache
-                    (ip, reputation_score, is_malicious, abuse_confidence, country,
-                     asn, usage_type, reports, last_reported, categories, expires_at)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (reputation.ip, reputation.reputation_score, reputation.is_malicious,
-                      reputation.abuse_confidence, reputation.country, reputation.asn,
-                      reputation.usage_type, reputation.reports,
-                      reputation.last_reported.isoformat() if reputation.last_reported else None,
-                      json.dumps(reputation.categories), expires_at))
-                conn.commit()
+            with self._lock, self._conn as conn:
+                conn.execute(SQL_INSERT_CACHE, (
+                    reputation.ip, reputation.reputation_score, reputation.is_malicious,
+                    reputation.abuse_confidence, reputation.country, reputation.asn,
+                    reputation.usage_type, reputation.reports,
+                    int(reputation.last_reported.timestamp()) if reputation.last_reported else None,
+                    _json_dumps(reputation.categories), expires_at))
 
         except Exception as e:
             logger.error(f"Failed to cache reputation: {e}")
 
     def _check_local_threat_feed(self, value: str, indicator_type: str = 'ip') -> Optional[Dict[str, Any]]:
         """Check value against local threat feed"""
+        # Nearly all lookups are for benign values; the Bloom filter rejects
+        # those without touching SQLite (it never yields false negatives).
+        self._sync_indicators()
+        if f"{indicator_type}:{value}" not in self._indicator_filter:
+            return None
+        if indicator_type == 'ip' and not self._ip_index_may_contain(value):
+            return None
+
         indicator = self.get_threat_indicator(indicator_type, value)
         if indicator:
             return {
@@ -452,6 +978,51 @@ class ThreatIntelligence:
             }
         return None
 
+    def check_local_threat_feed_bulk(self, values: List[str],
+                                     indicator_type: str = 'ip') -> Dict[str, Dict[str, Any]]:
+        """
+        Check many values against the local threat feed
+
+        Args:
+            values: Indicator values to check
+            indicator_type: Type of the indicators
+
+        Returns:
+            Dictionary mapping each matched value to its threat data; values
+            with no local indicator are omitted
+        """
+        self._sync_indicators()
+        candidates = [v for v in dict.fromkeys(values)
+                      if f"{indicator_type}:{v}" in self._indicator_filter
+                      and (indicator_type != 'ip' or self._ip_index_may_contain(v))]
+        results = {}
+
+        try:
+            with self._lock:
+                for start in range(0, len(candidates), BULK_LOOKUP_CHUNK):
+                    chunk = candidates[start:start + BULK_LOOKUP_CHUNK]
+                    placeholders = ','.join('?' * len(chunk))
+                    cursor = self._conn.execute(f"""
+                        SELECT value, threat_type, severity, confidence, sources
+                        FROM threat_indicators
+                        WHERE indicator_type = ? AND value IN ({placeholders})
+                    """, (indicator_type, *chunk))
+
+                    for value, threat_type, severity, confidence, sources in cursor:
+                        results[value] = {
+                            'value': value,
+                            'is_malicious': confidence > 70,
+                            'threat_type': threat_type,
+                            'severity': severity,
+                            'confidence': confidence,
+                            'sources': _json_loads(sources)
+                        }
+
+        except Exception as e:
+            logger.error(f"Failed bulk threat feed lookup: {e}")
+
+        return results
+
     def import_threat_feed(self, feed_url: str, feed_name: str, feed_type: str = 'ip') -> int:
         """
         Import threat feed from URL
@@ -467,39 +1038,51 @@ class ThreatIntelligence:
         try:
             logger.info(f"Importing threat feed: {feed_name} from {feed_url}")
 
-            response = requests.get(feed_url, timeout=30)
-            if response.status_code != 200:
-                logger.error(f"Failed to fetch feed: {response.status_code}")
-                return 0
-
-            # Parse feed (assuming one indicator per line, # for comments)
-            indicators = []
-            for line in response.text.split('\n'):
-                line = line.strip()
-                if line and not line.startswith('#'):
-                    indicators.append(line)
-
-            # Import indicators
+            # Stream the feed and flush fixed-size batches so memory stays
+            # bounded by FEED_BATCH_SIZE rather than the size of the feed.
             imported = 0
-            for indicator in indicators:
-                if self.add_threat_indicator(
-                    indicator_type=feed_type,
-                    value=indicator,
-                    threat_type='malicious',
-                    severity='medium',
-                    confidence=75,
-                    source=feed_name
-                ):
-                    imported += 1
+            batch = []
+
+            import requests
+            with requests.get(feed_url, stream=True, timeout=30) as response:
+                if response.status_code != 200:
+                    logger.error(f"Failed to fetch feed: {response.status_code}")
+                    return 0
+
+                if response.encoding is None:
+                    response.encoding = 'utf-8'
+
+                # Parse feed (assuming one indicator per line, # for comments).
+                # Feeds routinely repeat entries and carry malformed lines, so
+                # drop both before they reach SQLite.
+                seen = set()
+                for line in response.iter_lines(chunk_size=65536, decode_unicode=True):
+                    line = line.strip()
+                    if not line or line.startswith('#') or line in seen:
+                        continue
+                    seen.add(line)
+
+                    if feed_type == 'ip' and not _is_valid_ip(line):
+                        logger.debug(f"Skipping malformed IP in {feed_name}: {line}")
+                        continue
+
+                    batch.append((feed_type, line, 'malicious', 'medium', 75,
+                                  feed_name, '{}'))
+                    if len(batch) >= FEED_BATCH_SIZE:
+                        self._upsert_indicators(batch)
+                        imported += len(batch)
+                        batch = []
+
+            if batch:
+                self._upsert_indicators(batch)
+                imported += len(batch)
 
             # Update feed metadata
-            with sqlite3.connect(self.db_path) as conn:
-                conn.execute("""
-                    INSERT OR REPLACE INTO threat_feeds
-                    (feed_name, feed_url, feed_type, last_updated, indicator_count)
-                    VALUES (?, ?, ?, CURRENT_TIMESTAMP, ?)
-                """, (feed_name, feed_url, feed_type, imported))
-                conn.commit()
+            with self._lock, self._conn as conn:
+                conn.execute(SQL_UPSERT_FEED, (feed_name, feed_url, feed_type, imported))
+
+            if feed_type == 'ip':
+                self.build_ip_index()
 
             logger.info(f"Imported {imported} indicators from {feed_name}")
             return imported
@@ -511,36 +1094,12 @@ class ThreatIntelligence:
     def get_statistics(self) -> Dict[str, Any]:
         """Get threat intelligence statistics"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                # Count indicators by type
-                cursor = conn.execute("""
-                    SELECT indicator_type, COUNT(*)
-                    FROM threat_indicators
-                    GROUP BY indicator_type
-                """)
-                indicators_by_type = dict(cursor.fetchall())
-
-                # Count by severity
-                cursor = conn.execute("""
-                    SELECT severity, COUNT(*)
-                    FROM threat_indicators
-                    GROUP BY severity
-                """)
-                indicators_by_severity = dict(cursor.fetchall())
-
-                # Count cached IPs
-                cursor = conn.execute("""
-                    SELECT COUNT(*) FROM ip_reputation_cache
-                    WHERE expires_at > CURRENT_TIMESTAMP
-                """)
-                cached_ips = cursor.fetchone()[0]
-
-                # Count threat feeds
-                cursor = conn.execute("""
-                    SELECT COUNT(*), SUM(indicator_count)
-                    FROM threat_feeds WHERE enabled = 1
-                """)
-                feeds_count, total_feed_indicators = cursor.fetchone()
+            with self._lock, self._conn as conn:
+                cursor = conn.execute(SQL_STATISTICS, (int(time.time()),))
+                (by_type, by_severity, cached_ips,
+                 feeds_count, total_feed_indicators) = cursor.fetchone()
+                indicators_by_type = _json_loads(by_type)
+                indicators_by_severity = _json_loads(by_severity)
 
                 return {
                     'indicators_by_type': indicators_by_type,
@@ -6,18 +6,81 @@ Manages Docker containers, handles CPU usage issues, and auto-restarts container
 
 import docker
 import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Callable, List, Optional, Tuple
+import numpy as np
 import psutil
 
+try:
+    import ahocorasick
+    HAS_AHOCORASICK = True
+except ImportError:
+    HAS_AHOCORASICK = False
+
 logger = logging.getLogger(__name__)
 
+# Pattern count above which an Aho-Corasick automaton replaces the regex
+AHOCORASICK_MIN_PATTERNS = 8
+
+
+@lru_cache(maxsize=64)
+def _compile_name_matcher(pattern: str) -> Optional[Callable[[str], Any]]:
+    """
+    Build a substring matcher for container names
+
+    Args:
+        pattern: Substring, comma-separated substrings, or '*' for all
+
+    Returns:
+        Compiled search function, or None when every name matches
+    """
+    patterns = [p.strip() for p in pattern.split(',') if p.strip()]
+    if not patterns or '*' in patterns:
+        return None
+
+    # Large (e.g. per-tenant) pattern sets: one automaton pass per name,
+    # independent of how many patterns there are
+    if HAS_AHOCORASICK and len(patterns) >= AHOCORASICK_MIN_PATTERNS:
+        automaton = ahocorasick.Automaton()
+        for p in patterns:
+            automaton.add_word(p, p)
+        automaton.make_automaton()
+        return lambda name: next(automaton.iter(name), None) is not None
+
+    return re.compile('|'.join(map(re.escape, patterns))).search
+
+
+# Concurrent container.stats() requests per monitoring pass
+STATS_WORKERS = 32
+
+# Concurrent restart/run calls for bulk lifecycle operations
+LIFECYCLE_WORKERS = 8
+
+# Upper bound on containers tracked for the auto-restart cooldown
+RESTART_HISTORY_MAX_SIZE = 10000
+
+# Seconds a get_system_resources() snapshot is reused
+SYSTEM_RESOURCES_TTL = 2.0
+
 
 class ContainerLifecycleManager:
     """Manages container lifecycle and resource usage"""
 
-    def __init__(self):
-        """Initialize container manager"""
+    def __init__(self, stream_stats: bool = False):
+        """
+        Initialize container manager
+
+        Args:
+            stream_stats: Keep a persistent stats stream open per running
+                container (for long-running daemons) instead of issuing a
+                one-shot stats request per container on every pass
+        """
         try:
             self.client = docker.from_env()
         except docker.errors.DockerException as e:
@@ -28,7 +91,85 @@ class ContainerLifecycleManager:
         self.memory_threshold = 85.0  # Memory usage percentage
         self.restart_cooldown = 300  # 5 minutes cooldown
 
-        self.restart_history = {}
+        # container id -> time.monotonic() of the last auto-restart, oldest
+        # first; entries are dropped once their cooldown has passed
+        self.restart_history = OrderedDict()
+
+        # Latest sample per container id, fed by start_stats_stream()
+        self._latest_stats = {}
+        self._stats_pumps = {}
+        self._stats_lock = threading.Lock()
+        self._stats_stop = threading.Event()
+        self._events_stream = None
+        self._events_thread = None
+
+        # (monotonic deadline, snapshot) for get_system_resources()
+        self._resources_cache = None
+
+        # Prime the CPU sampler so non-blocking reads have a baseline
+        psutil.cpu_percent(interval=None)
+
+        if stream_stats:
+            self.start_stats_stream()
+
+    def start_stats_stream(self):
+        """Open a persistent stats stream for every running container"""
+        if not self.client or self._events_thread:
+            return
+
+        self._stats_stop.clear()
+        for container in self.client.containers.list():
+            self._start_stats_pump(container)
+
+        # Follow container start events so new containers get a pump too;
+        # pumps for stopped containers end when their stream closes
+        self._events_thread = threading.Thread(target=self._watch_container_events, daemon=True)
+        self._events_thread.start()
+
+    def stop_stats_stream(self):
+        """Stop all stats pumps and the event watcher"""
+        self._stats_stop.set()
+        if self._events_stream is not None:
+            self._events_stream.close()
+        self._events_thread = None
+
+    def _start_stats_pump(self, container: docker.models.containers.Container):
+        with self._stats_lock:
+            if container.id in self._stats_pumps:
+                return
+            thread = threading.Thread(target=self._pump_stats, args=(container,), daemon=True)
+            self._stats_pumps[container.id] = thread
+        thread.start()
+
+    def _pump_stats(self, container: docker.models.containers.Container):
+        """Keep the most recent stats sample for one container"""
+        try:
+            for sample in container.stats(stream=True, decode=True):
+                if self._stats_stop.is_set():
+                    break
+                with self._stats_lock:
+                    self._latest_stats[container.id] = sample
+        except Exception as e:
+            logger.debug(f"Stats stream for {container.name} ended: {e}")
+        finally:
+            with self._stats_lock:
+                self._stats_pumps.pop(container.id, None)
+                self._latest_stats.pop(container.id, None)
+
+    def _watch_container_events(self):
+        try:
+            self._events_stream = self.client.events(
+                decode=True, filters={'type': 'container', 'event': 'start'}
+            )
+            for event in self._events_stream:
+                if self._stats_stop.is_set():
+                    break
+                try:
+                    self._start_stats_pump(self.client.containers.get(event['id']))
+                except Exception as e:
+                    logger.debug(f"Could not attach stats stream: {e}")
+        except Exception as e:
+            logger.warning(f"Container event stream stopped: {e}")
 
     def monitor_containers(self) -> List[Dict[str, Any]]:
         """
@@ -47,10 +188,14 @@ class ContainerLifecycleManager:
         try:
             containers = self.client.containers.list()
 
-            for container in containers:
-                report = self._check_container_health(container)
-                reports.append(report)
+            # Each stats() call blocks for the daemon's sampling window, so
+            # collect them concurrently rather than one container at a time
+            with ThreadPoolExecutor(max_workers=STATS_WORKERS) as executor:
+                samples = list(executor.map(self._collect_container_stats, containers))
 
+            reports = self._evaluate_container_health(containers, samples)
+
+            for container, report in zip(containers, reports):
                 # Auto-remediate if needed
                 if report['needs_restart']:
                     self._auto_restart_container(container, report['reason'])
@@ -62,76 +207,130 @@ class ContainerLifecycleManager:
 
     def _check_container_health(self, container: docker.models.containers.Container) -> Dict[str, Any]:
         """Check container health and resource usage"""
-        report = {
-            'container_id': container.id[:12],
-            'name': container.name,
-            'status': container.status,
-            'image': container.image.tags[0] if container.image.tags else 'unknown',
-            'cpu_usage': 0.0,
-            'memory_usage': 0.0,
-            'needs_restart': False,
-            'reason': ''
-        }
+        return self._evaluate_container_health([container], [self._collect_container_stats(container)])[0]
 
+    def _collect_container_stats(
+        self, container: docker.models.containers.Container
+    ) -> Tuple[Optional[Dict[str, Any]], Optional[Exception]]:
+        """Get a stats sample for a container as (stats, error)"""
         try:
-            # Get container stats
-            stats = container.stats(stream=False)
-
-            # Calculate CPU usage
-            cpu_delta = stats['cpu_stats']['cpu_usage']['total_usage'] - \
-                       stats['precpu_stats']['cpu_usage']['total_usage']
-            system_delta = stats['cpu_stats']['system_cpu_usage'] - \
-                          stats['precpu_stats']['system_cpu_usage']
-            cpu_count = stats['cpu_stats']['online_cpus']
-
-            if system_delta > 0:
-                cpu_usage = (cpu_delta / system_delta) * cpu_count * 100.0
-                report['cpu_usage'] = round(cpu_usage, 2)
-
-            # Calculate memory usage
-            memory_usage = stats['memory_stats']['usage']
-            memory_limit = stats['memory_stats']['limit']
-            memory_percent = (memory_usage / memory_limit) * 100.0
-            report['memory_usage'] = round(memory_percent, 2)
-
-            # Check thresholds
-            if report['cpu_usage'] > self.cpu_threshold:
-                report['needs_restart'] = True
-                report['reason'] = f"High CPU usage: {report['cpu_usage']}%"
-
-            if report['memory_usage'] > self.memory_threshold:
-                report['needs_restart'] = True
-                report['reason'] = f"High memory usage: {report['memory_usage']}%"
-
-            # Check if container is unhealthy
-            health = container.attrs.get('State', {}).get('Health', {})
-            if health.get('Status') == 'unhealthy':
-                report['needs_restart'] = True
-                report['reason'] = 'Container unhealthy'
+            # Prefer the streamed sample; the first streamed sample has no
+            # precpu_stats yet, so fall back to a one-shot request for it
+            with self._stats_lock:
+                stats = self._latest_stats.get(container.id)
+            if not stats or 'system_cpu_usage' not in stats.get('precpu_stats', {}):
+                stats = container.stats(stream=False)
+            return stats, None
 
         except Exception as e:
-            logger.error(f"Error checking container {container.name}: {e}")
-            report['reason'] = f"Monitoring error: {e}"
+            return None, e
+
+    def _evaluate_container_health(
+        self,
+        containers: List[docker.models.containers.Container],
+        samples: List[Tuple[Optional[Dict[str, Any]], Optional[Exception]]]
+    ) -> List[Dict[str, Any]]:
+        """Build health reports, applying resource thresholds to all containers at once"""
+        reports = []
+        rows = []
+
+        for container, (stats, error) in zip(containers, samples):
+            # Read the cached inspect payload once; container.image would cost
+            # an extra daemon round-trip per container
+            attrs = container.attrs or {}
+
+            report = {
+                'container_id': container.id[:12],
+                'name': container.name,
+                'status': container.status,
+                'image': attrs.get('Config', {}).get('Image') or 'unknown',
+                'cpu_usage': 0.0,
+                'memory_usage': 0.0,
+                'needs_restart': False,
+                'reason': ''
+            }
+            reports.append(report)
+
+            try:
+                if error is not None:
+                    raise error
+
+                rows.append((
+                    len(reports) - 1,
+                    stats['cpu_stats']['cpu_usage']['total_usage'] -
+                    stats['precpu_stats']['cpu_usage']['total_usage'],
+                    stats['cpu_stats']['system_cpu_usage'] -
+                    stats['precpu_stats']['system_cpu_usage'],
+                    stats['cpu_stats']['online_cpus'],
+                    stats['memory_stats']['usage'],
+                    stats['memory_stats']['limit'],
+                    attrs.get('State', {}).get('Health', {}).get('Status') == 'unhealthy'
+                ))
+
+            except Exception as e:
+                logger.error(f"Error checking container {container.name}: {e}")
+                report['reason'] = f"Monitoring error: {e}"
+
+        if not rows:
+            return reports
+
+        index, cpu_delta, system_delta, cpu_count, memory_usage, memory_limit, unhealthy = (
+            np.array(column) for column in zip(*rows)
+        )
+        cpu_delta, system_delta, cpu_count, memory_usage, memory_limit = (
+            a.astype(np.float64) for a in (cpu_delta, system_delta, cpu_count, memory_usage, memory_limit)
+        )
+
+        # One vectorized pass over the fleet instead of per-container arithmetic
+        with np.errstate(divide='ignore', invalid='ignore'):
+            cpu_usage = np.where(system_delta > 0, cpu_delta / system_delta * cpu_count * 100.0, 0.0)
+            memory_percent = np.where(memory_limit > 0, memory_usage / memory_limit * 100.0, 0.0)
+        cpu_usage = np.round(cpu_usage, 2)
+        memory_percent = np.round(memory_percent, 2)
+
+        for i, cpu, memory in zip(index.tolist(), cpu_usage.tolist(), memory_percent.tolist()):
+            reports[i]['cpu_usage'] = cpu
+            reports[i]['memory_usage'] = memory
+
+        # Later checks take precedence for the reported reason
+        for i in index[cpu_usage > self.cpu_threshold].tolist():
+            reports[i]['needs_restart'] = True
+            reports[i]['reason'] = f"High CPU usage: {reports[i]['cpu_usage']}%"
+
+        for i in index[memory_percent > self.memory_threshold].tolist():
+            reports[i]['needs_restart'] = True
+            reports[i]['reason'] = f"High memory usage: {reports[i]['memory_usage']}%"
+
+        for i in index[unhealthy].tolist():
+            reports[i]['needs_restart'] = True
+            reports[i]['reason'] = 'Container unhealthy'
 
-        return report
+        return reports
 
     def _auto_restart_container(self, container: docker.models.containers.Container, reason: str):
         """Auto-restart container with cooldown"""
         container_id = container.id[:12]
 
+        # Expire finished cooldowns so the history stays bounded
+        now = time.monotonic()
+        while self.restart_history:
+            oldest_id, restarted_at = next(iter(self.restart_history.items()))
+            if now - restarted_at < self.restart_cooldown:
+                break
+            del self.restart_history[oldest_id]
+
         # Check cooldown
-        last_restart = self.restart_history.get(container_id)
-        if last_restart:
-            time_since_restart = (datetime.now() - last_restart).total_seconds()
-            if time_since_restart < self.restart_cooldown:
-                logger.info(f"Skipping restart for {container.name} (cooldown)")
-                return
+        if container_id in self.restart_history:
+            logger.info(f"Skipping restart for {container.name} (cooldown)")
+            return
 
         logger.info(f"Auto-restarting container {container.name}: {reason}")
 
         try:
             container.restart(timeout=10)
-            self.restart_history[container_id] = datetime.now()
+            self.restart_history[container_id] = time.monotonic()
+            if len(self.restart_history) > RESTART_HISTORY_MAX_SIZE:
+                self.restart_history.popitem(last=False)
             logger.info(f"Container {container.name} restarted successfully")
 
         except Exception as e:
@@ -142,7 +341,8 @@ class ContainerLifecycleManager:
         Restart containers matching pattern
 
         Args:
-            pattern: Pattern to match container names
+            pattern: Substring to match container names; several may be
+                given comma-separated, or '*' for all containers
 
         Returns:
             Restart result
@@ -160,11 +360,17 @@ class ContainerLifecycleManager:
 
         try:
             containers = self.client.containers.list()
+            matcher = _compile_name_matcher(pattern)
+            matched = [c for c in containers if matcher is None or matcher(c.name)]
 
-            for container in containers:
-                if pattern in container.name or pattern == '*':
+            # Each restart waits out its stop grace period; overlap them
+            with ThreadPoolExecutor(max_workers=LIFECYCLE_WORKERS) as executor:
+                futures = {executor.submit(c.restart, timeout=10): c for c in matched}
+
+                for future in as_completed(futures):
+                    container = futures[future]
                     try:
-                        container.restart(timeout=10)
+                        future.result()
                         result['count'] += 1
                         result['restarted'].append(container.name)
                         logger.info(f"Restarted: {container.name}")
@@ -195,22 +401,21 @@ class ContainerLifecycleManager:
             'reason': []
         }
 
-        reports = self.monitor_containers()
+        overused = [r for r in self.monitor_containers() if r['needs_restart']]
 
-        for report in reports:
-            if report['needs_restart']:
-                try:
-                    container = self.client.containers.get(report['container_id'])
-                    container.stop(timeout=10)
+        for report in overused:
+            try:
+                container = self.client.containers.get(report['container_id'])
+                container.stop(timeout=10)
 
-                    result['count'] += 1
-                    result['stopped'].append(report['name'])
-                    result['reason'].append(report['reason'])
+                result['count'] += 1
+                result['stopped'].append(report['name'])
+                result['reason'].append(report['reason'])
 
-                    logger.info(f"Stopped {report['name']}: {report['reason']}")
+                logger.info(f"Stopped {report['name']}: {report['reason']}")
 
-                except Exception as e:
-                    logger.error(f"Failed to stop {report['name']}: {e}")
+            except Exception as e:
+                logger.error(f"Failed to stop {report['name']}: {e}")
 
         return result
 
@@ -241,32 +446,41 @@ class ContainerLifecycleManager:
             logger.info(f"Pulling image: {image_name}")
             self.client.images.pull(image_name)
 
-            # Deploy containers
-            for i in range(count):
-                try:
-                    container_name = f"{image_name.split(':')[0]}-{datetime.now().strftime('%Y%m%d%H%M%S')}-{i}"
+            # Deploy containers concurrently; one shared name prefix keeps
+            # the batch identifiable and the index keeps names unique
+            prefix = f"{image_name.split(':')[0]}-{datetime.now().strftime('%Y%m%d%H%M%S')}"
 
-                    container = self.client.containers.run(
-                        image_name,
-                        name=container_name,
-                        detach=True,
-                        restart_policy={'Name': 'unless-stopped'}
-                    )
+            def run(i: int):
+                return self.client.containers.run(
+                    image_name,
+                    name=f"{prefix}-{i}",
+                    detach=True,
+                    restart_policy={'Name': 'unless-stopped'}
+                )
 
-                    result['count'] += 1
-                    result['deployed'].append({
-                        'id': container.id[:12],
-                        'name': container_name
-                    })
+            with ThreadPoolExecutor(max_workers=LIFECYCLE_WORKERS) as executor:
+                futures = {executor.submit(run, i): i for i in range(count)}
 
-                    logger.info(f"Deployed: {container_name}")
+                for future in as_completed(futures):
+                    i = futures[future]
+                    container_name = f"{prefix}-{i}"
+                    try:
+                        container = future.result()
 
-                except Exception as e:
-                    result['failed'].append({
-                        'index': i,
-                        'error': str(e)
-                    })
-                    logger.error(f"Failed to deploy container {i}: {e}")
+                        result['count'] += 1
+                        result['deployed'].append({
+                            'id': container.id[:12],
+                            'name': container_name
+                        })
+
+                        logger.info(f"Deployed: {container_name}")
+
+                    except Exception as e:
+                        result['failed'].append({
+                            'index': i,
+                            'error': str(e)
+                        })
+                        logger.error(f"Failed to deploy container {i}: {e}")
 
         except Exception as e:
             logger.error(f"Image pull/deployment failed: {e}")
@@ -296,32 +510,28 @@ class ContainerLifecycleManager:
         }
 
         try:
-            images = self.client.images.list()
-            cutoff_date = datetime.now() - timedelta(days=days_old)
+            # The low-level API returns every image and container summary in
+            # one JSON response each, with Created already as a unix timestamp
+            api = self.client.api
+            cutoff_ts = int((datetime.now() - timedelta(days=days_old)).timestamp())
+            in_use = {c.get('ImageID') for c in api.containers(all=True)}
 
-            for image in images:
-                # Skip images in use
-                if image.tags and self._image_in_use(image):
-                    continue
+            stale = [img for img in api.images()
+                     if img['Created'] < cutoff_ts and img['Id'] not in in_use]
 
-                # Check age
-                created_at = datetime.fromisoformat(image.attrs['Created'].replace('Z', '+00:00'))
-
-                if created_at < cutoff_date:
-                    try:
-                        image_id = image.id[:12]
-                        size = image.attrs['Size']
-
-                        self.client.images.remove(image.id, force=True)
+            for image in stale:
+                image_id = image['Id'][:12]
+                try:
+                    api.remove_image(image['Id'], force=True)
 
-                        result['count'] += 1
-                        result['removed'].append(image_id)
-                        result['space_freed'] += size
+                    result['count'] += 1
+                    result['removed'].append(image_id)
+                    result['space_freed'] += image.get('Size', 0)
 
-                        logger.info(f"Removed image: {image_id}")
+                    logger.info(f"Removed image: {image_id}")
 
-                    except Exception as e:
-                        logger.warning(f"Failed to remove image {image.id}: {e}")
+                except Exception as e:
+                    logger.warning(f"Failed to remove image {image['Id']}: {e}")
 
         except Exception as e:
             logger.error(f"Image cleanup failed: {e}")
@@ -331,25 +541,28 @@ class ContainerLifecycleManager:
 
         return result
 
-    def _image_in_use(self, image: docker.models.images.Image) -> bool:
-        """Check if image is in use by any container"""
-        try:
-            containers = self.client.containers.list(all=True)
-
-            for container in containers:
-                if container.image.id == image.id:
-                    return True
+    def get_system_resources(self, cpu_interval: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Get system resource usage
 
-            return False
+        Args:
+            cpu_interval: Seconds to block sampling CPU; None reports usage
+                since the previous call without blocking
 
-        except Exception:
-            return True  # Assume in use if check fails
+        Returns:
+            Resource usage snapshot
+        """
+        if cpu_interval is None:
+            cached = self._resources_cache
+            if cached and cached[0] > time.monotonic():
+                return dict(cached[1])
 
-    def get_system_resources(self) -> Dict[str, Any]:
-        """Get system resource usage"""
-        return {
-            'cpu_percent': psutil.cpu_percent(interval=1),
+        resources = {
+            'cpu_percent': psutil.cpu_percent(interval=cpu_interval),
             'memory_percent': psutil.virtual_memory().percent,
             'disk_percent': psutil.disk_usage('/').percent,
             'timestamp': datetime.now().isoformat()
         }
+
+        self._resources_cache = (time.monotonic() + SYSTEM_RESOURCES_TTL, resources)
+        return dict(resources)
@@ -5,34 +5,356 @@ Coordinates auto-remediation of detected issues using Ansible.
 """
 
 import os
+import copy
 import json
+import hashlib
+import importlib.util
+import shlex
 import subprocess
 import logging
+import tempfile
+import threading
+from collections import deque
+from dataclasses import dataclass
 from datetime import datetime
-from typing import Dict, Any, List, Optional
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Dict, Any, List, Mapping, Optional, Tuple
 from pathlib import Path
 import yaml
 
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
 from ..automation import WorkflowGenerator
 from ..knowledge_base import EnhancedKnowledgeBase
 
 logger = logging.getLogger(__name__)
 
+# libyaml's C emitter when available; playbooks only hold plain data
+YamlDumper = getattr(yaml, 'CSafeDumper', yaml.SafeDumper)
+
+# Connection reuse for ansible-playbook runs, applied only when the agent
+# config sets 'ansible_tuning'. Ansible ranks environment variables above
+# ansible.cfg, so these replace the operator's settings there (ANSIBLE_SSH_ARGS
+# replaces ssh_args outright) and pipelining needs 'requiretty' disabled in
+# sudoers on the targets. Variables already set in the agent's own
+# environment are left alone.
+ANSIBLE_TUNING_ENV = {
+    'ANSIBLE_PIPELINING': 'True',
+    'ANSIBLE_SSH_PIPELINING': 'True',
+    'ANSIBLE_SSH_ARGS': '-o ControlMaster=auto -o ControlPersist=60s',
+    'ANSIBLE_FORKS': '20',
+}
+
+# Inventory group targeted per environment
+HOST_GROUPS = MappingProxyType({
+    'dev': 'dev_servers',
+    'staging': 'staging_servers',
+    'production': 'prod_servers'
+})
+
+# Shell command checking whether an issue is present, per category
+CHECK_COMMANDS = MappingProxyType({
+    'memory': "free -m | awk '/Mem:/ {print $3/$2 * 100}'",
+    'cpu': "top -bn1 | grep 'Cpu(s)' | awk '{print $2}'",
+    'zombie': "ps aux | grep Z | wc -l"
+})
+DEFAULT_CHECK_COMMAND = "echo 'Manual verification required'"
+
+# RemediationAgent task generator per category (generic steps otherwise)
+TASK_GENERATORS = MappingProxyType({
+    'memory': '_generate_memory_tasks',
+    'cpu': '_generate_cpu_tasks',
+    'zombie': '_generate_zombie_tasks',
+    'latency': '_generate_latency_tasks'
+})
+
+# Fixed remediation tasks per category; generators return deep copies so
+# callers can edit a playbook's tasks without touching the shared templates
+MEMORY_TASKS = (
+    {
+        'name': 'Clear system caches',
+        'shell': 'sync && echo 3 > /proc/sys/vm/drop_caches',
+        'when': 'pre_check.stdout|float > 80'
+    },
+    {
+        'name': 'Restart high-memory services',
+        'systemd': {
+            'name': '{{ item }}',
+            'state': 'restarted'
+        },
+        'loop': ['application', 'cache-service'],
+        'ignore_errors': True
+    },
+)
+
+CPU_TASKS = (
+    {
+        'name': 'Identify high-CPU processes',
+        'shell': "ps aux --sort=-%cpu | head -n 10",
+        'register': 'high_cpu_procs'
+    },
+    {
+        'name': 'Adjust process priorities',
+        'shell': "renice +5 $(pgrep -f 'high-cpu-process')",
+        'ignore_errors': True
+    },
+)
+
+ZOMBIE_TASKS = (
+    {
+        'name': 'Find zombie processes',
+        'shell': "ps aux | awk '$8==\"Z\" {print $2}'",
+        'register': 'zombies'
+    },
+    {
+        'name': 'Kill parent processes of zombies',
+        'shell': "kill -9 $(ps -A -ostat,ppid | awk '/[zZ]/{print $2}')",
+        'when': 'zombies.stdout != ""',
+        'ignore_errors': True
+    },
+)
+
+LATENCY_TASKS = (
+    {
+        'name': 'Check network latency',
+        'shell': 'ping -c 5 google.com | tail -1 | awk \'{print $4}\' | cut -d \'/\' -f 2',
+        'register': 'latency'
+    },
+    {
+        'name': 'Restart networking service',
+        'systemd': {
+            'name': 'NetworkManager',
+            'state': 'restarted'
+        },
+        'when': 'latency.stdout|float > 100'
+    },
+)
+
+# Bump when playbook generation changes in a way the templates below don't
+# capture, so content-addressed playbooks from older code are not reused
+PLAYBOOK_FORMAT_VERSION = 1
+
+# Lines of ansible-playbook output kept for the execution log
+ANSIBLE_LOG_TAIL_LINES = 1000
+
+# Play rollout per environment (overridable via the agent config keys
+# 'strategy', 'serial_batch' and 'max_fail_percentage'): production rolls out
+# one host at a time, elsewhere hosts proceed independently in large batches
+PRODUCTION_ROLLOUT = {'strategy': 'linear', 'serial': 1, 'max_fail_percentage': 0}
+DEFAULT_ROLLOUT = {'strategy': 'free', 'serial': '25%', 'max_fail_percentage': 10}
+
+# Digest of every template a generated playbook is built from; part of the
+# playbook cache key so editing a template invalidates cached playbooks
+_TEMPLATE_DIGEST = hashlib.blake2b(json.dumps({
+    'version': PLAYBOOK_FORMAT_VERSION,
+    'hosts': dict(HOST_GROUPS),
+    'checks': dict(CHECK_COMMANDS),
+    'default_check': DEFAULT_CHECK_COMMAND,
+    'tasks': [MEMORY_TASKS, CPU_TASKS, ZOMBIE_TASKS, LATENCY_TASKS],
+    'rollout': [PRODUCTION_ROLLOUT, DEFAULT_ROLLOUT],
+}, sort_keys=True).encode(), digest_size=8).hexdigest()
+
+
+@dataclass(frozen=True)
+class FixRecord:
+    """Knowledge base fix selected for remediation"""
+    __slots__ = ('error_pattern', 'category', 'severity', 'solution',
+                 'implementation_steps', 'issue_type')
+
+    error_pattern: str
+    category: str
+    severity: str
+    solution: str
+    implementation_steps: str
+    issue_type: str
+
+    @classmethod
+    def from_row(cls, row: Mapping[str, Any]) -> 'FixRecord':
+        """Build from a knowledge base row (see EnhancedKnowledgeBase.search_records)"""
+        get = row.get
+        return cls(
+            error_pattern=get('Error_Pattern', ''),
+            category=get('Category', ''),
+            severity=get('Severity', ''),
+            solution=get('Solution', ''),
+            implementation_steps=get('Implementation_Steps', ''),
+            issue_type=get('Issue_Type', '')
+        )
+
+
+@lru_cache(maxsize=1)
+def _mitogen_strategy_dir() -> Optional[str]:
+    """Strategy plugin directory of ansible_mitogen, if installed"""
+    spec = importlib.util.find_spec('ansible_mitogen')
+    if spec is None or not spec.origin:
+        return None
+    return os.path.join(os.path.dirname(spec.origin), 'plugins', 'strategy')
+
+
+@lru_cache(maxsize=512)
+def _parse_steps(steps: str) -> Tuple[str, ...]:
+    """Parse a fix's implementation steps (JSON list, or a single raw step)"""
+    if not steps:
+        return ()
+
+    try:
+        parsed = orjson.loads(steps) if HAS_ORJSON else json.loads(steps)
+    except (ValueError, TypeError):
+        return (steps,)
+
+    return tuple(parsed) if isinstance(parsed, list) else (steps,)
+
+
+def _run_streaming(cmd: List[str], timeout: float,
+                   env: Optional[Dict[str, str]] = None) -> Tuple[int, str]:
+    """
+    Run a command, streaming its combined output to the debug log
+
+    Only the last ANSIBLE_LOG_TAIL_LINES lines are kept, so memory stays bounded
+    for verbose, long-running plays.
+
+    Args:
+        cmd: Command to run
+        timeout: Seconds before the process is killed
+        env: Process environment (inherits the current one if omitted)
+
+    Returns:
+        Tuple of (return code, output tail)
+
+    Raises:
+        subprocess.TimeoutExpired: If the command runs past the timeout
+    """
+    tail = deque(maxlen=ANSIBLE_LOG_TAIL_LINES)
+
+    proc = subprocess.Popen(
+        cmd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+        bufsize=1,
+        env=env
+    )
+
+    def drain():
+        for line in proc.stdout:
+            line = line.rstrip('\n')
+            tail.append(line)
+            logger.debug(line)
+
+    reader = threading.Thread(target=drain, daemon=True)
+    reader.start()
+
+    try:
+        returncode = proc.wait(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        proc.wait()
+        raise
+    finally:
+        reader.join()
+        proc.stdout.close()
+
+    return returncode, '\n'.join(tail)
+
+
+def _run_quiet(cmd: List[str], timeout: float,
+               env: Optional[Dict[str, str]] = None) -> Tuple[int, str]:
+    """
+    Run a command whose stdout is not needed, keeping only stderr
+
+    stdout goes straight to /dev/null at the fd level, so verbose output is
+    never read or decoded by the interpreter.
+
+    Args:
+        cmd: Command to run
+        timeout: Seconds before the process is killed
+        env: Process environment (inherits the current one if omitted)
+
+    Returns:
+        Tuple of (return code, stderr)
+
+    Raises:
+        subprocess.TimeoutExpired: If the command runs past the timeout
+    """
+    proc = subprocess.run(
+        cmd,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        timeout=timeout,
+        env=env,
+        check=False
+    )
+
+    # Successful quiet runs skip decoding entirely
+    if proc.returncode == 0 or not proc.stderr:
+        return proc.returncode, ''
+    return proc.returncode, proc.stderr.decode(errors='replace')
+
+
+def _write_atomic(path: Path, text: str):
+    """
+    Write a file so concurrent readers see either nothing or all of it
+
+    The content goes to a temporary file in the same directory, which is then
+    renamed over the target.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix='.tmp')
+    try:
+        # mkstemp creates 0600; keep the permissions a plain open() would give
+        os.chmod(tmp_path, 0o644)
+        with os.fdopen(fd, 'w') as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def _ansible_env(tuning: bool = False) -> Dict[str, str]:
+    """
+    Environment for ansible-playbook
+
+    Args:
+        tuning: Add ANSIBLE_TUNING_ENV (pipelining and SSH multiplexing) and
+            the mitogen strategy when ansible_mitogen is installed
+    """
+    env = os.environ.copy()
+    if not tuning:
+        return env
+
+    for key, value in ANSIBLE_TUNING_ENV.items():
+        env.setdefault(key, value)
+
+    # Mitogen replaces per-task SSH/module transfer with a persistent channel
+    strategy_dir = _mitogen_strategy_dir()
+    if strategy_dir and 'ANSIBLE_STRATEGY' not in env:
+        env['ANSIBLE_STRATEGY_PLUGINS'] = strategy_dir
+        env['ANSIBLE_STRATEGY'] = 'mitogen_linear'
+
+    return env
+
 
 class RemediationAgent:
     """Orchestrates automatic remediation of detected issues"""
 
-    def __init__(self, config: Optional[Dict[str, Any]] = None):
+    def __init__(self, config: Optional[Dict[str, Any]] = None,
+                 kb: Optional[EnhancedKnowledgeBase] = None):
         """
         Initialize remediation agent
 
         Args:
             config: Configuration dictionary
+            kb: Already-loaded knowledge base to share (loads a new one if omitted)
         """
         self.config = config or {}
-        self.kb = EnhancedKnowledgeBase()
+        self.kb = kb if kb is not None else EnhancedKnowledgeBase()
         self.workflow_gen = WorkflowGenerator()
-        self.ansible_dir = Path('ansible_playbooks')
+        self.ansible_dir = Path(self.config.get('ansible_dir', 'ansible_playbooks'))
         self.ansible_dir.mkdir(parents=True, exist_ok=True)
 
     def execute_remediation(self, issue_id: str, environment: str,
@@ -68,10 +390,10 @@ class RemediationAgent:
                 result['message'] = f"No fix found for issue: {issue_id}"
                 return result
 
-            logger.info(f"Found fix: {fix['category']} - {fix['severity']}")
+            logger.info(f"Found fix: {fix.category} - {fix.severity}")
 
             # 2. Check if auto-approval is allowed
-            if not auto_approve and fix['severity'] == 'critical':
+            if not auto_approve and fix.severity == 'critical':
                 if not self._request_approval(fix, environment):
                     result['status'] = 'pending_approval'
                     result['message'] = 'Awaiting manual approval'
@@ -81,8 +403,10 @@ class RemediationAgent:
             playbook_path = self._generate_ansible_playbook(fix, environment)
             result['playbook_path'] = str(playbook_path)
 
-            # 4. Execute playbook
-            execution_log = self._execute_ansible(playbook_path, environment)
+            # 4. Execute playbook; the --check dry run doubles wall time, so
+            # only pay for it where a bad run is costly
+            dry_run_first = environment == 'production' or fix.severity == 'critical'
+            execution_log = self._execute_ansible(playbook_path, environment, dry_run_first)
             result['log'] = execution_log
 
             # 5. Verify remediation
@@ -100,11 +424,11 @@ class RemediationAgent:
 
         return result
 
-    def _find_fix(self, issue_id: str) -> Optional[Dict[str, Any]]:
+    def _find_fix(self, issue_id: str) -> Optional[FixRecord]:
         """Find fix in knowledge base"""
         try:
             # Search by error pattern
-            results = self.kb.search({
+            results = self.kb.search_records({
                 'keywords': [issue_id],
                 'has_solution': True
             })
@@ -113,27 +437,19 @@ class RemediationAgent:
                 return None
 
             # Return first match
-            row = results.iloc[0]
-            return {
-                'error_pattern': row.get('Error_Pattern', ''),
-                'category': row.get('Category', ''),
-                'severity': row.get('Severity', ''),
-                'solution': row.get('Solution', ''),
-                'implementation_steps': row.get('Implementation_Steps', ''),
-                'issue_type': row.get('Issue_Type', '')
-            }
+            return FixRecord.from_row(results[0])
 
         except Exception as e:
             logger.error(f"Error finding fix: {e}")
             return None
 
-    def _request_approval(self, fix: Dict[str, Any], environment: str) -> bool:
+    def _request_approval(self, fix: FixRecord, environment: str) -> bool:
         """
         Request manual approval for critical fixes
 
         In production, this would integrate with approval systems
         """
-        logger.info(f"Approval required for {fix['severity']} fix in {environment}")
+        logger.info(f"Approval required for {fix.severity} fix in {environment}")
 
         # For now, auto-approve non-production
         if environment != 'production':
@@ -147,210 +463,174 @@ class RemediationAgent:
 
         return False
 
-    def _generate_ansible_playbook(self, fix: Dict[str, Any],
+    def _generate_ansible_playbook(self, fix: FixRecord,
                                    environment: str) -> Path:
         """Generate Ansible playbook from fix"""
+        # Playbooks are content-addressed: an identical fix, environment,
+        # rollout and set of templates always yields the same file, so reuse
+        # it instead of regenerating
+        tuning = bool(self.config.get('ansible_tuning', False))
+        key = hashlib.blake2b(json.dumps({
+            'error_pattern': fix.error_pattern,
+            'category': fix.category,
+            'severity': fix.severity,
+            'implementation_steps': fix.implementation_steps,
+            'environment': environment,
+            'rollout': [self.config.get(k) for k in ('strategy', 'serial_batch', 'max_fail_percentage')],
+            'ansible_tuning': tuning,
+            'templates': _TEMPLATE_DIGEST
+        }, sort_keys=True, default=str).encode(), digest_size=8).hexdigest()
+
+        playbook_path = self.ansible_dir / f"remediate_{fix.category}_{key}.yml"
+        if playbook_path.exists():
+            logger.info(f"Reusing playbook: {playbook_path}")
+            return playbook_path
+
         logger.info("Generating Ansible playbook")
 
         # Parse implementation steps
-        try:
-            steps = json.loads(fix['implementation_steps'])
-        except (json.JSONDecodeError, TypeError):
-            steps = [fix['implementation_steps']] if fix['implementation_steps'] else []
+        steps = list(_parse_steps(fix.implementation_steps or ''))
+
+        rollout = PRODUCTION_ROLLOUT if environment == 'production' else DEFAULT_ROLLOUT
+        strategy = self.config.get('strategy', rollout['strategy'])
+        if tuning and _mitogen_strategy_dir() is not None:
+            strategy = f"mitogen_{strategy}"
 
         # Create playbook structure
         playbook = {
-            'name': f"Remediate {fix['category']} - {fix['error_pattern']}",
+            'name': f"Remediate {fix.category} - {fix.error_pattern}",
             'hosts': self._get_target_hosts(environment),
+            'strategy': strategy,
+            'serial': self.config.get('serial_batch', rollout['serial']),
+            'max_fail_percentage': self.config.get('max_fail_percentage', rollout['max_fail_percentage']),
             'become': True,
             'vars': {
                 'environment': environment,
-                'issue_category': fix['category'],
-                'severity': fix['severity']
+                'issue_category': fix.category,
+                'severity': fix.severity
             },
             'tasks': []
         }
 
         # Add pre-check task
+        check_command = self._generate_check_command(fix)
         playbook['tasks'].append({
             'name': 'Pre-check: Verify issue exists',
-            'shell': self._generate_check_command(fix),
+            'shell': check_command,
             'register': 'pre_check',
             'ignore_errors': True
         })
 
         # Add remediation tasks based on category
-        if fix['category'].lower() == 'memory':
-            playbook['tasks'].extend(self._generate_memory_tasks(steps))
-        elif fix['category'].lower() == 'cpu':
-            playbook['tasks'].extend(self._generate_cpu_tasks(steps))
-        elif fix['category'].lower() == 'zombie':
-            playbook['tasks'].extend(self._generate_zombie_tasks(steps))
-        elif fix['category'].lower() == 'latency':
-            playbook['tasks'].extend(self._generate_latency_tasks(steps))
-        else:
-            playbook['tasks'].extend(self._generate_generic_tasks(steps))
+        generator = TASK_GENERATORS.get(fix.category.lower(), '_generate_generic_tasks')
+        playbook['tasks'].extend(getattr(self, generator)(steps))
 
         # Add post-check task
         playbook['tasks'].append({
             'name': 'Post-check: Verify fix applied',
-            'shell': self._generate_check_command(fix),
+            'shell': check_command,
             'register': 'post_check'
         })
 
-        # Save playbook
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        filename = f"remediate_{fix['category']}_{timestamp}.yml"
-        playbook_path = self.ansible_dir / filename
-
-        with open(playbook_path, 'w') as f:
-            yaml.dump([playbook], f, default_flow_style=False)
+        # Save playbook; atomically, since another remediation worker may be
+        # about to run the same cached path
+        _write_atomic(playbook_path, yaml.dump(
+            [playbook], Dumper=YamlDumper, default_flow_style=False,
+            sort_keys=False, allow_unicode=True, width=1 << 20))
 
         logger.info(f"Playbook saved: {playbook_path}")
         return playbook_path
 
     def _get_target_hosts(self, environment: str) -> str:
         """Get target hosts for environment"""
-        host_mapping = {
-            'dev': 'dev_servers',
-            'staging': 'staging_servers',
-            'production': 'prod_servers'
-        }
-        return host_mapping.get(environment, 'all')
+        return HOST_GROUPS.get(environment, 'all')
 
-    def _generate_check_command(self, fix: Dict[str, Any]) -> str:
+    def _generate_check_command(self, fix: FixRecord) -> str:
         """Generate command to check if issue exists"""
-        category = fix['category'].lower()
-
-        if category == 'memory':
-            return "free -m | awk '/Mem:/ {print $3/$2 * 100}'"
-        elif category == 'cpu':
-            return "top -bn1 | grep 'Cpu(s)' | awk '{print $2}'"
-        elif category == 'zombie':
-            return "ps aux | grep Z | wc -l"
-        else:
-            return "echo 'Manual verification required'"
+        return CHECK_COMMANDS.get(fix.category.lower(), DEFAULT_CHECK_COMMAND)
 
     def _generate_memory_tasks(self, steps: List[str]) -> List[Dict]:
         """Generate memory remediation tasks"""
-        return [
-            {
-                'name': 'Clear system caches',
-                'shell': 'sync && echo 3 > /proc/sys/vm/drop_caches',
-                'when': 'pre_check.stdout|float > 80'
-            },
-            {
-                'name': 'Restart high-memory services',
-                'systemd': {
-                    'name': '{{ item }}',
-                    'state': 'restarted'
-                },
-                'loop': ['application', 'cache-service'],
-                'ignore_errors': True
-            }
-        ]
+        return copy.deepcopy(list(MEMORY_TASKS))
 
     def _generate_cpu_tasks(self, steps: List[str]) -> List[Dict]:
         """Generate CPU remediation tasks"""
-        return [
-            {
-                'name': 'Identify high-CPU processes',
-                'shell': "ps aux --sort=-%cpu | head -n 10",
-                'register': 'high_cpu_procs'
-            },
-            {
-                'name': 'Adjust process priorities',
-                'shell': "renice +5 $(pgrep -f 'high-cpu-process')",
-                'ignore_errors': True
-            }
-        ]
+        return copy.deepcopy(list(CPU_TASKS))
 
     def _generate_zombie_tasks(self, steps: List[str]) -> List[Dict]:
         """Generate zombie process remediation tasks"""
-        return [
-            {
-                'name': 'Find zombie processes',
-                'shell': "ps aux | awk '$8==\"Z\" {print $2}'",
-                'register': 'zombies'
-            },
-            {
-                'name': 'Kill parent processes of zombies',
-                'shell': "kill -9 $(ps -A -ostat,ppid | awk '/[zZ]/{print $2}')",
-                'when': 'zombies.stdout != ""',
-                'ignore_errors': True
-            }
-        ]
+        return copy.deepcopy(list(ZOMBIE_TASKS))
 
     def _generate_latency_tasks(self, steps: List[str]) -> List[Dict]:
         """Generate latency remediation tasks"""
-        return [
-            {
-                'name': 'Check network latency',
-                'shell': 'ping -c 5 google.com | tail -1 | awk \'{print $4}\' | cut -d \'/\' -f 2',
-                'register': 'latency'
-            },
-            {
-                'name': 'Restart networking service',
-                'systemd': {
-                    'name': 'NetworkManager',
-                    'state': 'restarted'
-                },
-                'when': 'latency.stdout|float > 100'
-            }
-        ]
+        return copy.deepcopy(list(LATENCY_TASKS))
 
     def _generate_generic_tasks(self, steps: List[str]) -> List[Dict]:
         """Generate generic remediation tasks"""
-        tasks = []
+        if not steps:
+            return []
+
+        # One script task transfers and runs every step over a single
+        # connection instead of one SSH round-trip per step. Steps keep
+        # running after a failure, as they did as separate ignore_errors tasks
+        lines = ['#!/bin/bash']
         for idx, step in enumerate(steps, 1):
-            tasks.append({
-                'name': f'Step {idx}: {step[:50]}',
-                'shell': step,
-                'ignore_errors': True
-            })
-        return tasks
+            lines.append(f"echo {shlex.quote(f'==> Step {idx}: {step[:50]}')}")
+            lines.append(step)
+        script = '\n'.join(lines) + '\n'
+
+        digest = hashlib.blake2b(script.encode(), digest_size=8).hexdigest()
+        script_path = (self.ansible_dir / f"remediate_steps_{digest}.sh").resolve()
+        if not script_path.exists():
+            _write_atomic(script_path, script)
+
+        return [{
+            'name': f'Apply remediation script ({len(steps)} steps)',
+            'script': str(script_path),
+            'ignore_errors': True
+        }]
+
+    def _execute_ansible(self, playbook_path: Path, environment: str,
+                         dry_run_first: bool = True) -> str:
+        """
+        Execute Ansible playbook
+
+        Args:
+            playbook_path: Playbook to run
+            environment: Target environment
+            dry_run_first: Run with --check before the real run
 
-    def _execute_ansible(self, playbook_path: Path, environment: str) -> str:
-        """Execute Ansible playbook"""
+        Returns:
+            Execution log
+        """
         logger.info(f"Executing Ansible playbook: {playbook_path}")
 
         try:
+            env = _ansible_env(self.config.get('ansible_tuning', False))
+
             # Build ansible-playbook command
             cmd = [
                 'ansible-playbook',
                 str(playbook_path),
-                '-i', self._get_inventory_file(environment),
-                '--check',  # Dry run first
-                '-v'
+                '-i', self._get_inventory_file(environment)
             ]
 
-            # Execute dry run
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=300
-            )
-
-            if result.returncode != 0:
-                logger.warning(f"Dry run failed: {result.stderr}")
-                return f"Dry run failed:\n{result.stderr}"
-
-            # Execute actual run (remove --check)
-            cmd.remove('--check')
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=600
-            )
-
-            log = f"STDOUT:\n{result.stdout}\n\nSTDERR:\n{result.stderr}"
-
-            if result.returncode == 0:
+            if dry_run_first:
+                # Only the outcome of the --check run matters, not its output
+                returncode, errors = _run_quiet(cmd + ['--check'], timeout=300, env=env)
+
+                if returncode != 0:
+                    logger.warning(f"Dry run failed with exit code {returncode}: {errors}")
+                    return f"Dry run failed (exit code {returncode}):\n{errors}"
+
+            returncode, output = _run_streaming(cmd + ['-v'], timeout=600, env=env)
+
+            log = f"OUTPUT:\n{output}"
+
+            if returncode == 0:
                 logger.info("Ansible playbook executed successfully")
             else:
-                logger.error(f"Ansible playbook failed: {result.stderr}")
+                logger.error(f"Ansible playbook failed with exit code {returncode}")
 
             return log
 
@@ -364,7 +644,7 @@ class RemediationAgent:
         """Get Ansible inventory file for environment"""
         return f"ansible/inventory/{environment}.ini"
 
-    def _verify_remediation(self, fix: Dict[str, Any], environment: str) -> bool:
+    def _verify_remediation(self, fix: FixRecord, environment: str) -> bool:
         """Verify that remediation was successful"""
         logger.info("Verifying remediation")
 
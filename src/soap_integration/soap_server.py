@@ -8,16 +8,100 @@ Provides SOAP endpoints for:
 - Ansible agent coordination
 """
 
-from spyne import Application, rpc, ServiceBase, Integer, Unicode, Array, ComplexModel
+from spyne import Application, rpc, ServiceBase, Integer, Unicode, Iterable, ComplexModel
 from spyne.protocol.soap import Soap11
 from spyne.server.wsgi import WsgiApplication
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterator, Optional, Tuple
 import logging
+import logging.handlers
 import json
+import queue
+import secrets
+import threading
+
+from ..knowledge_base import EnhancedKnowledgeBase
+
+# Handler dependencies pull in docker/requests/ansible tooling; keep the
+# server (and health_check) usable when one of them is missing
+try:
+    from .remediation_agent import RemediationAgent
+except ImportError:
+    RemediationAgent = None
+
+try:
+    from .vulnerability_scanner import VulnerabilityScanner
+except ImportError:
+    VulnerabilityScanner = None
+
+try:
+    from .certificate_manager import CertificateManager
+except ImportError:
+    CertificateManager = None
+
+try:
+    from .container_manager import ContainerLifecycleManager
+except ImportError:
+    ContainerLifecycleManager = None
+
+try:
+    from waitress import serve
+    HAS_WAITRESS = True
+except ImportError:
+    HAS_WAITRESS = False
 
 logger = logging.getLogger(__name__)
 
+# Concurrent SOAP requests; remediations can hold a thread for minutes
+SERVER_THREADS = 16
+SERVER_CONNECTION_LIMIT = 200
+
+# Background remediations; auto_remediate returns before the playbook finishes
+REMEDIATION_WORKERS = 8
+MAX_TRACKED_REMEDIATIONS = 1000
+
+_REMEDIATION_EXECUTOR = ThreadPoolExecutor(max_workers=REMEDIATION_WORKERS,
+                                           thread_name_prefix='remediation')
+# request_id -> (submitted timestamp, future), oldest first
+_REMEDIATION_JOBS: 'OrderedDict[str, Tuple[str, Future]]' = OrderedDict()
+_REMEDIATION_JOBS_LOCK = threading.Lock()
+
+# Shared across SOAP requests; loading the knowledge base is the expensive part
+_KB = None
+_AGENT = None
+_SINGLETON_LOCK = threading.Lock()
+
+
+def _get_kb() -> EnhancedKnowledgeBase:
+    """Get the process-wide knowledge base, loading it on first use"""
+    global _KB
+    if _KB is None:
+        with _SINGLETON_LOCK:
+            if _KB is None:
+                _KB = EnhancedKnowledgeBase()
+    return _KB
+
+
+def _require(component, name: str):
+    """Return an optional handler dependency, failing clearly if it is missing"""
+    if component is None:
+        raise ImportError(f"{name} is unavailable; install the SOAP integration dependencies")
+    return component
+
+
+def _get_agent():
+    """Get the process-wide remediation agent, sharing the knowledge base"""
+    global _AGENT
+    if _AGENT is None:
+        _require(RemediationAgent, 'RemediationAgent')
+        kb = _get_kb()
+        with _SINGLETON_LOCK:
+            if _AGENT is None:
+                _AGENT = RemediationAgent(kb=kb)
+    return _AGENT
+
 
 # Complex Types for SOAP
 class Fix(ComplexModel):
@@ -34,6 +118,57 @@ class Fix(ComplexModel):
     last_updated = Unicode
 
 
+def _iter_fixes(records) -> Iterator[Fix]:
+    """
+    Lazily convert knowledge base rows (see EnhancedKnowledgeBase.search_records) to Fix objects
+
+    Spyne serializes Iterable returns as it consumes them, so only one Fix is
+    alive at a time instead of the whole result set.
+    """
+    for row in records:
+        get = row.get
+        fix = Fix()
+        fix.error_pattern = str(get('Error_Pattern', ''))
+        fix.category = str(get('Category', ''))
+        fix.severity = str(get('Severity', ''))
+        fix.solution = str(get('Solution', ''))
+        fix.implementation_steps = str(get('Implementation_Steps', ''))
+        fix.automation_script = ''  # Generated on demand
+        fix.confidence = str(get('Confidence', ''))
+        fix.last_updated = str(get('Last_Updated', ''))
+        yield fix
+
+
+def _run_remediation(issue_id: str, environment: str, auto_approve: bool,
+                     notification_email: Optional[str]) -> Dict[str, Any]:
+    """Execute a remediation and send its notification (runs on the worker pool)"""
+    agent = _get_agent()
+
+    execution_result = agent.execute_remediation(
+        issue_id=issue_id,
+        environment=environment,
+        auto_approve=auto_approve
+    )
+
+    # Send notification if email provided
+    if notification_email:
+        agent.send_notification(notification_email, execution_result)
+
+    return execution_result
+
+
+def _track_remediation(request_id: str, timestamp: str, future: Future):
+    """Remember a submitted remediation, forgetting the oldest finished ones"""
+    with _REMEDIATION_JOBS_LOCK:
+        _REMEDIATION_JOBS[request_id] = (timestamp, future)
+
+        for old_id in list(_REMEDIATION_JOBS):
+            if len(_REMEDIATION_JOBS) <= MAX_TRACKED_REMEDIATIONS:
+                break
+            if _REMEDIATION_JOBS[old_id][1].done():
+                del _REMEDIATION_JOBS[old_id]
+
+
 class RemediationRequest(ComplexModel):
     """Request for auto-remediation"""
     __namespace__ = "sponge.rca"
@@ -69,10 +204,24 @@ class Vulnerability(ComplexModel):
     remediation_steps = Unicode
 
 
+def _iter_vulnerabilities(scan_results) -> Iterator[Vulnerability]:
+    """Lazily convert VulnerabilityScanner results to Vulnerability objects"""
+    for vuln_data in scan_results:
+        vuln = Vulnerability()
+        vuln.vuln_id = vuln_data['id']
+        vuln.severity = vuln_data['severity']
+        vuln.cve_id = vuln_data.get('cve_id', '')
+        vuln.description = vuln_data['description']
+        vuln.affected_component = vuln_data['component']
+        vuln.fix_available = str(vuln_data['fix_available'])
+        vuln.remediation_steps = json.dumps(vuln_data.get('remediation', []))
+        yield vuln
+
+
 class SpongeSOAPService(ServiceBase):
     """Main SOAP service for Sponge RCA Tool"""
 
-    @rpc(Unicode, _returns=Array(Fix))
+    @rpc(Unicode, _returns=Iterable(Fix))
     def get_fixes_by_category(ctx, category):
         """
         Get all fixes for a specific category
@@ -83,35 +232,20 @@ class SpongeSOAPService(ServiceBase):
         Returns:
             Array of Fix objects
         """
-        logger.info(f"SOAP request: get_fixes_by_category({category})")
+        logger.info("SOAP request: get_fixes_by_category(%s)", category)
 
         try:
-            from src.knowledge_base import EnhancedKnowledgeBase
-
-            kb = EnhancedKnowledgeBase()
-            results = kb.search({'categories': [category]})
-
-            fixes = []
-            for _, row in results.iterrows():
-                fix = Fix()
-                fix.error_pattern = str(row.get('Error_Pattern', ''))
-                fix.category = str(row.get('Category', ''))
-                fix.severity = str(row.get('Severity', ''))
-                fix.solution = str(row.get('Solution', ''))
-                fix.implementation_steps = str(row.get('Implementation_Steps', ''))
-                fix.automation_script = ''  # Generated on demand
-                fix.confidence = str(row.get('Confidence', ''))
-                fix.last_updated = str(row.get('Last_Updated', ''))
-                fixes.append(fix)
-
-            logger.info(f"Returning {len(fixes)} fixes")
-            return fixes
+            kb = _get_kb()
+            records = kb.search_records({'categories': [category]})
+
+            logger.info("Returning %d fixes", len(records))
+            return _iter_fixes(records)
 
         except Exception as e:
-            logger.error(f"Error getting fixes: {e}")
+            logger.error("Error getting fixes: %s", e)
             return []
 
-    @rpc(Unicode, _returns=Array(Fix))
+    @rpc(Unicode, _returns=Iterable(Fix))
     def get_critical_fixes(ctx, min_confidence):
         """
         Get all critical fixes above confidence threshold
@@ -122,34 +256,20 @@ class SpongeSOAPService(ServiceBase):
         Returns:
             Array of critical Fix objects
         """
-        logger.info(f"SOAP request: get_critical_fixes({min_confidence})")
+        logger.info("SOAP request: get_critical_fixes(%s)", min_confidence)
 
         try:
-            from src.knowledge_base import EnhancedKnowledgeBase
-
-            kb = EnhancedKnowledgeBase()
-            results = kb.search({
+            kb = _get_kb()
+            records = kb.search_records({
                 'severities': ['critical'],
                 'min_confidence': float(min_confidence),
                 'has_solution': True
             })
 
-            fixes = []
-            for _, row in results.iterrows():
-                fix = Fix()
-                fix.error_pattern = str(row.get('Error_Pattern', ''))
-                fix.category = str(row.get('Category', ''))
-                fix.severity = str(row.get('Severity', ''))
-                fix.solution = str(row.get('Solution', ''))
-                fix.implementation_steps = str(row.get('Implementation_Steps', ''))
-                fix.confidence = str(row.get('Confidence', ''))
-                fix.last_updated = str(row.get('Last_Updated', ''))
-                fixes.append(fix)
-
-            return fixes
+            return _iter_fixes(records)
 
         except Exception as e:
-            logger.error(f"Error getting critical fixes: {e}")
+            logger.error("Error getting critical fixes: %s", e)
             return []
 
     @rpc(RemediationRequest, _returns=RemediationResult)
@@ -163,43 +283,79 @@ class SpongeSOAPService(ServiceBase):
         Returns:
             RemediationResult with execution status
         """
-        logger.info(f"SOAP request: auto_remediate({request.issue_id})")
+        logger.info("SOAP request: auto_remediate(%s)", request.issue_id)
 
         result = RemediationResult()
-        result.request_id = f"REM-{datetime.now().strftime('%Y%m%d%H%M%S')}"
+        # Random ids cannot collide when two requests land in the same second
+        result.request_id = f"REM-{secrets.token_hex(8)}"
         result.timestamp = datetime.now().isoformat()
 
         try:
-            # Import remediation agent
-            from src.soap_integration.remediation_agent import RemediationAgent
+            # Ansible runs can take minutes; run them in the background and
+            # let the caller poll get_remediation_status(request_id)
+            future = _REMEDIATION_EXECUTOR.submit(
+                _run_remediation,
+                request.issue_id,
+                request.environment,
+                (request.auto_approve or '').lower() == 'true',
+                request.notification_email
+            )
+            _track_remediation(result.request_id, result.timestamp, future)
 
-            agent = RemediationAgent()
+            result.status = 'pending'
+            result.message = 'Remediation queued'
+            return result
 
-            # Execute remediation
-            execution_result = agent.execute_remediation(
-                issue_id=request.issue_id,
-                environment=request.environment,
-                auto_approve=(request.auto_approve.lower() == 'true')
-            )
+        except Exception as e:
+            logger.error("Auto-remediation failed: %s", e)
+            result.status = 'failed'
+            result.message = str(e)
+            return result
+
+    @rpc(Unicode, _returns=RemediationResult)
+    def get_remediation_status(ctx, request_id):
+        """
+        Get the status of a remediation started by auto_remediate
+
+        Args:
+            request_id: Request ID returned by auto_remediate
 
+        Returns:
+            RemediationResult with current execution status
+        """
+        result = RemediationResult()
+        result.request_id = request_id
+
+        with _REMEDIATION_JOBS_LOCK:
+            job = _REMEDIATION_JOBS.get(request_id)
+
+        if job is None:
+            result.status = 'failed'
+            result.message = f"Unknown request: {request_id}"
+            return result
+
+        result.timestamp, future = job
+
+        if not future.done():
+            result.status = 'pending'
+            result.message = 'Remediation running' if future.running() else 'Remediation queued'
+            return result
+
+        try:
+            execution_result = future.result()
             result.status = execution_result['status']
             result.message = execution_result['message']
             result.ansible_playbook_path = execution_result.get('playbook_path', '')
             result.execution_log = execution_result.get('log', '')
 
-            # Send notification if email provided
-            if request.notification_email:
-                agent.send_notification(request.notification_email, execution_result)
-
-            return result
-
         except Exception as e:
-            logger.error(f"Auto-remediation failed: {e}")
+            logger.error("Auto-remediation failed: %s", e)
             result.status = 'failed'
             result.message = str(e)
-            return result
 
-    @rpc(Unicode, _returns=Array(Vulnerability))
+        return result
+
+    @rpc(Unicode, _returns=Iterable(Vulnerability))
     def scan_vulnerabilities(ctx, target_environment):
         """
         Scan for vulnerabilities in target environment
@@ -210,30 +366,16 @@ class SpongeSOAPService(ServiceBase):
         Returns:
             Array of detected vulnerabilities
         """
-        logger.info(f"SOAP request: scan_vulnerabilities({target_environment})")
+        logger.info("SOAP request: scan_vulnerabilities(%s)", target_environment)
 
         try:
-            from src.soap_integration.vulnerability_scanner import VulnerabilityScanner
-
-            scanner = VulnerabilityScanner()
+            scanner = _require(VulnerabilityScanner, 'VulnerabilityScanner')()
             scan_results = scanner.scan_environment(target_environment)
 
-            vulnerabilities = []
-            for vuln_data in scan_results:
-                vuln = Vulnerability()
-                vuln.vuln_id = vuln_data['id']
-                vuln.severity = vuln_data['severity']
-                vuln.cve_id = vuln_data.get('cve_id', '')
-                vuln.description = vuln_data['description']
-                vuln.affected_component = vuln_data['component']
-                vuln.fix_available = str(vuln_data['fix_available'])
-                vuln.remediation_steps = json.dumps(vuln_data.get('remediation', []))
-                vulnerabilities.append(vuln)
-
-            return vulnerabilities
+            return _iter_vulnerabilities(scan_results)
 
         except Exception as e:
-            logger.error(f"Vulnerability scan failed: {e}")
+            logger.error("Vulnerability scan failed: %s", e)
             return []
 
     @rpc(Unicode, Unicode, _returns=Unicode)
@@ -248,18 +390,16 @@ class SpongeSOAPService(ServiceBase):
         Returns:
             Status message
         """
-        logger.info(f"SOAP request: update_certificates({domain}, {cert_type})")
+        logger.info("SOAP request: update_certificates(%s, %s)", domain, cert_type)
 
         try:
-            from src.soap_integration.certificate_manager import CertificateManager
-
-            manager = CertificateManager()
+            manager = _require(CertificateManager, 'CertificateManager')()
             result = manager.renew_certificate(domain, cert_type)
 
             return f"Certificate renewed: {result['status']}"
 
         except Exception as e:
-            logger.error(f"Certificate renewal failed: {e}")
+            logger.error("Certificate renewal failed: %s", e)
             return f"Failed: {str(e)}"
 
     @rpc(Unicode, _returns=Unicode)
@@ -273,18 +413,16 @@ class SpongeSOAPService(ServiceBase):
         Returns:
             Status message
         """
-        logger.info(f"SOAP request: restart_containers({container_pattern})")
+        logger.info("SOAP request: restart_containers(%s)", container_pattern)
 
         try:
-            from src.soap_integration.container_manager import ContainerLifecycleManager
-
-            manager = ContainerLifecycleManager()
+            manager = _require(ContainerLifecycleManager, 'ContainerLifecycleManager')()
             result = manager.restart_containers(container_pattern)
 
             return f"Restarted {result['count']} containers"
 
         except Exception as e:
-            logger.error(f"Container restart failed: {e}")
+            logger.error("Container restart failed: %s", e)
             return f"Failed: {str(e)}"
 
     @rpc(_returns=Unicode)
@@ -305,19 +443,77 @@ def create_soap_app():
     return application
 
 
+def create_wsgi_app():
+    """
+    Create the WSGI application
+
+    Importable by external WSGI servers, e.g.
+    gunicorn 'src.soap_integration.soap_server:create_wsgi_app()' -k gthread --threads 8 --timeout 900
+    """
+    return WsgiApplication(create_soap_app())
+
+
+def _start_log_listener() -> logging.handlers.QueueListener:
+    """
+    Route root logging through a queue so request threads never block on log I/O
+
+    The root logger's existing handlers (or a StreamHandler if there are none)
+    are moved onto a background QueueListener.
+
+    Returns:
+        Started listener, to be passed to _stop_log_listener on shutdown
+    """
+    root = logging.getLogger()
+    handlers = root.handlers[:] or [logging.StreamHandler()]
+    log_queue = queue.Queue(-1)
+
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+
+    listener = logging.handlers.QueueListener(log_queue, *handlers,
+                                              respect_handler_level=True)
+    listener.start()
+    return listener
+
+
+def _stop_log_listener(listener: logging.handlers.QueueListener):
+    """Flush queued records and hand the handlers back to the root logger"""
+    listener.stop()
+
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        if isinstance(handler, logging.handlers.QueueHandler):
+            root.removeHandler(handler)
+    for handler in listener.handlers:
+        root.addHandler(handler)
+
+
 def run_soap_server(host='0.0.0.0', port=8001):
     """Run SOAP server"""
-    from wsgiref.simple_server import make_server
+    wsgi_app = create_wsgi_app()
+    listener = _start_log_listener()
+
+    logger.info("SOAP server running on http://%s:%s", host, port)
+    logger.info("WSDL available at http://%s:%s/?wsdl", host, port)
 
-    application = create_soap_app()
-    wsgi_app = WsgiApplication(application)
+    try:
+        if HAS_WAITRESS:
+            serve(wsgi_app, host=host, port=port, threads=SERVER_THREADS,
+                  connection_limit=SERVER_CONNECTION_LIMIT)
+            return
 
-    server = make_server(host, port, wsgi_app)
+        # Fall back to the reference server, handling each request on its own thread
+        from socketserver import ThreadingMixIn
+        from wsgiref.simple_server import WSGIServer, make_server
 
-    logger.info(f"SOAP server running on http://{host}:{port}")
-    logger.info(f"WSDL available at http://{host}:{port}/?wsdl")
+        class ThreadingWSGIServer(ThreadingMixIn, WSGIServer):
+            daemon_threads = True
 
-    server.serve_forever()
+        server = make_server(host, port, wsgi_app, server_class=ThreadingWSGIServer)
+        server.serve_forever()
+    finally:
+        _stop_log_listener(listener)
 
 
 if __name__ == '__main__':
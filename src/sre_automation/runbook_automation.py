@@ -5,18 +5,253 @@ Automatically executes runbooks in response to alerts to remediate
 common issues without human intervention.
 """
 
+import asyncio
+import os
+import selectors
+import shlex
+import shutil
 import subprocess
+import sys
 import json
 import logging
-from typing import Dict, List, Optional, Any, Callable
-from dataclasses import dataclass, asdict
+import time
+from collections import deque
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Any, Callable, Tuple
+from dataclasses import dataclass, asdict, field
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
+import requests
+from requests.adapters import HTTPAdapter, Retry
 import yaml
 import re
 
 logger = logging.getLogger(__name__)
 
+# libyaml's C parser/emitter when available; runbooks only hold plain data
+YamlLoader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+YamlDumper = getattr(yaml, 'CSafeDumper', yaml.SafeDumper)
+
+# Runbook files parsed concurrently at startup (file reads dominate)
+LOAD_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+# Runbook results kept in memory per executor
+HISTORY_SIZE = 1000
+
+# Bytes of stdout/stderr kept per command step (the tail, used for success criteria)
+MAX_OUTPUT_BYTES = 1 << 20
+
+# Seconds each rollback action may run before it is killed
+ROLLBACK_TIMEOUT = 60
+
+# Connection pooling for api_call steps; retries cover connection errors on
+# idempotent methods only
+API_POOL_CONNECTIONS = 16
+API_POOL_MAXSIZE = 32
+API_MAX_RETRIES = 2
+
+# Characters that need /bin/sh (pipes, redirects, expansion, globbing, ...)
+_SHELL_METACHARS = re.compile(r"[|&;<>$`*?\[\](){}~#!\\\n]")
+
+# Printed after each command of a fused step, to split its output per step
+FUSION_SENTINEL = "\x1esponge-step-done\x1e"
+_FUSION_SENTINEL_BYTES = FUSION_SENTINEL.encode()
+
+# Rollback actions that only echo a message (e.g. "echo 'No rollback needed'")
+_NOOP_ROLLBACK_RE = re.compile(r"""echo(\s+('[^']*'|"[^"$`\\]*"|[^\s;&|<>$`'"()\\]+))*\s*""")
+
+# Characters that make a success_criteria pattern more than a literal
+_REGEX_METACHARS = re.compile(r"[.\\^$*+?()\[\]{}|]")
+
+# {{variable}} placeholders in step actions
+_VAR_RE = re.compile(r"\{\{(\w+)\}\}")
+
+
+@lru_cache(maxsize=512)
+def _compile_criteria(criteria: str) -> 're.Pattern':
+    """Compile a step's success_criteria regex once per distinct pattern"""
+    return re.compile(criteria)
+
+
+@lru_cache(maxsize=512)
+def _criteria_matcher(criteria: str) -> Callable[[str], bool]:
+    """
+    Build the check for a success_criteria pattern
+
+    Patterns without regex metacharacters (e.g. "healthy") are matched with a
+    plain substring search instead of the regex engine.
+
+    Raises:
+        re.error: If the pattern is not a valid regex
+    """
+    if not _REGEX_METACHARS.search(criteria):
+        return lambda output: criteria in output
+
+    pattern = _compile_criteria(criteria)
+    return lambda output: pattern.search(output) is not None
+
+
+@lru_cache(maxsize=1024)
+def _split_command(command: str) -> Optional[Tuple[str, ...]]:
+    """
+    Split a command that needs no shell features into argv
+
+    Returns:
+        argv tuple, or None if the command must run through the shell
+        (metacharacters, variable assignments, builtins, unbalanced quotes)
+    """
+    if _SHELL_METACHARS.search(command):
+        return None
+
+    try:
+        argv = shlex.split(command)
+    except ValueError:
+        return None
+
+    if not argv or '=' in argv[0] or shutil.which(argv[0]) is None:
+        return None
+    return tuple(argv)
+
+
+def _public_fields(items: List[Tuple[str, Any]]) -> Dict[str, Any]:
+    """asdict() factory dropping derived fields (leading underscore)"""
+    return {key: value for key, value in items if not key.startswith('_')}
+
+
+def _is_fusable(step: 'RunbookStep') -> bool:
+    """Plain command step whose outcome nothing else depends on"""
+    return (step.action_type == 'command' and not step.success_criteria
+            and not step.rollback_action and not step.parallel_group)
+
+
+def _fuse_commands(steps: List['RunbookStep']) -> List['RunbookStep']:
+    """
+    Merge runs of adjacent fusable command steps into single shell invocations
+
+    Each command runs in its own subshell, followed by FUSION_SENTINEL so the
+    executor can report per-step results from the combined output.
+    """
+    plan = []
+    run: List[RunbookStep] = []
+
+    def flush():
+        if len(run) == 1:
+            plan.append(run[0])
+        elif run:
+            fused = RunbookStep(
+                name="fused: " + "+".join(step.name for step in run),
+                action_type='command',
+                action=" && ".join(
+                    f"(\n{step.action}\n) && printf '%s' '{FUSION_SENTINEL}'" for step in run
+                ),
+                timeout=sum(step.timeout for step in run),
+                retry_count=run[0].retry_count
+            )
+            fused._fused_steps = tuple(run)
+            plan.append(fused)
+        run.clear()
+
+    for step in steps:
+        if run and not (_is_fusable(step) and step.retry_count == run[0].retry_count):
+            flush()
+        if _is_fusable(step):
+            run.append(step)
+        else:
+            plan.append(step)
+    flush()
+
+    return plan
+
+
+def _precompile(step: 'RunbookStep'):
+    """
+    Warm the per-pattern caches a step hits on execution
+
+    Raises:
+        re.error: If the step's success_criteria is not a valid regex
+    """
+    if step.action_type == 'command' and not step._has_placeholders:
+        _split_command(step.action)
+    if step.success_criteria:
+        _criteria_matcher(step.success_criteria)
+
+
+def _run_capped(args, shell: bool, timeout: float,
+                max_bytes: int = MAX_OUTPUT_BYTES,
+                marker: Optional[bytes] = None) -> Tuple[int, str, str, int]:
+    """
+    Run a command keeping only the last max_bytes of its stdout and stderr
+
+    Both pipes are drained through one selector as output arrives, so a chatty
+    command cannot grow memory without bound.
+
+    Args:
+        marker: Byte string to count in stdout as it streams, before any
+            truncation
+
+    Returns:
+        Tuple of (return code, stdout tail, stderr tail, marker count)
+
+    Raises:
+        subprocess.TimeoutExpired: If the command runs past the timeout
+    """
+    proc = subprocess.Popen(args, shell=shell, stdout=subprocess.PIPE,
+                            stderr=subprocess.PIPE, bufsize=0)
+    buffers = {proc.stdout: bytearray(), proc.stderr: bytearray()}
+    deadline = time.monotonic() + timeout
+    markers = 0
+    # Unmatched end of the previous stdout chunk, for markers split across reads
+    carry = b''
+
+    try:
+        with selectors.DefaultSelector() as selector:
+            for pipe in buffers:
+                selector.register(pipe, selectors.EVENT_READ)
+
+            while selector.get_map():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise subprocess.TimeoutExpired(args, timeout)
+
+                for key, _ in selector.select(remaining):
+                    chunk = os.read(key.fd, 1 << 16)
+                    if not chunk:
+                        selector.unregister(key.fileobj)
+                        continue
+
+                    if marker and key.fileobj is proc.stdout:
+                        window = carry + chunk
+                        markers += window.count(marker)
+                        carry = window[-(len(marker) - 1):] if len(marker) > 1 else b''
+
+                    buffer = buffers[key.fileobj]
+                    buffer += chunk
+                    if len(buffer) > max_bytes:
+                        del buffer[:len(buffer) - max_bytes]
+
+        returncode = proc.wait(timeout=max(0.0, deadline - time.monotonic()))
+
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        proc.wait()
+        raise
+    finally:
+        proc.stdout.close()
+        proc.stderr.close()
+
+    return (returncode,
+            buffers[proc.stdout].decode(errors='replace'),
+            buffers[proc.stderr].decode(errors='replace'),
+            markers)
+
+
+@lru_cache(maxsize=256)
+def _parse_api_body(raw: str) -> Any:
+    """Parse an api_call step's JSON body once per distinct body"""
+    return json.loads(raw)
+
 
 @dataclass
 class RunbookStep:
@@ -28,6 +263,21 @@ class RunbookStep:
     retry_count: int = 3
     success_criteria: Optional[str] = None
     rollback_action: Optional[str] = None
+    parallel_group: Optional[str] = None  # consecutive steps sharing a group run concurrently
+
+    # Derived from action when the step is created
+    _has_placeholders: bool = field(default=False, init=False, repr=False, compare=False)
+    _rollback_is_noop: bool = field(default=False, init=False, repr=False, compare=False)
+    # Original steps merged into this one by _fuse_commands
+    _fused_steps: Tuple['RunbookStep', ...] = field(default=(), init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        # action_type comes from a handful of literals; share one string object each
+        self.action_type = sys.intern(self.action_type)
+        self._has_placeholders = "{{" in self.action
+        self._rollback_is_noop = bool(
+            self.rollback_action and _NOOP_ROLLBACK_RE.fullmatch(self.rollback_action)
+        )
 
 
 @dataclass
@@ -40,6 +290,7 @@ class RunbookResult:
     execution_time: float
     output: List[Dict[str, Any]]
     error_message: Optional[str] = None
+    started_at: Optional[datetime] = None  # wall-clock start, for auditing
 
 
 class RunbookEngine:
@@ -47,35 +298,80 @@ class RunbookEngine:
     Engine for defining and managing runbooks
     """
 
-    def __init__(self, runbooks_dir: str = "data/runbooks"):
+    def __init__(self, runbooks_dir: str = "data/runbooks", enable_fusion: bool = False):
+        """
+        Args:
+            runbooks_dir: Directory holding runbook YAML files
+            enable_fusion: Run adjacent plain command steps in one shell process
+                (a timeout then retries the whole fused block)
+        """
         self.runbooks_dir = Path(runbooks_dir)
         self.runbooks_dir.mkdir(parents=True, exist_ok=True)
         self.runbooks: Dict[str, List[RunbookStep]] = {}
+        self.enable_fusion = enable_fusion
+        # runbook name -> (steps the plan was built from, plan)
+        self._plans: Dict[str, Tuple[List[RunbookStep], List[RunbookStep]]] = {}
         self._load_runbooks()
 
+    def _validate_steps(self, runbook_name: str, steps: List[RunbookStep]):
+        """Precompile steps, logging invalid success criteria at load time"""
+        for step in steps:
+            try:
+                _precompile(step)
+            except re.error as e:
+                logger.error(f"Invalid success_criteria in {runbook_name}/{step.name}: {e}")
+
+    def _parse_runbook_file(self, runbook_file: Path):
+        """
+        Parse one runbook YAML file
+
+        Returns:
+            Tuple of (runbook name, steps)
+        """
+        with open(runbook_file, 'r') as f:
+            data = yaml.load(f, Loader=YamlLoader)
+
+        runbook_name = data.get('name', runbook_file.stem)
+        steps = [
+            RunbookStep(
+                name=step['name'],
+                action_type=step['action_type'],
+                action=step['action'],
+                timeout=step.get('timeout', 300),
+                retry_count=step.get('retry_count', 3),
+                success_criteria=step.get('success_criteria'),
+                rollback_action=step.get('rollback_action'),
+                parallel_group=step.get('parallel_group')
+            )
+            for step in data.get('steps', [])
+        ]
+        return runbook_name, steps
+
     def _load_runbooks(self):
         """Load runbooks from YAML files"""
-        for runbook_file in self.runbooks_dir.glob("*.yaml"):
+        runbook_files = sorted(self.runbooks_dir.glob("*.yaml"))
+        if not runbook_files:
+            return
+
+        def parse(runbook_file):
             try:
-                with open(runbook_file, 'r') as f:
-                    data = yaml.safe_load(f)
-                    runbook_name = data.get('name', runbook_file.stem)
-                    steps = [
-                        RunbookStep(
-                            name=step['name'],
-                            action_type=step['action_type'],
-                            action=step['action'],
-                            timeout=step.get('timeout', 300),
-                            retry_count=step.get('retry_count', 3),
-                            success_criteria=step.get('success_criteria'),
-                            rollback_action=step.get('rollback_action')
-                        )
-                        for step in data.get('steps', [])
-                    ]
-                    self.runbooks[runbook_name] = steps
-                    logger.info(f"Loaded runbook: {runbook_name} with {len(steps)} steps")
+                return runbook_file, self._parse_runbook_file(runbook_file), None
             except Exception as e:
-                logger.error(f"Failed to load runbook {runbook_file}: {e}")
+                return runbook_file, None, e
+
+        with ThreadPoolExecutor(max_workers=min(LOAD_WORKERS, len(runbook_files))) as pool:
+            parsed = list(pool.map(parse, runbook_files))
+
+        # Merge on this thread so self.runbooks is never mutated concurrently
+        for runbook_file, runbook, error in parsed:
+            if error is not None:
+                logger.error(f"Failed to load runbook {runbook_file}: {error}")
+                continue
+
+            runbook_name, steps = runbook
+            self._validate_steps(runbook_name, steps)
+            self.runbooks[runbook_name] = steps
+            logger.info(f"Loaded runbook: {runbook_name} with {len(steps)} steps")
 
     def create_runbook(self,
                        name: str,
@@ -99,24 +395,18 @@ class RunbookEngine:
                 'name': name,
                 'description': description,
                 'triggers': triggers or [],
-                'steps': [
-                    {
-                        'name': step.name,
-                        'action_type': step.action_type,
-                        'action': step.action,
-                        'timeout': step.timeout,
-                        'retry_count': step.retry_count,
-                        'success_criteria': step.success_criteria,
-                        'rollback_action': step.rollback_action
-                    }
-                    for step in steps
-                ]
+                'steps': [asdict(step, dict_factory=_public_fields) for step in steps]
             }
 
+            # Write a temp file and rename it, so loaders never see a partial runbook
             runbook_path = self.runbooks_dir / f"{name}.yaml"
-            with open(runbook_path, 'w') as f:
-                yaml.dump(runbook_data, f, default_flow_style=False)
+            tmp_path = runbook_path.with_suffix('.yaml.tmp')
+            with open(tmp_path, 'w') as f:
+                yaml.dump(runbook_data, f, Dumper=YamlDumper,
+                          default_flow_style=False, sort_keys=False)
+            os.replace(tmp_path, runbook_path)
 
+            self._validate_steps(name, steps)
             self.runbooks[name] = steps
             logger.info(f"Created runbook: {name}")
             return True
@@ -129,6 +419,18 @@ class RunbookEngine:
         """Get runbook by name"""
         return self.runbooks.get(name)
 
+    def get_execution_plan(self, name: str) -> Optional[List[RunbookStep]]:
+        """Get runbook steps as executed (fused when enable_fusion is set)"""
+        steps = self.runbooks.get(name)
+        if not steps or not self.enable_fusion:
+            return steps
+
+        cached = self._plans.get(name)
+        if cached is None or cached[0] is not steps:
+            cached = (steps, _fuse_commands(steps))
+            self._plans[name] = cached
+        return cached[1]
+
     def list_runbooks(self) -> List[str]:
         """List all available runbooks"""
         return list(self.runbooks.keys())
@@ -139,10 +441,51 @@ class RunbookExecutor:
     Executes runbooks for auto-remediation
     """
 
-    def __init__(self, engine: RunbookEngine, dry_run: bool = False):
+    def __init__(self, engine: RunbookEngine, dry_run: bool = False,
+                 history_size: int = HISTORY_SIZE,
+                 history_sink: Optional[Callable[[RunbookResult], None]] = None,
+                 dedupe_rollback: bool = True):
+        """
+        Args:
+            engine: Engine providing the runbooks
+            dry_run: Log steps instead of executing them
+            history_size: Number of recent results kept in memory
+            history_sink: Called with each result about to be evicted from the
+                history, e.g. to persist a full audit trail
+            dedupe_rollback: Run each distinct rollback command only once
+        """
         self.engine = engine
         self.dry_run = dry_run
-        self.execution_history: List[RunbookResult] = []
+        self.execution_history: deque = deque(maxlen=history_size)
+        self.history_sink = history_sink
+        self.dedupe_rollback = dedupe_rollback
+        # runbook name -> (plan the groups were built from, step groups)
+        self._compiled: Dict[str, Tuple[List[RunbookStep], List[List[RunbookStep]]]] = {}
+
+        # action_type -> handler(action, step) returning success/output/error
+        self._dispatch: Dict[str, Callable[[str, RunbookStep], Dict[str, Any]]] = {
+            'command': lambda action, step: self._execute_command(
+                action, step.timeout, step.retry_count,
+                marker=_FUSION_SENTINEL_BYTES if step._fused_steps else None),
+            'script': lambda action, step: self._execute_script(action, step.timeout),
+            'wait': lambda action, step: self._execute_wait(action),
+            # API call format: METHOD URL [body]
+            'api_call': lambda action, step: self._execute_api_call(action),
+        }
+
+        # Keep-alive session shared by every api_call step
+        self._http = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=API_POOL_CONNECTIONS,
+            pool_maxsize=API_POOL_MAXSIZE,
+            max_retries=Retry(total=API_MAX_RETRIES, backoff_factor=0.2, raise_on_status=False)
+        )
+        self._http.mount("http://", adapter)
+        self._http.mount("https://", adapter)
+
+    def close(self):
+        """Close pooled HTTP connections"""
+        self._http.close()
 
     def execute(self,
                 runbook_name: str,
@@ -157,10 +500,11 @@ class RunbookExecutor:
         Returns:
             RunbookResult with execution details
         """
-        start_time = datetime.now()
+        started_at = datetime.now()
+        start = time.perf_counter()
         context = context or {}
 
-        runbook = self.engine.get_runbook(runbook_name)
+        runbook = self.engine.get_execution_plan(runbook_name)
         if not runbook:
             logger.error(f"Runbook not found: {runbook_name}")
             return RunbookResult(
@@ -179,30 +523,38 @@ class RunbookExecutor:
         steps_executed = 0
         steps_failed = 0
         rollback_actions = []
-
-        for i, step in enumerate(runbook):
-            logger.info(f"Step {i+1}/{len(runbook)}: {step.name}")
-
-            step_result = self._execute_step(step, context)
-            output.append(step_result)
-            steps_executed += 1
-
-            if step_result['success']:
-                # Store rollback action if provided
-                if step.rollback_action:
-                    rollback_actions.append(step.rollback_action)
-            else:
-                steps_failed += 1
-                logger.error(f"Step failed: {step.name}")
-
-                # Execute rollback if step failed
+        error_message = None
+
+        step_number = 0
+        for group in self._compile(runbook_name, runbook):
+            for step in group:
+                for original in step._fused_steps or (step,):
+                    step_number += 1
+                    logger.info(f"Step {step_number}/{len(runbook)}: {original.name}")
+
+            for step, step_result in self._execute_group(group, context):
+                output.append(step_result)
+                steps_executed += 1
+
+                if step_result['success']:
+                    # Store rollback action if provided (echo-only placeholders need no process)
+                    if step.rollback_action and not step._rollback_is_noop:
+                        rollback_actions.append((step.rollback_action, step.parallel_group))
+                else:
+                    if steps_failed == 0:
+                        error_message = step_result['error']
+                    steps_failed += 1
+                    logger.error(f"Step failed: {step.name}")
+
+            if steps_failed:
+                # Execute rollback if a step failed
                 if rollback_actions:
                     logger.info("Executing rollback actions...")
                     self._execute_rollback(rollback_actions)
 
                 break
 
-        execution_time = (datetime.now() - start_time).total_seconds()
+        execution_time = time.perf_counter() - start
 
         result = RunbookResult(
             runbook_name=runbook_name,
@@ -211,14 +563,90 @@ class RunbookExecutor:
             steps_failed=steps_failed,
             execution_time=execution_time,
             output=output,
-            error_message=output[-1]['error'] if steps_failed > 0 else None
+            error_message=error_message,
+            started_at=started_at
         )
 
-        self.execution_history.append(result)
+        self._record_history(result)
         logger.info(f"Runbook execution completed: {runbook_name} - Success: {result.success}")
 
         return result
 
+    def _compile(self, runbook_name: str, runbook: List[RunbookStep]) -> List[List[RunbookStep]]:
+        """Get the runbook's step groups, built once per runbook version"""
+        cached = self._compiled.get(runbook_name)
+        if cached is None or cached[0] is not runbook:
+            cached = (runbook, self._group_steps(runbook))
+            self._compiled[runbook_name] = cached
+        return cached[1]
+
+    @staticmethod
+    def _group_steps(runbook: List[RunbookStep]) -> List[List[RunbookStep]]:
+        """Split a runbook into consecutive steps sharing a parallel_group"""
+        groups = []
+        for step in runbook:
+            if groups and step.parallel_group and groups[-1][-1].parallel_group == step.parallel_group:
+                groups[-1].append(step)
+            else:
+                groups.append([step])
+        return groups
+
+    def _execute_group(self, group: List[RunbookStep],
+                       context: Dict[str, Any]) -> List[Tuple[RunbookStep, Dict[str, Any]]]:
+        """
+        Execute a group of steps concurrently
+
+        Returns:
+            (step, result) pairs in step order, fused steps expanded into the
+            original steps that ran
+        """
+        if len(group) == 1:
+            step = group[0]
+            if step._fused_steps:
+                return self._execute_fused(step, context)
+            return [(step, self._execute_step(step, context))]
+
+        with ThreadPoolExecutor(max_workers=len(group)) as pool:
+            return list(zip(group, pool.map(lambda step: self._execute_step(step, context), group)))
+
+    def _execute_fused(self, fused: RunbookStep,
+                       context: Dict[str, Any]) -> List[Tuple[RunbookStep, Dict[str, Any]]]:
+        """Run a fused step and split its result back into per-step results"""
+        if self.dry_run:
+            return [(step, self._execute_step(step, context)) for step in fused._fused_steps]
+
+        steps = fused._fused_steps
+        result = self._execute_step(fused, context)
+
+        # A clean exit means every command ran; otherwise the sentinels
+        # counted over the whole stream say how many finished before the
+        # failing one
+        if result['success']:
+            completed = len(steps)
+        else:
+            completed = min(result.get('markers', 0), len(steps) - 1)
+
+        # Output may be only a tail: its chunks belong to the last steps
+        chunks = result['output'].split(FUSION_SENTINEL)
+        offset = result.get('markers', 0) - (len(chunks) - 1)
+
+        def output_of(index: int) -> str:
+            chunk_index = index - offset
+            return chunks[chunk_index] if 0 <= chunk_index < len(chunks) else ''
+
+        pairs = []
+        for index, step in enumerate(steps[:completed + 1]):
+            ok = index < completed
+            pairs.append((step, {
+                'step_name': step.name,
+                'action_type': step.action_type,
+                'success': ok,
+                'output': output_of(index),
+                'error': None if ok else (result['error'] or "Command failed")
+            }))
+
+        return pairs
+
     def _execute_step(self, step: RunbookStep, context: Dict[str, Any]) -> Dict[str, Any]:
         """Execute a single runbook step"""
         step_result = {
@@ -237,33 +665,22 @@ class RunbookExecutor:
 
         try:
             # Substitute context variables in action
-            action = self._substitute_variables(step.action, context)
-
-            if step.action_type == 'command':
-                result = self._execute_command(action, step.timeout, step.retry_count)
-                step_result['output'] = result['output']
-                step_result['success'] = result['success']
-                step_result['error'] = result.get('error')
-
-            elif step.action_type == 'script':
-                result = self._execute_script(action, step.timeout)
-                step_result['output'] = result['output']
-                step_result['success'] = result['success']
-                step_result['error'] = result.get('error')
-
-            elif step.action_type == 'wait':
-                import time
-                wait_seconds = int(action)
-                time.sleep(wait_seconds)
-                step_result['success'] = True
-                step_result['output'] = f"Waited {wait_seconds} seconds"
-
-            elif step.action_type == 'api_call':
-                # Parse API call format: METHOD URL [body]
-                result = self._execute_api_call(action)
-                step_result['output'] = result['output']
-                step_result['success'] = result['success']
-                step_result['error'] = result.get('error')
+            if step._has_placeholders:
+                action = self._substitute_variables(step.action, context)
+            else:
+                action = step.action
+
+            handler = self._dispatch.get(step.action_type)
+            if handler is None:
+                step_result['error'] = f"Unknown action type: {step.action_type}"
+                return step_result
+
+            result = handler(action, step)
+            step_result['output'] = result['output']
+            step_result['success'] = result['success']
+            step_result['error'] = result.get('error')
+            if 'markers' in result:
+                step_result['markers'] = result['markers']
 
             # Check success criteria if provided
             if step.success_criteria and step_result['success']:
@@ -281,28 +698,42 @@ class RunbookExecutor:
         return step_result
 
     def _substitute_variables(self, text: str, context: Dict[str, Any]) -> str:
-        """Substitute {{variable}} with values from context"""
-        for key, value in context.items():
-            text = text.replace(f"{{{{{key}}}}}", str(value))
-        return text
+        """Substitute {{variable}} with values from context (unknown names are left as-is)"""
+        def lookup(match):
+            key = match.group(1)
+            return str(context[key]) if key in context else match.group(0)
+
+        return _VAR_RE.sub(lookup, text)
+
+    def _execute_command(self, command: str, timeout: int, retry_count: int,
+                         marker: Optional[bytes] = None) -> Dict[str, Any]:
+        """
+        Execute a shell command with retries
+
+        With a marker, the result also carries 'markers': how many times it
+        appeared in the full stdout (the kept output is only a tail).
+        """
+        # Exec simple commands directly instead of forking /bin/sh first;
+        # checked after substitution, since context values may add metacharacters
+        argv = _split_command(command)
 
-    def _execute_command(self, command: str, timeout: int, retry_count: int) -> Dict[str, Any]:
-        """Execute a shell command with retries"""
         for attempt in range(retry_count):
             try:
-                result = subprocess.run(
-                    command,
-                    shell=True,
-                    capture_output=True,
-                    text=True,
-                    timeout=timeout
+                returncode, stdout, stderr, markers = _run_capped(
+                    list(argv) if argv else command,
+                    shell=argv is None,
+                    timeout=timeout,
+                    marker=marker
                 )
 
-                return {
-                    'success': result.returncode == 0,
-                    'output': result.stdout,
-                    'error': result.stderr if result.returncode != 0 else None
+                result = {
+                    'success': returncode == 0,
+                    'output': stdout,
+                    'error': stderr if returncode != 0 else None
                 }
+                if marker:
+                    result['markers'] = markers
+                return result
 
             except subprocess.TimeoutExpired:
                 if attempt < retry_count - 1:
@@ -324,6 +755,16 @@ class RunbookExecutor:
                     'error': str(e)
                 }
 
+    def _execute_wait(self, seconds: str) -> Dict[str, Any]:
+        """Sleep for a wait step"""
+        wait_seconds = int(seconds)
+        time.sleep(wait_seconds)
+        return {
+            'success': True,
+            'output': f"Waited {wait_seconds} seconds",
+            'error': None
+        }
+
     def _execute_script(self, script_path: str, timeout: int) -> Dict[str, Any]:
         """Execute a script file"""
         script_file = Path(script_path)
@@ -339,15 +780,13 @@ class RunbookExecutor:
     def _execute_api_call(self, api_spec: str) -> Dict[str, Any]:
         """Execute an API call"""
         try:
-            import requests
-
             # Parse: METHOD URL [JSON_BODY]
             parts = api_spec.split(maxsplit=2)
             method = parts[0].upper()
             url = parts[1]
-            body = json.loads(parts[2]) if len(parts) > 2 else None
+            body = _parse_api_body(parts[2]) if len(parts) > 2 else None
 
-            response = requests.request(
+            response = self._http.request(
                 method=method,
                 url=url,
                 json=body,
@@ -370,23 +809,84 @@ class RunbookExecutor:
     def _check_success_criteria(self, output: str, criteria: str) -> bool:
         """Check if output meets success criteria (regex pattern)"""
         try:
-            return bool(re.search(criteria, output))
+            return _criteria_matcher(criteria)(output)
         except Exception as e:
             logger.error(f"Failed to check success criteria: {e}")
             return False
 
-    def _execute_rollback(self, rollback_actions: List[str]):
-        """Execute rollback actions in reverse order"""
-        for action in reversed(rollback_actions):
+    def _execute_rollback(self, rollback_actions: List[Tuple[str, Optional[str]]]):
+        """
+        Undo completed steps in reverse (LIFO) order
+
+        Args:
+            rollback_actions: (action, parallel_group) pairs in step order. Only
+                actions of steps that ran together in one parallel_group are
+                independent of each other, so only those run concurrently.
+        """
+        entries = list(reversed(rollback_actions))
+        if self.dedupe_rollback:
+            # Keeps the first occurrence, i.e. the latest step's position
+            deduped: Dict[str, Optional[str]] = {}
+            for action, group in entries:
+                deduped.setdefault(action, group)
+            entries = list(deduped.items())
+
+        stages: List[List[str]] = []
+        previous_group = None
+        for action, group in entries:
+            if stages and group and group == previous_group:
+                stages[-1].append(action)
+            else:
+                stages.append([action])
+            previous_group = group
+
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            asyncio.run(self._execute_rollback_async(stages))
+            return
+
+        # execute() was called from inside an event loop, where asyncio.run
+        # raises; drive the rollback loop on a worker thread instead
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            pool.submit(asyncio.run, self._execute_rollback_async(stages)).result()
+
+    async def _execute_rollback_async(self, stages: List[List[str]]):
+        """Run rollback stages one after another, the actions within a stage at once"""
+        async def run(action: str):
             try:
                 logger.info(f"Rollback: {action}")
-                subprocess.run(action, shell=True, capture_output=True, timeout=60)
+                proc = await asyncio.create_subprocess_shell(
+                    action,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.PIPE
+                )
+                try:
+                    await asyncio.wait_for(proc.communicate(), timeout=ROLLBACK_TIMEOUT)
+                except asyncio.TimeoutError:
+                    proc.kill()
+                    await proc.wait()
+                    logger.error(f"Rollback action timed out: {action}")
             except Exception as e:
                 logger.error(f"Rollback action failed: {e}")
 
+        for stage in stages:
+            await asyncio.gather(*(run(action) for action in stage))
+
+    def _record_history(self, result: RunbookResult):
+        """Append to the bounded history, handing the evicted result to the sink"""
+        history = self.execution_history
+        if self.history_sink and len(history) == history.maxlen:
+            try:
+                self.history_sink(history[0])
+            except Exception as e:
+                logger.error(f"History sink failed: {e}")
+        history.append(result)
+
     def get_execution_history(self, limit: int = 10) -> List[RunbookResult]:
         """Get recent execution history"""
-        return self.execution_history[-limit:]
+        history = self.execution_history
+        return list(islice(history, max(0, len(history) - limit), None))
 
 
 # Predefined runbooks for common scenarios
@@ -501,6 +1001,12 @@ COMMON_RUNBOOKS = {
     ]
 }
 
+# Built-in runbooks never change, so pay their compilation cost at import
+for _steps in COMMON_RUNBOOKS.values():
+    for _step in _steps:
+        _precompile(_step)
+del _steps, _step
+
 
 def create_common_runbooks(engine: RunbookEngine):
     """Create predefined runbooks for common scenarios"""
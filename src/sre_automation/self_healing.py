@@ -6,21 +6,125 @@ without human intervention.
 """
 
 import logging
-from typing import Dict, List, Optional, Any
+import re
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Deque, Dict, List, Mapping, Optional, Any, Tuple
 from dataclasses import dataclass, asdict
 from datetime import datetime
+from functools import lru_cache
+from itertools import islice
+from types import MappingProxyType
 import json
 
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+try:
+    import ahocorasick
+    HAS_AHOCORASICK = True
+except ImportError:
+    HAS_AHOCORASICK = False
+
 from .slo_manager import SLOManager, Alert
 from .runbook_automation import RunbookEngine, RunbookExecutor, RunbookResult
 from .toil_tracker import ToilTracker
 
 logger = logging.getLogger(__name__)
 
+# Seconds after a remediation during which the same SLO is not remediated again
+REMEDIATION_COOLDOWN = 300
+
+# Upper bound on SLO alerts remediated concurrently per sweep
+MONITOR_WORKERS = 32
+
+# Bounds (seconds) for the adaptive monitoring interval: poll fast right after
+# a remediation, back off by POLL_BACKOFF per quiet sweep
+MIN_CHECK_INTERVAL = 15
+MAX_CHECK_INTERVAL = 600
+POLL_BACKOFF = 1.5
+
+# Remediation actions kept in memory; totals are counted over all actions
+ACTION_HISTORY_SIZE = 10_000
+
+# Severity -> AlertRouter handlers run in order; a handler returning True
+# ends routing (auto-remediation first for warning/critical, page on-call for
+# critical/page, ticket for follow-up on warnings)
+ROUTE_HANDLERS = {
+    'warning': ('_try_auto_remediation', '_create_ticket'),
+    'critical': ('_try_auto_remediation', '_page_oncall'),
+    'page': ('_page_oncall',),
+}
+
+# Alert groups routed concurrently by AlertRouter.route_alerts
+ROUTER_WORKERS = 8
+
+_ROUTER_EXECUTOR = ThreadPoolExecutor(max_workers=ROUTER_WORKERS,
+                                      thread_name_prefix='alert-router')
+
+# Message keyword -> context variable taken from the word that follows it
+_NAME_KEYWORDS = {'service': 'service_name', 'container': 'container_name'}
+
+# Distinct (slo_name, message) runbook lookups remembered per system
+RUNBOOK_LOOKUP_CACHE_SIZE = 2048
+
+# Domain names mentioned in certificate alerts
+_DOMAIN_RE = re.compile(r'([a-zA-Z0-9][a-zA-Z0-9-]{1,61}[a-zA-Z0-9]\.[a-zA-Z]{2,})')
+
+
+# Lower-cased alert text, shared by message parsing and runbook matching so
+# each distinct message/SLO name is lowered once
+_lowered = lru_cache(maxsize=1024)(str.lower)
+
+
+@lru_cache(maxsize=1024)
+def _parse_alert_message(message: str) -> Tuple[Tuple[str, str], ...]:
+    """
+    Extract runbook context variables from an alert message
+
+    Memoized, since alert storms repeat the same messages.
 
-@dataclass
+    Returns:
+        (name, value) pairs to merge into the runbook context
+    """
+    context = {}
+
+    # Parse common patterns from alert message
+    lowered = _lowered(message)
+
+    # Extract service/container names in one pass over the words
+    if 'service' in lowered or 'container' in lowered:
+        previous = None
+        for word in lowered.split():
+            key = _NAME_KEYWORDS.get(previous)
+            if key:
+                context[key] = word.strip('.,')
+            previous = word
+
+    # Extract mount point for disk issues
+    if 'disk' in lowered or 'filesystem' in lowered:
+        context['mount_point'] = '/'  # Default to root
+
+    # Extract domain for certificate issues
+    if 'certificate' in lowered or 'ssl' in lowered or 'tls' in lowered:
+        match = _DOMAIN_RE.search(message)
+        if match:
+            context['domain'] = match.group(1)
+
+    return tuple(context.items())
+
+
+@dataclass(frozen=True)
 class RemediationAction:
     """Action taken by self-healing system"""
+    __slots__ = ('action_id', 'alert_id', 'runbook_name', 'triggered_at', 'completed_at',
+                 'success', 'result', 'human_intervention_required')
+
     action_id: str
     alert_id: str
     runbook_name: str
@@ -31,6 +135,25 @@ class RemediationAction:
     human_intervention_required: bool
 
 
+def _json_dumps(data: Any) -> bytes:
+    """Serialize to compact JSON bytes, using orjson when available"""
+    return orjson.dumps(data) if HAS_ORJSON else json.dumps(data).encode()
+
+
+def _action_to_dict(action: RemediationAction) -> Dict[str, Any]:
+    """Report entry for a remediation action"""
+    return {
+        'action_id': action.action_id,
+        'alert_id': action.alert_id,
+        'runbook_name': action.runbook_name,
+        'triggered_at': action.triggered_at.isoformat(),
+        'completed_at': action.completed_at.isoformat() if action.completed_at else None,
+        'success': action.success,
+        'execution_time': action.result.execution_time if action.result else 0,
+        'human_intervention_required': action.human_intervention_required
+    }
+
+
 class SelfHealingSystem:
     """
     Self-healing system that responds to alerts automatically
@@ -50,17 +173,35 @@ class SelfHealingSystem:
         self.toil_tracker = toil_tracker
         self.dry_run = dry_run
 
-        # Alert to runbook mapping
-        self.remediation_map: Dict[str, str] = {}
+        # Alert to runbook mapping; changed only via register_remediation so
+        # the derived state below stays in sync
+        self._remediation_map: Dict[str, str] = {}
+        # Read-only view and (pattern, runbook) snapshot for scans, rebuilt on change
+        self._remediation_view: Mapping[str, str] = MappingProxyType(self._remediation_map)
+        self._patterns: Tuple[Tuple[str, str], ...] = ()
+        # Automaton over remediation_map patterns, rebuilt when it changes
+        self._pattern_automaton = None
+        # Routing looks up the same alert twice (should/auto remediate)
+        self._match_patterns = lru_cache(maxsize=RUNBOOK_LOOKUP_CACHE_SIZE)(self._match_patterns_uncached)
         self._init_remediation_map()
 
-        # Action history
-        self.action_history: List[RemediationAction] = []
+        # Action history (bounded) and all-time outcome counters
+        self.action_history: Deque[RemediationAction] = deque(maxlen=ACTION_HISTORY_SIZE)
+        self._successful_actions = 0
+        self._failed_actions = 0
+
+        # slo_name -> time.monotonic() of its last remediation, for the cooldown
+        self._last_action_ts: Dict[str, float] = {}
+        # Guards action_history and _last_action_ts during parallel sweeps
+        self._action_lock = threading.Lock()
+
+        # Seconds the caller should wait before the next monitor_and_heal sweep
+        self.next_check_interval: Optional[float] = None
 
     def _init_remediation_map(self):
         """Initialize mapping of alert patterns to runbooks"""
         # Map SLO names or alert patterns to runbook names
-        self.remediation_map = {
+        self._remediation_map = {
             'disk_usage_high': 'disk_cleanup',
             'container_unhealthy': 'container_restart',
             'memory_high': 'high_memory_remediation',
@@ -69,6 +210,19 @@ class SelfHealingSystem:
             'api_error_rate': 'container_restart',
             'database_connection_pool': 'restart_database_pool',
         }
+        self._remediation_map_changed()
+
+    def _remediation_map_changed(self):
+        """Rebuild pattern-matching state derived from remediation_map"""
+        self._remediation_view = MappingProxyType(self._remediation_map)
+        self._patterns = tuple(self._remediation_map.items())
+        self._pattern_automaton = None
+        self._match_patterns.cache_clear()
+
+    @property
+    def remediation_map(self) -> Mapping[str, str]:
+        """Read-only mapping of alert patterns to runbook names"""
+        return self._remediation_view
 
     def register_remediation(self, alert_pattern: str, runbook_name: str):
         """
@@ -78,32 +232,51 @@ class SelfHealingSystem:
             alert_pattern: Pattern to match in alert (SLO name or keyword)
             runbook_name: Name of runbook to execute
         """
-        self.remediation_map[alert_pattern] = runbook_name
-        logger.info(f"Registered remediation: {alert_pattern} -> {runbook_name}")
+        self._remediation_map[alert_pattern] = runbook_name
+        self._remediation_map_changed()
+        logger.info("Registered remediation: %s -> %s", alert_pattern, runbook_name)
 
     def monitor_and_heal(self, check_interval: int = 60) -> List[RemediationAction]:
         """
         Monitor all SLOs and execute remediation if needed
 
+        Sets next_check_interval: short after a remediation (follow-up alerts
+        are likely), growing from check_interval while things stay quiet.
+
         Args:
-            check_interval: How often to check (seconds)
+            check_interval: Baseline interval between checks (seconds)
 
         Returns:
             List of remediation actions taken
         """
+        # Check all SLOs in one pass over the measurement store
+        alerts = self.slo_manager.check_and_alert_bulk(self.slo_manager.slos.keys())
+        firing = [alert for alert in alerts.values() if alert]
         actions_taken = []
 
-        # Check all SLOs
-        for slo_name in self.slo_manager.slos.keys():
-            alert = self.slo_manager.check_and_alert(slo_name)
-
-            if alert and self._should_auto_remediate(alert):
-                action = self.auto_remediate(alert)
-                if action:
-                    actions_taken.append(action)
+        if firing:
+            # Remediation is mostly waiting on shell/HTTP runbook steps
+            with ThreadPoolExecutor(max_workers=min(MONITOR_WORKERS, len(firing))) as pool:
+                results = pool.map(self._maybe_remediate, firing)
+                actions_taken = [action for action in results if action]
 
+        self.next_check_interval = self._adapt_interval(check_interval, bool(actions_taken))
         return actions_taken
 
+    def _adapt_interval(self, check_interval: float, remediated: bool) -> float:
+        """Next polling interval given the baseline and whether we just acted"""
+        if remediated:
+            return min(MIN_CHECK_INTERVAL, check_interval)
+        if self.next_check_interval is None:
+            return check_interval
+        return min(max(MAX_CHECK_INTERVAL, check_interval), self.next_check_interval * POLL_BACKOFF)
+
+    def _maybe_remediate(self, alert: Alert) -> Optional[RemediationAction]:
+        """Remediate an SLO alert if appropriate"""
+        if self._should_auto_remediate(alert):
+            return self.auto_remediate(alert)
+        return None
+
     def _should_auto_remediate(self, alert: Alert) -> bool:
         """
         Determine if an alert should trigger auto-remediation
@@ -116,36 +289,62 @@ class SelfHealingSystem:
         # Check if we have a runbook for this alert
         runbook = self._find_runbook_for_alert(alert)
         if not runbook:
-            logger.info(f"No runbook found for alert: {alert.slo_name}")
+            logger.info("No runbook found for alert: %s", alert.slo_name)
             return False
 
         # Don't auto-remediate 'page' severity - requires human
         if alert.severity == 'page':
-            logger.warning(f"Alert requires human intervention: {alert.message}")
+            logger.warning("Alert requires human intervention: %s", alert.message)
             return False
 
         # Check cooldown - don't remediate same issue within 5 minutes
-        for action in self.action_history[-10:]:  # Check last 10 actions
-            if action.alert_id.startswith(alert.slo_name):
-                time_since = (datetime.now() - action.triggered_at).total_seconds()
-                if time_since < 300:  # 5 minutes
-                    logger.info(f"In cooldown period for {alert.slo_name}")
-                    return False
+        last_ts = self._last_action_ts.get(alert.slo_name)
+        if last_ts is not None and time.monotonic() - last_ts < REMEDIATION_COOLDOWN:
+            logger.info("In cooldown period for %s", alert.slo_name)
+            return False
 
         return True
 
     def _find_runbook_for_alert(self, alert: Alert) -> Optional[str]:
         """Find appropriate runbook for an alert"""
         # Try exact match first
-        if alert.slo_name in self.remediation_map:
-            return self.remediation_map[alert.slo_name]
+        if alert.slo_name in self._remediation_map:
+            return self._remediation_map[alert.slo_name]
 
         # Try pattern matching
-        for pattern, runbook in self.remediation_map.items():
-            if pattern in alert.message.lower() or pattern in alert.slo_name.lower():
-                return runbook
+        return self._match_patterns(alert.slo_name, alert.message)
 
-        return None
+    def _match_patterns_uncached(self, slo_name: str, message: str) -> Optional[str]:
+        """
+        Find the earliest registered pattern contained in the alert text
+
+        Uses one Aho-Corasick pass over the text when available, otherwise a
+        linear scan of remediation_map.
+        """
+        if not HAS_AHOCORASICK:
+            message = _lowered(message)
+            slo_name = _lowered(slo_name)
+            for pattern, runbook in self._patterns:
+                if pattern in message or pattern in slo_name:
+                    return runbook
+            return None
+
+        if self._pattern_automaton is None:
+            automaton = ahocorasick.Automaton()
+            for priority, (pattern, runbook) in enumerate(self._patterns):
+                if pattern:
+                    automaton.add_word(pattern, (priority, runbook))
+            if len(automaton):
+                automaton.make_automaton()
+            self._pattern_automaton = automaton
+
+        if not len(self._pattern_automaton):
+            return None
+
+        # NUL keeps a pattern from matching across the message/SLO name boundary
+        text = f"{_lowered(message)}\0{_lowered(slo_name)}"
+        best = min((match for _, match in self._pattern_automaton.iter(text)), default=None)
+        return best[1] if best else None
 
     def auto_remediate(self, alert: Alert) -> Optional[RemediationAction]:
         """
@@ -159,17 +358,20 @@ class SelfHealingSystem:
         """
         runbook_name = self._find_runbook_for_alert(alert)
         if not runbook_name:
-            logger.warning(f"No runbook available for alert: {alert.slo_name}")
+            logger.warning("No runbook available for alert: %s", alert.slo_name)
             return None
 
-        logger.info(f"{'[DRY RUN] ' if self.dry_run else ''}Auto-remediating: {alert.message}")
-        logger.info(f"Executing runbook: {runbook_name}")
+        logger.info("%sAuto-remediating: %s", '[DRY RUN] ' if self.dry_run else '', alert.message)
+        logger.info("Executing runbook: %s", runbook_name)
 
         # Extract context from alert
         context = self._extract_context_from_alert(alert)
 
-        # Execute runbook
-        triggered_at = datetime.now()
+        # Execute runbook; the monotonic start drives the cooldown, the
+        # wall-clock epoch and datetimes are only for the action record
+        started = time.monotonic()
+        triggered_epoch = time.time()
+        triggered_at = datetime.fromtimestamp(triggered_epoch)
         result = self.runbook_executor.execute(runbook_name, context)
         completed_at = datetime.now()
 
@@ -189,7 +391,7 @@ class SelfHealingSystem:
             )
 
         action = RemediationAction(
-            action_id=f"action_{alert.alert_id}_{int(triggered_at.timestamp())}",
+            action_id=f"action_{alert.alert_id}_{int(triggered_epoch)}",
             alert_id=alert.alert_id,
             runbook_name=runbook_name,
             triggered_at=triggered_at,
@@ -199,15 +401,21 @@ class SelfHealingSystem:
             human_intervention_required=(not result.success)
         )
 
-        self.action_history.append(action)
+        with self._action_lock:
+            self.action_history.append(action)
+            if action.success:
+                self._successful_actions += 1
+            else:
+                self._failed_actions += 1
+            self._last_action_ts[alert.slo_name] = started
 
         # Resolve alert if remediation succeeded
         if result.success:
             self.slo_manager.resolve_alert(alert.alert_id)
-            logger.info(f"Successfully remediated alert: {alert.alert_id}")
+            logger.info("Successfully remediated alert: %s", alert.alert_id)
         else:
-            logger.error(f"Remediation failed for alert: {alert.alert_id}")
-            logger.error(f"Error: {result.error_message}")
+            logger.error("Remediation failed for alert: %s", alert.alert_id)
+            logger.error("Error: %s", result.error_message)
 
         return action
 
@@ -220,49 +428,28 @@ class SelfHealingSystem:
             'timestamp': alert.triggered_at.isoformat()
         }
 
-        # Parse common patterns from alert message
-        message = alert.message.lower()
-
-        # Extract service name
-        if 'service' in message:
-            parts = message.split()
-            for i, part in enumerate(parts):
-                if part == 'service' and i + 1 < len(parts):
-                    context['service_name'] = parts[i + 1].strip('.,')
-
-        # Extract container name
-        if 'container' in message:
-            parts = message.split()
-            for i, part in enumerate(parts):
-                if part == 'container' and i + 1 < len(parts):
-                    context['container_name'] = parts[i + 1].strip('.,')
-
-        # Extract mount point for disk issues
-        if 'disk' in message or 'filesystem' in message:
-            context['mount_point'] = '/'  # Default to root
-
-        # Extract domain for certificate issues
-        if 'certificate' in message or 'ssl' in message or 'tls' in message:
-            # Try to extract domain from message
-            import re
-            domain_pattern = r'([a-zA-Z0-9][a-zA-Z0-9-]{1,61}[a-zA-Z0-9]\.[a-zA-Z]{2,})'
-            match = re.search(domain_pattern, alert.message)
-            if match:
-                context['domain'] = match.group(1)
+        context.update(_parse_alert_message(alert.message))
 
         return context
 
     def get_action_history(self, limit: int = 10) -> List[RemediationAction]:
         """Get recent remediation actions"""
-        return self.action_history[-limit:]
+        return self._recent_actions(limit)
+
+    def _recent_actions(self, limit: int) -> List[RemediationAction]:
+        """Last `limit` actions, oldest first"""
+        if limit <= 0:
+            return []
+        with self._action_lock:
+            return list(islice(reversed(self.action_history), limit))[::-1]
 
     def get_success_rate(self) -> float:
         """Calculate success rate of auto-remediation"""
-        if not self.action_history:
+        total = self._successful_actions + self._failed_actions
+        if not total:
             return 0.0
 
-        successful = sum(1 for action in self.action_history if action.success)
-        return (successful / len(self.action_history)) * 100
+        return (self._successful_actions / total) * 100
 
     def export_report(self, output_path: str) -> bool:
         """
@@ -275,35 +462,27 @@ class SelfHealingSystem:
             True if export successful
         """
         try:
-            report = {
+            summary = {
                 'generated_at': datetime.now().isoformat(),
-                'total_actions': len(self.action_history),
-                'successful_actions': sum(1 for a in self.action_history if a.success),
-                'failed_actions': sum(1 for a in self.action_history if not a.success),
+                'total_actions': self._successful_actions + self._failed_actions,
+                'successful_actions': self._successful_actions,
+                'failed_actions': self._failed_actions,
                 'success_rate': self.get_success_rate(),
-                'actions': [
-                    {
-                        'action_id': action.action_id,
-                        'alert_id': action.alert_id,
-                        'runbook_name': action.runbook_name,
-                        'triggered_at': action.triggered_at.isoformat(),
-                        'completed_at': action.completed_at.isoformat() if action.completed_at else None,
-                        'success': action.success,
-                        'execution_time': action.result.execution_time if action.result else 0,
-                        'human_intervention_required': action.human_intervention_required
-                    }
-                    for action in self.action_history[-50:]  # Last 50 actions
-                ]
             }
 
-            with open(output_path, 'w') as f:
-                json.dump(report, f, indent=2)
+            # Stream one action per line rather than building the whole report
+            with open(output_path, 'wb') as f:
+                f.write(_json_dumps(summary)[:-1] + b',\n"actions":[')
+                for i, action in enumerate(self._recent_actions(50)):  # Last 50 actions
+                    f.write(b',\n' if i else b'\n')
+                    f.write(_json_dumps(_action_to_dict(action)))
+                f.write(b'\n]}\n')
 
-            logger.info(f"Exported self-healing report to {output_path}")
+            logger.info("Exported self-healing report to %s", output_path)
             return True
 
         except Exception as e:
-            logger.error(f"Failed to export report: {e}")
+            logger.error("Failed to export report: %s", e)
             return False
 
 
@@ -320,6 +499,10 @@ class AlertRouter:
 
     def __init__(self, self_healing: SelfHealingSystem):
         self.self_healing = self_healing
+        self._handlers = {
+            severity: tuple(getattr(self, name) for name in handlers)
+            for severity, handlers in ROUTE_HANDLERS.items()
+        }
 
     def route_alert(self, alert: Alert) -> Dict[str, Any]:
         """
@@ -337,39 +520,79 @@ class AlertRouter:
             'actions': []
         }
 
-        # Try auto-remediation first for warning/critical
-        if alert.severity in ['warning', 'critical']:
-            if self.self_healing._should_auto_remediate(alert):
-                action = self.self_healing.auto_remediate(alert)
-                if action:
-                    routing['actions'].append({
-                        'type': 'auto_remediation',
-                        'status': 'success' if action.success else 'failed',
-                        'action_id': action.action_id
-                    })
-
-                    # If remediation succeeded, we're done
-                    if action.success:
-                        return routing
-                    else:
-                        # Remediation failed, escalate
-                        routing['actions'].append({
-                            'type': 'escalate_to_oncall',
-                            'reason': 'auto_remediation_failed'
-                        })
-
-        # Page on-call for critical/page severity
-        if alert.severity in ['page', 'critical']:
-            routing['actions'].append({
-                'type': 'page_oncall',
-                'message': alert.message
-            })
-
-        # Create ticket for follow-up on warnings
-        if alert.severity == 'warning':
-            routing['actions'].append({
-                'type': 'create_ticket',
-                'priority': 'medium'
-            })
+        for handler in self._handlers.get(alert.severity, ()):
+            if handler(alert, routing['actions']):
+                break
 
         return routing
+
+    def route_alerts(self, alerts: List[Alert]) -> List[Dict[str, Any]]:
+        """
+        Route a batch of alerts, e.g. during an alert storm
+
+        Alerts for the same SLO are routed in order within one group, whatever
+        their severity, so later ones see the first one's remediation
+        cooldown exactly as if routed one by one; separate SLOs are routed
+        concurrently.
+
+        Args:
+            alerts: Alerts to route
+
+        Returns:
+            Routing dictionaries in the same order as alerts
+        """
+        # The cooldown is keyed by SLO, so all of an SLO's alerts share a group
+        groups: Dict[str, List[int]] = defaultdict(list)
+        for i, alert in enumerate(alerts):
+            groups[alert.slo_name].append(i)
+
+        def route_group(indices: List[int]) -> List[Tuple[int, Dict[str, Any]]]:
+            return [(i, self.route_alert(alerts[i])) for i in indices]
+
+        routings: List[Optional[Dict[str, Any]]] = [None] * len(alerts)
+        for routed in _ROUTER_EXECUTOR.map(route_group, groups.values()):
+            for i, routing in routed:
+                routings[i] = routing
+        return routings
+
+    def _try_auto_remediation(self, alert: Alert, actions: List[Dict[str, Any]]) -> bool:
+        """Auto-remediate; True (stop routing) if remediation succeeded"""
+        if not self.self_healing._should_auto_remediate(alert):
+            return False
+
+        action = self.self_healing.auto_remediate(alert)
+        if not action:
+            return False
+
+        actions.append({
+            'type': 'auto_remediation',
+            'status': 'success' if action.success else 'failed',
+            'action_id': action.action_id
+        })
+
+        # If remediation succeeded, we're done
+        if action.success:
+            return True
+
+        # Remediation failed, escalate
+        actions.append({
+            'type': 'escalate_to_oncall',
+            'reason': 'auto_remediation_failed'
+        })
+        return False
+
+    def _page_oncall(self, alert: Alert, actions: List[Dict[str, Any]]) -> bool:
+        """Page on-call engineer"""
+        actions.append({
+            'type': 'page_oncall',
+            'message': alert.message
+        })
+        return False
+
+    def _create_ticket(self, alert: Alert, actions: List[Dict[str, Any]]) -> bool:
+        """Create ticket for follow-up"""
+        actions.append({
+            'type': 'create_ticket',
+            'priority': 'medium'
+        })
+        return False
@@ -7,8 +7,9 @@ Only alert when user experience is impacted (burning error budget).
 
 import json
 import sqlite3
+from collections import defaultdict
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
+from typing import Dict, Iterable, List, Optional, Any
 from dataclasses import dataclass, asdict
 from pathlib import Path
 import logging
@@ -207,104 +208,128 @@ class SLOManager:
         Returns:
             ErrorBudget object or None if SLO not found
         """
-        slo = self.slos.get(slo_name)
-        if not slo:
+        if slo_name not in self.slos:
             logger.error(f"SLO not found: {slo_name}")
             return None
 
-        try:
-            with sqlite3.connect(self.db_path) as conn:
-                # Get measurements within window
-                since_date = datetime.now() - timedelta(days=slo.window_days)
+        return self._calculate_error_budgets([slo_name]).get(slo_name)
 
-                cursor = conn.execute("""
-                    SELECT COUNT(*) as total,
-                           SUM(CASE WHEN is_good = 0 THEN 1 ELSE 0 END) as bad
-                    FROM sli_measurements
-                    WHERE slo_name = ? AND timestamp >= ?
-                """, (slo_name, since_date))
-
-                total, bad = cursor.fetchone()
-                total = total or 0
-                bad = bad or 0
-
-                if total == 0:
-                    return ErrorBudget(
-                        slo_name=slo_name,
-                        total_budget=100.0,
-                        consumed=0.0,
-                        remaining=100.0,
-                        burn_rate=0.0,
-                        exhaustion_date=None,
-                        status='healthy'
-                    )
-
-                # Calculate actual vs target
-                actual_success_rate = ((total - bad) / total) * 100
-                target_success_rate = slo.target
-
-                # Error budget = allowed failures
-                allowed_failures = total * (1 - target_success_rate / 100)
-                actual_failures = bad
+    def _calculate_error_budgets(self, slo_names: List[str]) -> Dict[str, ErrorBudget]:
+        """
+        Calculate error budgets with one measurement query per window length
 
-                # Calculate budget consumption
-                if allowed_failures > 0:
-                    budget_consumed_pct = (actual_failures / allowed_failures) * 100
-                else:
-                    budget_consumed_pct = 100 if bad > 0 else 0
+        Args:
+            slo_names: Names of SLOs (all must be in self.slos)
 
-                remaining_pct = max(0, 100 - budget_consumed_pct)
+        Returns:
+            Dictionary of SLO name to ErrorBudget; empty if the query failed
+        """
+        # SLOs sharing a window length share a measurement query
+        by_window: Dict[int, List[str]] = defaultdict(list)
+        for slo_name in slo_names:
+            by_window[self.slos[slo_name].window_days].append(slo_name)
 
-                # Calculate burn rate (failures per day)
-                cursor = conn.execute("""
-                    SELECT COUNT(*)
-                    FROM sli_measurements
-                    WHERE slo_name = ? AND is_good = 0
-                    AND timestamp >= datetime('now', '-1 day')
-                """, (slo_name,))
-
-                recent_failures = cursor.fetchone()[0]
-                burn_rate = recent_failures  # Failures per day
-
-                # Estimate exhaustion date
-                if burn_rate > 0 and remaining_pct > 0:
-                    days_until_exhaustion = (allowed_failures - actual_failures) / burn_rate
-                    exhaustion_date = (datetime.now() + timedelta(days=days_until_exhaustion)).strftime('%Y-%m-%d')
-                else:
-                    exhaustion_date = None
-
-                # Determine status
-                if budget_consumed_pct >= slo.alert_threshold:
-                    status = 'critical'
-                elif budget_consumed_pct >= (slo.alert_threshold * 0.7):
-                    status = 'warning'
-                else:
-                    status = 'healthy'
-
-                error_budget = ErrorBudget(
-                    slo_name=slo_name,
-                    total_budget=allowed_failures,
-                    consumed=actual_failures,
-                    remaining=max(0, allowed_failures - actual_failures),
-                    burn_rate=burn_rate,
-                    exhaustion_date=exhaustion_date,
-                    status=status
-                )
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                budgets = {}
+                history = []
+                for window_days, names in by_window.items():
+                    # Measurements within window, plus failures in the last day
+                    since_date = datetime.now() - timedelta(days=window_days)
+                    placeholders = ','.join('?' * len(names))
+
+                    cursor = conn.execute(f"""
+                        SELECT slo_name,
+                               SUM(CASE WHEN timestamp >= ? THEN 1 ELSE 0 END) as total,
+                               SUM(CASE WHEN timestamp >= ? AND is_good = 0 THEN 1 ELSE 0 END) as bad,
+                               SUM(CASE WHEN timestamp >= datetime('now', '-1 day')
+                                        AND is_good = 0 THEN 1 ELSE 0 END) as recent_bad
+                        FROM sli_measurements
+                        WHERE slo_name IN ({placeholders})
+                        AND (timestamp >= ? OR timestamp >= datetime('now', '-1 day'))
+                        GROUP BY slo_name
+                    """, (since_date, since_date, *names, since_date))
+
+                    counts = {row[0]: row[1:] for row in cursor.fetchall()}
+                    for slo_name in names:
+                        total, bad, recent_bad = counts.get(slo_name, (0, 0, 0))
+                        if not total:
+                            budgets[slo_name] = ErrorBudget(
+                                slo_name=slo_name,
+                                total_budget=100.0,
+                                consumed=0.0,
+                                remaining=100.0,
+                                burn_rate=0.0,
+                                exhaustion_date=None,
+                                status='healthy'
+                            )
+                            continue
+
+                        error_budget = self._error_budget_from_counts(
+                            self.slos[slo_name], total, bad or 0, recent_bad or 0)
+                        budgets[slo_name] = error_budget
+                        history.append((slo_name, error_budget.total_budget, error_budget.consumed,
+                                        error_budget.remaining, error_budget.burn_rate))
 
                 # Store in history
-                conn.execute("""
+                conn.executemany("""
                     INSERT INTO error_budget_history
                     (slo_name, date, total_budget, consumed, remaining, burn_rate)
                     VALUES (?, DATE('now'), ?, ?, ?, ?)
-                """, (slo_name, error_budget.total_budget, error_budget.consumed,
-                      error_budget.remaining, error_budget.burn_rate))
+                """, history)
                 conn.commit()
 
-                return error_budget
+                return budgets
 
         except Exception as e:
             logger.error(f"Failed to calculate error budget: {e}")
-            return None
+            return {}
+
+    @staticmethod
+    def _error_budget_from_counts(slo: SLO, total: int, bad: int, recent_failures: int) -> ErrorBudget:
+        """Error budget for an SLO from its measurement counts (total > 0)"""
+        # Calculate actual vs target
+        target_success_rate = slo.target
+
+        # Error budget = allowed failures
+        allowed_failures = total * (1 - target_success_rate / 100)
+        actual_failures = bad
+
+        # Calculate budget consumption
+        if allowed_failures > 0:
+            budget_consumed_pct = (actual_failures / allowed_failures) * 100
+        else:
+            budget_consumed_pct = 100 if bad > 0 else 0
+
+        remaining_pct = max(0, 100 - budget_consumed_pct)
+
+        # Calculate burn rate (failures per day)
+        burn_rate = recent_failures
+
+        # Estimate exhaustion date
+        if burn_rate > 0 and remaining_pct > 0:
+            days_until_exhaustion = (allowed_failures - actual_failures) / burn_rate
+            exhaustion_date = (datetime.now() + timedelta(days=days_until_exhaustion)).strftime('%Y-%m-%d')
+        else:
+            exhaustion_date = None
+
+        # Determine status
+        if budget_consumed_pct >= slo.alert_threshold:
+            status = 'critical'
+        elif budget_consumed_pct >= (slo.alert_threshold * 0.7):
+            status = 'warning'
+        else:
+            status = 'healthy'
+
+        return ErrorBudget(
+            slo_name=slo.name,
+            total_budget=allowed_failures,
+            consumed=actual_failures,
+            remaining=max(0, allowed_failures - actual_failures),
+            burn_rate=burn_rate,
+            exhaustion_date=exhaustion_date,
+            status=status
+        )
 
     def check_and_alert(self, slo_name: str) -> Optional[Alert]:
         """
@@ -316,18 +341,58 @@ class SLOManager:
         Returns:
             Alert object if threshold exceeded, None otherwise
         """
-        slo = self.slos.get(slo_name)
-        if not slo:
-            return None
+        return self.check_and_alert_bulk([slo_name])[slo_name]
 
-        error_budget = self.calculate_error_budget(slo_name)
-        if not error_budget:
-            return None
+    def check_and_alert_bulk(self, slo_names: Iterable[str]) -> Dict[str, Optional[Alert]]:
+        """
+        Check error budgets for many SLOs in one database round-trip
 
-        # Only alert if burning error budget (symptom-based)
-        if error_budget.status == 'healthy':
-            return None
+        Args:
+            slo_names: Names of SLOs to check
+
+        Returns:
+            Dictionary of SLO name to Alert (None if no threshold exceeded),
+            in the order given
+        """
+        results: Dict[str, Optional[Alert]] = dict.fromkeys(slo_names)
+        known = [slo_name for slo_name in results if slo_name in self.slos]
+        if not known:
+            return results
+
+        error_budgets = self._calculate_error_budgets(known)
+        for slo_name, error_budget in error_budgets.items():
+            # Only alert if burning error budget (symptom-based)
+            if error_budget.status != 'healthy':
+                results[slo_name] = self._build_alert(self.slos[slo_name], error_budget)
+
+        alerts = [alert for alert in results.values() if alert]
+        if not alerts:
+            return results
+
+        # Store alerts
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                for alert in alerts:
+                    try:
+                        conn.execute("""
+                            INSERT INTO alerts
+                            (alert_id, slo_name, severity, message, budget_consumed, burn_rate)
+                            VALUES (?, ?, ?, ?, ?, ?)
+                        """, (alert.alert_id, alert.slo_name, alert.severity, alert.message,
+                              alert.budget_consumed, alert.burn_rate))
+                        logger.warning(f"SLO alert triggered: {alert.message}")
+                    except sqlite3.Error as e:
+                        logger.error(f"Failed to store alert: {e}")
+                conn.commit()
+
+        except Exception as e:
+            logger.error(f"Failed to store alert: {e}")
+
+        return results
 
+    @staticmethod
+    def _build_alert(slo: SLO, error_budget: ErrorBudget) -> Alert:
+        """Alert for an SLO whose error budget is not healthy"""
         # Determine severity based on burn rate
         if error_budget.burn_rate > (error_budget.total_budget / 7):  # Will exhaust in < 7 days
             severity = 'page'
@@ -344,9 +409,9 @@ class SLOManager:
             message = f"Error budget warning for {slo.service}. " \
                      f"Consumed: {(error_budget.consumed/error_budget.total_budget)*100:.1f}%"
 
-        alert = Alert(
-            alert_id=f"{slo_name}_{int(datetime.now().timestamp())}",
-            slo_name=slo_name,
+        return Alert(
+            alert_id=f"{slo.name}_{int(datetime.now().timestamp())}",
+            slo_name=slo.name,
             severity=severity,
             message=message,
             budget_consumed=(error_budget.consumed / error_budget.total_budget) * 100,
@@ -354,24 +419,6 @@ class SLOManager:
             triggered_at=datetime.now()
         )
 
-        # Store alert
-        try:
-            with sqlite3.connect(self.db_path) as conn:
-                conn.execute("""
-                    INSERT INTO alerts
-                    (alert_id, slo_name, severity, message, budget_consumed, burn_rate)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                """, (alert.alert_id, alert.slo_name, alert.severity, alert.message,
-                      alert.budget_consumed, alert.burn_rate))
-                conn.commit()
-
-            logger.warning(f"SLO alert triggered: {alert.message}")
-
-        except Exception as e:
-            logger.error(f"Failed to store alert: {e}")
-
-        return alert
-
     def resolve_alert(self, alert_id: str) -> bool:
         """
         Mark an alert as resolved
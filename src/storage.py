@@ -203,6 +203,15 @@ class KnowledgeBase:
             logger.error(f"Failed to save entry to knowledge base: {e}")
             return False
 
+    def get_all(self) -> pd.DataFrame:
+        """
+        Load every entry in the knowledge base.
+
+        Returns:
+            DataFrame with one row per entry
+        """
+        return pd.read_excel(self.filename, engine='openpyxl')
+
     def get_top_errors(self, limit: int = 10) -> List[Dict[str, Any]]:
         """
         Get the most frequent errors from the knowledge base.
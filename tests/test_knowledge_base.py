@@ -7,6 +7,7 @@ import pandas as pd
 from datetime import datetime, timedelta
 from pathlib import Path
 import tempfile
+from unittest.mock import patch
 
 from src.knowledge_base.filters import KnowledgeBaseFilter
 from src.knowledge_base.enhanced_storage import EnhancedKnowledgeBase
@@ -148,6 +149,20 @@ class TestEnhancedKnowledgeBase:
 
         assert len(result) >= 0
 
+    def test_search_records_cached(self, kb):
+        """Test search results are memoized until the file changes"""
+        with patch.object(kb, 'search', return_value=pd.DataFrame([{'Category': 'Memory'}])) as mock_search:
+            first = kb.search_records({'categories': ['Memory']})
+            second = kb.search_records({'categories': ['Memory']})
+
+            assert first is second
+            assert first[0]['Category'] == 'Memory'
+            assert mock_search.call_count == 1
+
+            kb.clear_search_cache()
+            kb.search_records({'categories': ['Memory']})
+            assert mock_search.call_count == 2
+
     def test_add_user_selection(self, kb):
         """Test adding user selection"""
         kb.add_user_selection("Error pattern 1", selected=True, notes="Important")
@@ -4,8 +4,9 @@ Tests for SOAP Integration Module
 
 import pytest
 import json
-from datetime import datetime
-from unittest.mock import Mock, patch, MagicMock
+from datetime import datetime, timedelta
+from pathlib import Path
+from unittest.mock import Mock, patch, AsyncMock
 
 from src.soap_integration import (
     RemediationAgent,
@@ -13,6 +14,7 @@ from src.soap_integration import (
     CertificateManager,
     ContainerLifecycleManager
 )
+from src.soap_integration.remediation_agent import FixRecord
 
 
 class TestRemediationAgent:
@@ -35,39 +37,195 @@ class TestRemediationAgent:
         """Test finding fix in knowledge base"""
         # Setup mock
         mock_kb_instance = Mock()
-        mock_results = MagicMock()
-        mock_results.iloc = [Mock()]
-        mock_results.iloc[0].get = Mock(side_effect=lambda key, default='': {
+        mock_kb_instance.search_records.return_value = ({
             'Error_Pattern': 'Memory leak',
             'Category': 'Memory',
             'Severity': 'critical'
-        }.get(key, default))
-        mock_results.__len__ = Mock(return_value=1)
-
-        mock_kb_instance.search.return_value = mock_results
+        },)
         agent.kb = mock_kb_instance
 
         # Execute
         fix = agent._find_fix('memory_leak')
 
         # Verify
-        assert fix is not None
-        assert fix['category'] == 'Memory'
+        assert isinstance(fix, FixRecord)
+        assert fix.category == 'Memory'
+        assert not hasattr(fix, '__dict__')
 
     def test_generate_ansible_playbook(self, agent, tmp_path):
         """Test Ansible playbook generation"""
-        fix = {
-            'error_pattern': 'Test error',
-            'category': 'Memory',
-            'severity': 'high',
-            'implementation_steps': json.dumps(['Step 1', 'Step 2'])
-        }
+        fix = FixRecord(
+            error_pattern='Test error',
+            category='Memory',
+            severity='high',
+            solution='',
+            implementation_steps=json.dumps(['Step 1', 'Step 2']),
+            issue_type=''
+        )
 
         playbook_path = agent._generate_ansible_playbook(fix, 'dev')
 
         assert playbook_path.exists()
         assert playbook_path.suffix == '.yml'
 
+    def test_generate_ansible_playbook_rollout(self, agent):
+        """Test playbooks batch hosts, with a cautious rollout in production"""
+        import yaml
+
+        fix = FixRecord(
+            error_pattern='Test error',
+            category='Memory',
+            severity='high',
+            solution='',
+            implementation_steps='[]',
+            issue_type=''
+        )
+
+        dev = yaml.safe_load(agent._generate_ansible_playbook(fix, 'dev').read_text())[0]
+        prod = yaml.safe_load(agent._generate_ansible_playbook(fix, 'production').read_text())[0]
+
+        assert dev['strategy'] == 'free'
+        assert dev['serial'] == '25%'
+        assert prod['strategy'] == 'linear'
+        assert prod['serial'] == 1
+
+    def test_generate_ansible_playbook_reused(self, agent):
+        """Test identical fixes reuse the same playbook file"""
+        fix = FixRecord(
+            error_pattern='Test error',
+            category='CPU',
+            severity='high',
+            solution='',
+            implementation_steps='[]',
+            issue_type=''
+        )
+
+        first = agent._generate_ansible_playbook(fix, 'dev')
+        with patch('yaml.dump') as mock_dump:
+            second = agent._generate_ansible_playbook(fix, 'dev')
+            mock_dump.assert_not_called()
+
+        assert first == second
+        assert agent._generate_ansible_playbook(fix, 'staging') != first
+
+    def test_generate_ansible_playbook_cache_key(self, agent):
+        """Test template or strategy changes produce a new playbook, written atomically"""
+        import yaml
+        from src.soap_integration import remediation_agent
+
+        fix = FixRecord(error_pattern='Test error', category='CPU', severity='high',
+                        solution='', implementation_steps='[]', issue_type='')
+
+        first = agent._generate_ansible_playbook(fix, 'dev')
+        with patch.object(remediation_agent, '_TEMPLATE_DIGEST', 'changed'):
+            assert agent._generate_ansible_playbook(fix, 'dev') != first
+        with patch.object(remediation_agent, '_mitogen_strategy_dir', return_value='/mitogen'):
+            # Mitogen is only used when connection tuning is opted into
+            assert agent._generate_ansible_playbook(fix, 'dev') == first
+            agent.config['ansible_tuning'] = True
+            tuned = agent._generate_ansible_playbook(fix, 'dev')
+            assert tuned != first
+            assert yaml.safe_load(tuned.read_text())[0]['strategy'] == 'mitogen_free'
+
+        assert not list(agent.ansible_dir.glob('*.tmp'))
+
+    @patch('src.soap_integration.remediation_agent._run_streaming', return_value=(0, 'ok'))
+    def test_execute_ansible_uses_tuned_env(self, mock_run, agent, tmp_path, monkeypatch):
+        """Test pipelining and SSH multiplexing are opt-in and leave ansible.cfg alone by default"""
+        for key in ('ANSIBLE_PIPELINING', 'ANSIBLE_SSH_ARGS'):
+            monkeypatch.delenv(key, raising=False)
+
+        monkeypatch.delenv('ANSIBLE_STRATEGY', raising=False)
+        monkeypatch.setattr('src.soap_integration.remediation_agent._mitogen_strategy_dir',
+                            lambda: '/mitogen')
+
+        agent._execute_ansible(tmp_path / 'play.yml', 'dev', dry_run_first=False)
+        env = mock_run.call_args.kwargs['env']
+        assert 'ANSIBLE_PIPELINING' not in env
+        assert 'ANSIBLE_SSH_ARGS' not in env
+        assert 'ANSIBLE_STRATEGY' not in env
+
+        agent.config['ansible_tuning'] = True
+        agent._execute_ansible(tmp_path / 'play.yml', 'dev', dry_run_first=False)
+        env = mock_run.call_args.kwargs['env']
+        assert env['ANSIBLE_PIPELINING'] == 'True'
+        assert 'ControlPersist' in env['ANSIBLE_SSH_ARGS']
+        assert 'PreferredAuthentications' not in env['ANSIBLE_SSH_ARGS']
+        assert env['ANSIBLE_STRATEGY'] == 'mitogen_linear'
+
+    @patch('src.soap_integration.remediation_agent._run_quiet', return_value=(0, ''))
+    @patch('src.soap_integration.remediation_agent._run_streaming', return_value=(0, 'ok'))
+    def test_execute_ansible_skips_dry_run(self, mock_run, mock_quiet, agent, tmp_path):
+        """Test the --check dry run is only done when requested"""
+        agent._execute_ansible(tmp_path / 'play.yml', 'dev', dry_run_first=False)
+        assert mock_run.call_count == 1
+        mock_quiet.assert_not_called()
+        assert '--check' not in mock_run.call_args.args[0]
+
+        mock_run.reset_mock()
+        agent._execute_ansible(tmp_path / 'play.yml', 'production', dry_run_first=True)
+        assert mock_run.call_count == 1
+        assert '--check' in mock_quiet.call_args.args[0]
+
+    def test_category_tasks_are_shared_templates(self, agent):
+        """Test category task generators copy the module-level templates"""
+        from src.soap_integration.remediation_agent import MEMORY_TASKS
+
+        tasks = agent._generate_memory_tasks([])
+        assert tasks == list(MEMORY_TASKS)
+
+        tasks.append({'name': 'extra'})
+        tasks[0]['when'] = 'always'
+        tasks[1]['systemd']['state'] = 'stopped'
+        tasks[1]['loop'].append('worker')
+        assert len(MEMORY_TASKS) == 2
+        assert MEMORY_TASKS[0]['when'] == 'pre_check.stdout|float > 80'
+        assert MEMORY_TASKS[1]['systemd']['state'] == 'restarted'
+        assert MEMORY_TASKS[1]['loop'] == ['application', 'cache-service']
+
+    def test_run_quiet_discards_stdout(self):
+        """Test quiet runs drop stdout and only surface stderr on failure"""
+        import sys
+        from src.soap_integration.remediation_agent import _run_quiet
+
+        assert _run_quiet([sys.executable, '-c', 'print("x" * 1000)'], timeout=30) == (0, '')
+
+        returncode, errors = _run_quiet(
+            [sys.executable, '-c', 'import sys; print("noise"); sys.exit("boom")'], timeout=30
+        )
+        assert returncode == 1
+        assert errors.strip() == 'boom'
+
+    def test_run_streaming_keeps_output_tail(self):
+        """Test streamed command output is captured up to the tail limit"""
+        import sys
+        from src.soap_integration import remediation_agent
+
+        with patch.object(remediation_agent, 'ANSIBLE_LOG_TAIL_LINES', 3):
+            returncode, output = remediation_agent._run_streaming(
+                [sys.executable, '-c', 'for i in range(10): print(i)'], timeout=30, env=None
+            )
+
+        assert returncode == 0
+        assert output == '7\n8\n9'
+
+    def test_generate_generic_tasks_single_script(self, agent):
+        """Test generic steps are bundled into one script task"""
+        tasks = agent._generate_generic_tasks(['systemctl restart app', 'rm -rf /tmp/app-cache'])
+
+        assert len(tasks) == 1
+        script = Path(tasks[0]['script']).read_text()
+        assert 'systemctl restart app\n' in script
+        assert 'rm -rf /tmp/app-cache\n' in script
+
+    def test_parse_steps(self):
+        """Test implementation steps parsing"""
+        from src.soap_integration.remediation_agent import _parse_steps
+
+        assert _parse_steps('["a", "b"]') == ('a', 'b')
+        assert _parse_steps('restart service') == ('restart service',)
+        assert _parse_steps('') == ()
+
     def test_get_target_hosts(self, agent):
         """Test getting target hosts"""
         assert agent._get_target_hosts('dev') == 'dev_servers'
@@ -198,22 +356,20 @@ class TestCertificateManager:
         """Test certbot renewal"""
         mock_run.return_value = Mock(returncode=0, stderr='')
 
-        result = manager._renew_with_certbot('example.com')
+        with patch.object(manager, '_certbot_expiry', side_effect=[None, '2027-01-01T00:00:00']):
+            result = manager._renew_with_certbot('example.com')
 
         assert result['status'] == 'success'
         assert 'cert_path' in result
+        assert mock_run.call_args.args[0][:4] == ['certbot', 'renew', '--cert-name', 'example.com']
 
     def test_update_security_policies(self, manager):
         """Test security policy update"""
         manager._update_security_policies('example.com')
 
-        policy_file = manager.policy_dir / 'example.com_tls_policy.json'
-        assert policy_file.exists()
-
-        with open(policy_file) as f:
-            policy = json.load(f)
-            assert policy['domain'] == 'example.com'
-            assert policy['min_tls_version'] == '1.2'
+        policy = manager.get_policy('example.com_tls_policy')
+        assert policy['domain'] == 'example.com'
+        assert policy['min_tls_version'] == '1.2'
 
     def test_update_security_policy(self, manager):
         """Test generic policy update"""
@@ -225,7 +381,180 @@ class TestCertificateManager:
         success = manager.update_security_policy('test_policy', policy_config)
 
         assert success is True
-        assert (manager.policy_dir / 'test_policy.json').exists()
+        assert manager.get_policy('test_policy')['tls_version'] == '1.3'
+
+    def test_update_security_policy_replaces_previous(self, manager):
+        """Test policies are stored in one database and updated in place"""
+        manager.update_security_policy('test_policy', {'tls_version': '1.2'})
+        manager.update_security_policy('test_policy', {'tls_version': '1.3'})
+
+        assert manager.get_policy('test_policy')['tls_version'] == '1.3'
+        assert manager.get_policy('missing') is None
+        assert not list(manager.policy_dir.glob('*.json'))
+
+
+    def test_check_certificate_expiry_cached(self, manager):
+        """Test expiry lookups are cached until invalidated"""
+        expires = datetime.now() + timedelta(days=365)
+        info = {'domain': 'example.com', 'expires_at': expires.isoformat(), 'days_remaining': 365}
+
+        with patch.object(manager, '_probe_certificate_expiry', return_value=info) as mock_probe:
+            assert manager.check_certificate_expiry('example.com') == info
+            assert manager.check_certificate_expiry('example.com') == info
+            assert mock_probe.call_count == 1
+
+            manager.invalidate('example.com')
+            manager.check_certificate_expiry('example.com')
+            assert mock_probe.call_count == 2
+
+    def test_auto_renew_expiring_certificates(self, manager):
+        """Test only expiring domains are renewed"""
+        (manager.policy_dir / 'monitored_domains.json').write_text(
+            json.dumps({'domains': ['a.example.com', 'b.example.com', 'other.org']})
+        )
+        days = {'a.example.com': 5, 'b.example.com': 90, 'other.org': 10}
+
+        with patch.object(manager, 'check_certificate_expiry',
+                          side_effect=lambda d: {'domain': d, 'days_remaining': days[d]}), \
+             patch.object(manager, '_renew_certificate_async',
+                          new=AsyncMock(side_effect=lambda d, **kwargs: {'domain': d, 'status': 'success'})) as mock_renew:
+            results = manager.auto_renew_expiring_certificates(days_threshold=30)
+
+        assert sorted(r['domain'] for r in results) == ['a.example.com', 'other.org']
+        assert mock_renew.call_count == 2
+
+    @patch('subprocess.run')
+    def test_auto_renew_batches_certbot(self, mock_run, manager):
+        """Test expiring certbot domains share one certbot renew run"""
+        mock_run.return_value = Mock(returncode=0, stderr='')
+        (manager.policy_dir / 'monitored_domains.json').write_text(
+            json.dumps({'domains': ['a.example.com', 'b.example.org']})
+        )
+        old, new = '2026-11-01T00:00:00', '2027-01-01T00:00:00'
+
+        with patch.object(manager, 'check_certificate_expiry',
+                          side_effect=lambda d: {'domain': d, 'days_remaining': 5}), \
+             patch.object(manager, '_certbot_expiry', side_effect=[old, old, new, new]):
+            results = manager.auto_renew_expiring_certificates(days_threshold=30)
+
+        assert mock_run.call_count == 1
+        assert mock_run.call_args.args[0][:2] == ['certbot', 'renew']
+        assert '--cert-name' not in mock_run.call_args.args[0]
+        assert all(r['status'] == 'success' for r in results)
+        assert manager.get_policy('b.example.org_tls_policy') is not None
+
+    @patch('subprocess.run')
+    def test_auto_renew_single_certbot_domain_uses_batch(self, mock_run, manager):
+        """Test one expiring certbot domain goes through the same verified run"""
+        mock_run.return_value = Mock(returncode=0, stderr='')
+        (manager.policy_dir / 'monitored_domains.json').write_text(
+            json.dumps({'domains': ['a.example.com']})
+        )
+
+        with patch.object(manager, 'check_certificate_expiry',
+                          side_effect=lambda d: {'domain': d, 'days_remaining': 5}), \
+             patch.object(manager, '_certbot_expiry', return_value='2026-11-01T00:00:00'):
+            results = manager.auto_renew_expiring_certificates(days_threshold=30)
+
+        assert mock_run.call_count == 1
+        assert results[0]['status'] == 'failed'
+
+    @patch('subprocess.run')
+    def test_renew_all_with_certbot_requires_new_certificate(self, mock_run, manager, tmp_path):
+        """Test a clean certbot exit only reports domains whose lineage was renewed"""
+        pytest.importorskip('cryptography')
+        live = tmp_path / 'live'
+        for domain in ('a.example.com', 'b.example.com'):
+            (live / domain).mkdir(parents=True)
+            manager._generate_self_signed(domain, live / domain / 'privkey.pem',
+                                          live / domain / 'fullchain.pem')
+
+        def renew_a(*args, **kwargs):
+            (live / 'a.example.com' / 'fullchain.pem').write_text('renewed')
+            return Mock(returncode=0, stderr='')
+
+        mock_run.side_effect = renew_a
+        read = manager._read_local_certificate_expiry
+
+        def read_expiry(domain, cert_path=None):
+            if cert_path.read_text() == 'renewed':
+                return {'domain': domain, 'expires_at': '2099-01-01T00:00:00'}
+            return read(domain, cert_path)
+
+        with patch('src.soap_integration.certificate_manager.CERTBOT_LIVE_DIR', live), \
+             patch.object(manager, '_read_local_certificate_expiry', side_effect=read_expiry):
+            results = manager._renew_all_with_certbot(['a.example.com', 'b.example.com', 'c.example.com'])
+
+        assert mock_run.call_count == 1
+        assert results['a.example.com']['status'] == 'success'
+        assert results['b.example.com']['status'] == 'failed'
+        assert results['c.example.com']['status'] == 'failed'
+
+    @patch('subprocess.run', side_effect=PermissionError('certbot: permission denied'))
+    def test_renew_all_with_certbot_os_error(self, mock_run, manager):
+        """Test an OSError from certbot fails the domains instead of escaping"""
+        results = manager._renew_all_with_certbot(['a.example.com', 'b.example.com'])
+
+        assert all(r['status'] == 'failed' for r in results.values())
+        assert 'permission denied' in results['a.example.com']['message']
+
+    def test_registered_domain_respects_public_suffixes(self):
+        """Test multi-label public suffixes do not merge unrelated domains"""
+        from collections import namedtuple
+        from src.soap_integration import certificate_manager
+        from src.soap_integration.certificate_manager import _registered_domain
+
+        with patch.object(certificate_manager, 'HAS_TLDEXTRACT', False):
+            assert _registered_domain('foo.co.uk') != _registered_domain('bar.co.uk')
+
+        Extracted = namedtuple('Extracted', 'subdomain domain suffix')
+        fake = {'api.foo.co.uk': Extracted('api', 'foo', 'co.uk'),
+                'www.foo.co.uk': Extracted('www', 'foo', 'co.uk'),
+                'bar.co.uk': Extracted('', 'bar', 'co.uk')}
+        with patch.object(certificate_manager, 'HAS_TLDEXTRACT', True), \
+             patch.object(certificate_manager, '_TLD_EXTRACT', fake.get, create=True):
+            assert _registered_domain('api.foo.co.uk') == 'foo.co.uk'
+            assert _registered_domain('www.foo.co.uk') == 'foo.co.uk'
+            assert _registered_domain('bar.co.uk') == 'bar.co.uk'
+
+    def test_auto_renew_reads_internal_certificates_from_disk(self, manager):
+        """Test internal domains are checked from disk without a TLS probe"""
+        pytest.importorskip('cryptography')
+        domain = 'internal.example.com'
+        manager._generate_self_signed(domain, manager.cert_dir / f'{domain}.key',
+                                      manager.cert_dir / f'{domain}.crt')
+        (manager.policy_dir / 'monitored_domains.json').write_text(
+            json.dumps({'domains': [domain]})
+        )
+
+        with patch.object(manager, 'check_certificate_expiry') as mock_probe, \
+             patch.object(manager, '_renew_certificate_async',
+                          new=AsyncMock(side_effect=lambda d, **kwargs: {'domain': d, 'status': 'success'})):
+            results = manager.auto_renew_expiring_certificates(days_threshold=400)
+
+        mock_probe.assert_not_called()
+        assert [r['domain'] for r in results] == [domain]
+
+    def test_renew_with_custom_ca(self, manager):
+        """Test custom CA renewal runs the openssl pipeline"""
+        with patch('src.soap_integration.certificate_manager.HAS_CRYPTOGRAPHY', False), \
+             patch.object(manager, '_run_openssl', new=AsyncMock()) as mock_openssl:
+            result = manager.renew_certificate('internal.example.com')
+
+        assert result['status'] == 'success'
+        assert [c.args[0] for c in mock_openssl.call_args_list] == ['genrsa', 'req', 'x509']
+
+    def test_renew_with_custom_ca_in_process(self, manager):
+        """Test custom CA renewal generates key and certificate in-process"""
+        pytest.importorskip('cryptography')
+
+        with patch.object(manager, '_run_openssl', new=AsyncMock()) as mock_openssl:
+            result = manager.renew_certificate('internal.example.com')
+
+        assert result['status'] == 'success'
+        mock_openssl.assert_not_called()
+        assert (manager.cert_dir / 'internal.example.com.key').exists()
+        assert (manager.cert_dir / 'internal.example.com.crt').read_bytes().startswith(b'-----BEGIN CERTIFICATE-----')
 
 
 class TestContainerLifecycleManager:
@@ -277,6 +606,89 @@ class TestContainerLifecycleManager:
         assert 'cpu_usage' in report
         assert 'memory_usage' in report
 
+    def test_monitor_containers_restarts_unhealthy(self, manager):
+        """Test monitoring checks every container and restarts unhealthy ones"""
+        healthy = Mock(id='aaa111bbb222', status='running', attrs={'State': {}})
+        healthy.name = 'healthy'
+        sick = Mock(id='ccc333ddd444', status='running',
+                    attrs={'State': {'Health': {'Status': 'unhealthy'}}})
+        sick.name = 'sick'
+        for container in (healthy, sick):
+            container.stats.return_value = {
+                'cpu_stats': {'cpu_usage': {'total_usage': 200},
+                              'system_cpu_usage': 20000, 'online_cpus': 1},
+                'precpu_stats': {'cpu_usage': {'total_usage': 100},
+                                 'system_cpu_usage': 10000},
+                'memory_stats': {'usage': 100, 'limit': 1000}
+            }
+
+        manager.client.containers.list.return_value = [healthy, sick]
+
+        with patch.object(manager, '_auto_restart_container') as mock_restart:
+            reports = manager.monitor_containers()
+
+        assert [r['name'] for r in reports] == ['healthy', 'sick']
+        mock_restart.assert_called_once_with(sick, 'Container unhealthy')
+
+    def test_evaluate_container_health_thresholds(self, manager):
+        """Test thresholds are applied across a batch of samples"""
+        def sample(cpu_total, memory_usage):
+            return {
+                'cpu_stats': {'cpu_usage': {'total_usage': cpu_total},
+                              'system_cpu_usage': 2000, 'online_cpus': 1},
+                'precpu_stats': {'cpu_usage': {'total_usage': 0},
+                                 'system_cpu_usage': 1000},
+                'memory_stats': {'usage': memory_usage, 'limit': 1000}
+            }
+
+        containers = []
+        for name in ('idle', 'busy', 'bloated', 'broken'):
+            container = Mock(id=f'{name}0000000000', status='running', attrs={'State': {}})
+            container.name = name
+            containers.append(container)
+
+        samples = [(sample(100, 100), None), (sample(900, 100), None),
+                   (sample(100, 900), None), (None, RuntimeError('gone'))]
+
+        reports = manager._evaluate_container_health(containers, samples)
+
+        assert [r['needs_restart'] for r in reports] == [False, True, True, False]
+        assert reports[1]['reason'] == 'High CPU usage: 90.0%'
+        assert reports[2]['reason'] == 'High memory usage: 90.0%'
+        assert reports[3]['reason'] == 'Monitoring error: gone'
+
+    def test_auto_restart_container_cooldown(self, manager):
+        """Test restarts respect the cooldown and expired entries are dropped"""
+        container = Mock(id='abcdef1234567890')
+        container.name = 'app'
+
+        manager._auto_restart_container(container, 'High CPU')
+        manager._auto_restart_container(container, 'High CPU')
+        assert container.restart.call_count == 1
+
+        manager.restart_history['abcdef123456'] -= manager.restart_cooldown
+        manager._auto_restart_container(container, 'High CPU')
+        assert container.restart.call_count == 2
+        assert len(manager.restart_history) == 1
+
+    def test_check_container_health_uses_streamed_stats(self, manager):
+        """Test streamed stats samples are used instead of a one-shot request"""
+        container = Mock(id='eee555fff666', status='running', attrs={'State': {}})
+        container.name = 'streamed'
+        manager._latest_stats[container.id] = {
+            'cpu_stats': {'cpu_usage': {'total_usage': 1900},
+                          'system_cpu_usage': 2000, 'online_cpus': 1},
+            'precpu_stats': {'cpu_usage': {'total_usage': 1000},
+                             'system_cpu_usage': 1000},
+            'memory_stats': {'usage': 100, 'limit': 1000}
+        }
+
+        report = manager._check_container_health(container)
+
+        container.stats.assert_not_called()
+        assert report['cpu_usage'] == 90.0
+        assert report['needs_restart'] is True
+
     def test_restart_containers(self, manager):
         """Test container restart"""
         # Mock containers
@@ -297,6 +709,35 @@ class TestContainerLifecycleManager:
         mock_container1.restart.assert_called_once()
         mock_container2.restart.assert_called_once()
 
+    def test_restart_containers_multiple_patterns(self, manager):
+        """Test restart with comma-separated name patterns"""
+        containers = []
+        for name in ('web_1', 'worker_1', 'db_1'):
+            container = Mock()
+            container.name = name
+            containers.append(container)
+
+        manager.client.containers.list.return_value = containers
+
+        result = manager.restart_containers('web, worker')
+
+        assert sorted(result['restarted']) == ['web_1', 'worker_1']
+        containers[2].restart.assert_not_called()
+
+    def test_restart_containers_many_patterns(self, manager):
+        """Test restart with a pattern set large enough for the automaton"""
+        containers = []
+        for name in ('tenant3-web', 'tenant9-db', 'other'):
+            container = Mock()
+            container.name = name
+            containers.append(container)
+
+        manager.client.containers.list.return_value = containers
+
+        result = manager.restart_containers(','.join(f'tenant{i}-' for i in range(10)))
+
+        assert sorted(result['restarted']) == ['tenant3-web', 'tenant9-db']
+
     def test_deploy_fresh_containers(self, manager):
         """Test fresh container deployment"""
         # Mock image pull and container run
@@ -313,6 +754,24 @@ class TestContainerLifecycleManager:
         assert len(result['deployed']) == 2
         assert manager.client.images.pull.called
 
+    def test_cleanup_old_images(self, manager):
+        """Test only old images not used by any container are removed"""
+        now = int(datetime.now().timestamp())
+        old = now - 30 * 86400
+
+        manager.client.api.images.return_value = [
+            {'Id': 'sha256:old', 'Created': old, 'Size': 1024 * 1024},
+            {'Id': 'sha256:used', 'Created': old, 'Size': 1024 * 1024},
+            {'Id': 'sha256:new', 'Created': now, 'Size': 1024 * 1024},
+        ]
+        manager.client.api.containers.return_value = [{'ImageID': 'sha256:used'}]
+
+        result = manager.cleanup_old_images(days_old=7)
+
+        manager.client.api.remove_image.assert_called_once_with('sha256:old', force=True)
+        assert result['count'] == 1
+        assert result['space_freed_mb'] == 1.0
+
     def test_get_system_resources(self, manager):
         """Test system resource retrieval"""
         resources = manager.get_system_resources()
@@ -322,6 +781,15 @@ class TestContainerLifecycleManager:
         assert 'disk_percent' in resources
         assert 'timestamp' in resources
 
+    @patch('psutil.cpu_percent', return_value=12.5)
+    def test_get_system_resources_non_blocking(self, mock_cpu, manager):
+        """Test CPU is sampled without blocking and snapshots are reused"""
+        first = manager.get_system_resources()
+        second = manager.get_system_resources()
+
+        assert first == second
+        mock_cpu.assert_called_once_with(interval=None)
+
 
 class TestSOAPIntegration:
     """Integration tests for SOAP endpoints"""
@@ -336,32 +804,131 @@ class TestSOAPIntegration:
         """Test SOAP application creation"""
         assert soap_app is not None
 
-    @patch('src.soap_integration.soap_server.EnhancedKnowledgeBase')
-    def test_get_fixes_by_category(self, mock_kb):
+    def test_get_fixes_by_category(self):
         """Test getting fixes by category via SOAP"""
-        from src.soap_integration import SpongeSOAPService
+        from types import MappingProxyType
+        from src.soap_integration import SpongeSOAPService, soap_server
+        from src.soap_integration.soap_server import Fix
 
-        # Setup mock
-        mock_kb_instance = Mock()
-        mock_results = MagicMock()
-        mock_results.iterrows.return_value = [
-            (0, {
-                'Error_Pattern': 'Test error',
+        records = tuple(MappingProxyType(row) for row in [
+            {
+                'Error_Pattern': 'Memory leak in worker',
                 'Category': 'Memory',
                 'Severity': 'high',
-                'Solution': 'Test solution',
-                'Implementation_Steps': '[]',
-                'Confidence': '0.9',
+                'Solution': 'Restart worker',
+                'Implementation_Steps': '["systemctl restart worker"]',
+                'Confidence': 0.9,
                 'Last_Updated': '2024-01-01'
-            })
-        ]
-        mock_kb_instance.search.return_value = mock_results
+            },
+            {
+                'Error_Pattern': 'OOM killer invoked',
+                'Category': 'Memory',
+                'Severity': 'critical',
+                'Solution': 'Raise memory limit',
+                'Implementation_Steps': '[]',
+                'Confidence': 0.75,
+                'Last_Updated': '2024-02-01'
+            }
+        ])
+        kb = Mock()
+        kb.search_records.return_value = records
+
+        with patch.object(soap_server, '_get_kb', return_value=kb):
+            fixes = list(SpongeSOAPService.get_fixes_by_category(None, 'Memory'))
+
+        kb.search_records.assert_called_once_with({'categories': ['Memory']})
+        assert len(fixes) == 2
+        assert all(isinstance(fix, Fix) for fix in fixes)
+        assert [fix.error_pattern for fix in fixes] == ['Memory leak in worker', 'OOM killer invoked']
+        assert fixes[0].severity == 'high'
+        assert fixes[0].implementation_steps == '["systemctl restart worker"]'
+        assert fixes[1].confidence == '0.75'
+        assert fixes[1].automation_script == ''
+
+    @patch('src.soap_integration.soap_server.HAS_WAITRESS', True)
+    @patch('src.soap_integration.soap_server.serve', create=True)
+    def test_run_soap_server_threaded(self, mock_serve):
+        """Test the SOAP server is served by a multi-threaded WSGI server"""
+        from src.soap_integration.soap_server import run_soap_server, SERVER_THREADS
+
+        run_soap_server(host='127.0.0.1', port=0)
+
+        assert mock_serve.call_args.kwargs['threads'] == SERVER_THREADS
+
+    def test_log_listener_queues_root_logging(self):
+        """Test request logging is queued while serving and restored afterwards"""
+        import logging
+        import logging.handlers
+        from src.soap_integration.soap_server import _start_log_listener, _stop_log_listener
+
+        root = logging.getLogger()
+        original = root.handlers[:]
+
+        listener = _start_log_listener()
+        try:
+            assert any(isinstance(h, logging.handlers.QueueHandler) for h in root.handlers)
+        finally:
+            _stop_log_listener(listener)
+
+        assert not any(isinstance(h, logging.handlers.QueueHandler) for h in root.handlers)
+        if original:
+            assert root.handlers == original
 
-        with patch('src.knowledge_base.EnhancedKnowledgeBase', return_value=mock_kb_instance):
+    def test_auto_remediate_runs_in_background(self):
+        """Test auto_remediate returns immediately and can be polled"""
+        from src.soap_integration import soap_server
+        from src.soap_integration.soap_server import SpongeSOAPService, RemediationRequest
+
+        agent = Mock()
+        agent.execute_remediation.return_value = {
+            'status': 'success', 'message': 'done', 'playbook_path': 'p.yml', 'log': ''
+        }
+        request = RemediationRequest(issue_id='memory_leak', environment='dev',
+                                     auto_approve='true', notification_email=None)
+
+        with patch.object(soap_server, '_get_agent', return_value=agent):
             service = SpongeSOAPService()
-            fixes = service.get_fixes_by_category(None, 'Memory')
+            queued = service.auto_remediate(None, request)
+            assert queued.status == 'pending'
+            assert queued.request_id != service.auto_remediate(None, request).request_id
+
+            soap_server._REMEDIATION_JOBS[queued.request_id][1].result(timeout=10)
+            status = service.get_remediation_status(None, queued.request_id)
+
+        assert status.status == 'success'
+        assert status.ansible_playbook_path == 'p.yml'
+        assert service.get_remediation_status(None, 'REM-unknown').status == 'failed'
+
+    def test_handler_reports_missing_dependency(self):
+        """Test handlers fail cleanly when an optional component is unavailable"""
+        from src.soap_integration import soap_server
+        from src.soap_integration.soap_server import SpongeSOAPService
+
+        with patch.object(soap_server, 'ContainerLifecycleManager', None):
+            message = SpongeSOAPService().restart_containers(None, 'web-*')
+
+        assert message.startswith('Failed: ContainerLifecycleManager is unavailable')
+        assert SpongeSOAPService().health_check(None) == 'healthy'
+
+    def test_iter_fixes(self):
+        """Test knowledge base rows lazily convert to Fix objects"""
+        from src.soap_integration.soap_server import _iter_fixes
+
+        fixes = list(_iter_fixes([{'Error_Pattern': 'OOM', 'Category': 'Memory', 'Confidence': 0.9}]))
+
+        assert len(fixes) == 1
+        assert fixes[0].error_pattern == 'OOM'
+        assert fixes[0].confidence == '0.9'
+        assert fixes[0].solution == ''
+
+    def test_knowledge_base_shared_across_requests(self):
+        """Test the knowledge base is loaded once and reused"""
+        from src.soap_integration import soap_server
 
-            assert isinstance(fixes, list)
+        with patch.object(soap_server, '_KB', None), \
+             patch.object(soap_server, 'EnhancedKnowledgeBase') as mock_kb:
+            assert soap_server._get_kb() is soap_server._get_kb()
+            mock_kb.assert_called_once()
 
 
 if __name__ == '__main__':
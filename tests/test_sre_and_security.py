@@ -16,11 +16,12 @@ Production-ready with proper setup/teardown, mocking, and comprehensive coverage
 
 import pytest
 import tempfile
+import time
 import shutil
 import json
 import sqlite3
 from pathlib import Path
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from unittest.mock import Mock, patch, MagicMock
 
 # SRE Automation imports
@@ -34,7 +35,9 @@ from src.sre_automation.self_healing import SelfHealingSystem, RemediationAction
 # Security Automation imports
 from src.security_automation.jit_access import JITAccessManager, AccessRequest, AccessGrant
 from src.security_automation.soar_engine import SOAREngine, SecurityIncident
-from src.security_automation.threat_intelligence import ThreatIntelligence, ThreatIndicator, IPReputation
+from src.security_automation.threat_intelligence import (
+    ThreatIntelligence, ThreatIndicator, IPReputation, TokenBucket
+)
 
 # Metrics import
 from src.prometheus_integration import PrometheusMetrics
@@ -254,6 +257,24 @@ class TestRunbookEngineAndExecutor:
         assert result is True
         assert "test_runbook" in runbook_engine.runbooks
 
+    def test_runbooks_reloaded_from_disk(self, runbook_engine):
+        """Test runbooks written by create_runbook load back, skipping bad files."""
+        runbook_engine.create_runbook("reload_test", [RunbookStep(
+            name="Step",
+            action_type="command",
+            action="echo ok",
+            parallel_group="g1"
+        )])
+        (runbook_engine.runbooks_dir / "broken.yaml").write_text("steps: [")
+
+        reloaded = RunbookEngine(runbooks_dir=str(runbook_engine.runbooks_dir))
+
+        assert reloaded.list_runbooks() == ["reload_test"]
+        assert reloaded.get_runbook("reload_test")[0].parallel_group == "g1"
+        content = (runbook_engine.runbooks_dir / "reload_test.yaml").read_text()
+        assert "_has_placeholders" not in content
+        assert content.startswith("name: reload_test")
+
     def test_get_runbook(self, runbook_engine):
         """Test retrieving a runbook."""
         steps = [RunbookStep(
@@ -285,6 +306,8 @@ class TestRunbookEngineAndExecutor:
         assert isinstance(result, RunbookResult)
         assert result.runbook_name == "echo_test"
         assert result.steps_executed >= 1
+        assert result.execution_time >= 0
+        assert isinstance(result.started_at, datetime)
 
     def test_execute_runbook_dry_run(self, runbook_engine):
         """Test executing runbook in dry-run mode."""
@@ -301,6 +324,311 @@ class TestRunbookEngineAndExecutor:
         assert result.success is True
         assert result.steps_executed == 1
 
+    def test_success_criteria_compiled_once(self, runbook_engine):
+        """Test success criteria regexes are compiled once and reused."""
+        from src.sre_automation.runbook_automation import _compile_criteria, _criteria_matcher
+
+        _compile_criteria.cache_clear()
+        _criteria_matcher.cache_clear()
+        steps = [RunbookStep(
+            name="Check",
+            action_type="command",
+            action="echo 'ok 42%'",
+            success_criteria=r"\d+%"
+        )]
+        runbook_engine.create_runbook("criteria_test", steps)
+
+        executor = RunbookExecutor(runbook_engine, dry_run=False)
+        assert executor.execute("criteria_test").success is True
+        assert executor.execute("criteria_test").success is True
+        assert _compile_criteria.cache_info().misses == 1
+
+    def test_parallel_group_and_rollback(self, runbook_engine, temp_dir):
+        """Test grouped steps run concurrently and rollbacks all run on failure."""
+        import time
+
+        steps = [
+            RunbookStep(name="A", action_type="command", action="sleep 0.5",
+                        parallel_group="warmup", rollback_action=f"touch {temp_dir}/a"),
+            RunbookStep(name="B", action_type="command", action="sleep 0.5",
+                        parallel_group="warmup", rollback_action=f"touch {temp_dir}/b"),
+            RunbookStep(name="Fail", action_type="command", action="exit 1", retry_count=1)
+        ]
+        runbook_engine.create_runbook("parallel_test", steps)
+
+        started = time.perf_counter()
+        result = RunbookExecutor(runbook_engine, dry_run=False).execute("parallel_test")
+
+        assert time.perf_counter() - started < 1.0
+        assert result.steps_executed == 3
+        assert result.steps_failed == 1
+        assert Path(f"{temp_dir}/a").exists() and Path(f"{temp_dir}/b").exists()
+
+    def test_substitute_variables_single_pass(self, runbook_engine):
+        """Test placeholders are substituted once and unknown ones are kept."""
+        executor = RunbookExecutor(runbook_engine, dry_run=True)
+
+        text = executor._substitute_variables(
+            "restart {{service}} on {{host}} {{missing}}",
+            {'service': '{{host}}', 'host': 'web-1'}
+        )
+
+        assert text == "restart {{host}} on web-1 {{missing}}"
+
+    def test_api_call_uses_pooled_session(self, runbook_engine):
+        """Test api_call steps go through the executor's persistent session."""
+        executor = RunbookExecutor(runbook_engine, dry_run=False)
+        response = Mock(status_code=200, text='ok')
+
+        with patch.object(executor._http, 'request', return_value=response) as mock_request:
+            first = executor._execute_api_call('post http://svc/restart {"force": true}')
+            executor._execute_api_call('post http://svc/restart {"force": true}')
+
+        assert first['success'] is True
+        assert mock_request.call_count == 2
+        assert mock_request.call_args.kwargs['json'] == {'force': True}
+        executor.close()
+
+    def test_execution_history_bounded(self, runbook_engine):
+        """Test history keeps the newest results and hands evicted ones to the sink."""
+        evicted = []
+        executor = RunbookExecutor(runbook_engine, dry_run=True,
+                                   history_size=2, history_sink=evicted.append)
+
+        for name in ("first", "second", "third"):
+            runbook_engine.create_runbook(name, [RunbookStep(
+                name="Step", action_type="command", action="echo ok"
+            )])
+            executor.execute(name)
+
+        assert [r.runbook_name for r in executor.get_execution_history()] == ["second", "third"]
+        assert [r.runbook_name for r in executor.get_execution_history(limit=1)] == ["third"]
+        assert [r.runbook_name for r in evicted] == ["first"]
+
+    def test_placeholder_free_step_skips_substitution(self, runbook_engine):
+        """Test steps without {{...}} placeholders are not substituted."""
+        runbook_engine.create_runbook("plain_test", [RunbookStep(
+            name="Plain", action_type="command", action="echo plain"
+        )])
+        executor = RunbookExecutor(runbook_engine, dry_run=False)
+
+        with patch.object(executor, '_substitute_variables') as mock_substitute:
+            result = executor.execute("plain_test", {'host': 'web-1'})
+
+        assert result.success is True
+        mock_substitute.assert_not_called()
+
+    def test_simple_commands_skip_shell(self, runbook_engine):
+        """Test metacharacter-free commands are exec'd without /bin/sh."""
+        executor = RunbookExecutor(runbook_engine, dry_run=False)
+
+        simple = executor._execute_command("echo 'hello world'", timeout=10, retry_count=1)
+        piped = executor._execute_command("echo hello | tr a-z A-Z", timeout=10, retry_count=1)
+        builtin = executor._execute_command("exit 3", timeout=10, retry_count=1)
+
+        assert simple == {'success': True, 'output': 'hello world\n', 'error': None}
+        assert piped['output'] == 'HELLO\n'
+        assert builtin['success'] is False
+
+        with patch('src.sre_automation.runbook_automation._run_capped',
+                   return_value=(0, '', '', 0)) as mock_run:
+            executor._execute_command("echo ok", timeout=10, retry_count=1)
+
+        assert mock_run.call_args.args[0] == ['echo', 'ok']
+        assert mock_run.call_args.kwargs['shell'] is False
+
+    def test_precompiled_steps_hit_caches(self, runbook_engine):
+        """Test precompiled steps execute without recompiling their patterns."""
+        from src.sre_automation import runbook_automation
+
+        step = runbook_automation.COMMON_RUNBOOKS['disk_cleanup'][0]
+        runbook_automation._criteria_matcher.cache_clear()
+        runbook_automation._precompile(step)
+
+        executor = RunbookExecutor(runbook_engine, dry_run=False)
+        assert executor._check_success_criteria("/dev/sda1 42%", step.success_criteria)
+
+        info = runbook_automation._criteria_matcher.cache_info()
+        assert (info.hits, info.misses) == (1, 1)
+
+    def test_step_dispatch_by_action_type(self, runbook_engine):
+        """Test steps dispatch on action_type, rejecting unknown types."""
+        executor = RunbookExecutor(runbook_engine, dry_run=False)
+
+        wait = executor._execute_step(RunbookStep(name="W", action_type="wait", action="0"), {})
+        unknown = executor._execute_step(RunbookStep(name="X", action_type="teleport", action="x"), {})
+
+        assert wait['success'] is True
+        assert wait['output'] == "Waited 0 seconds"
+        assert unknown['success'] is False
+        assert "teleport" in unknown['error']
+
+    def test_fused_command_steps(self, temp_dir):
+        """Test adjacent command steps share one shell but report per step."""
+        engine = RunbookEngine(runbooks_dir=f"{temp_dir}/fused", enable_fusion=True)
+        engine.create_runbook("fusion_test", [
+            RunbookStep(name="one", action_type="command", action="echo one"),
+            RunbookStep(name="two", action_type="command", action="echo two; exit 4"),
+            RunbookStep(name="three", action_type="command", action="echo three")
+        ])
+
+        assert len(engine.get_execution_plan("fusion_test")) == 1
+
+        result = RunbookExecutor(engine, dry_run=False).execute("fusion_test")
+
+        assert [o['step_name'] for o in result.output] == ["one", "two"]
+        assert result.output[0] == {'step_name': 'one', 'action_type': 'command',
+                                    'success': True, 'output': 'one\n', 'error': None}
+        assert result.output[1]['success'] is False
+        assert result.output[1]['output'] == 'two\n'
+        assert result.steps_executed == 2
+        assert result.steps_failed == 1
+
+    def test_fused_steps_succeed_past_output_cap(self, temp_dir):
+        """Test a clean fused run counts every step even when early sentinels are truncated."""
+        engine = RunbookEngine(runbooks_dir=f"{temp_dir}/fused_big", enable_fusion=True)
+        engine.create_runbook("fusion_big", [
+            RunbookStep(name="a", action_type="command", action="echo hi"),
+            RunbookStep(name="b", action_type="command", action="echo there"),
+            RunbookStep(name="c", action_type="command",
+                        action="head -c 2097152 /dev/zero | tr '\\0' x")
+        ])
+
+        from src.sre_automation.runbook_automation import FUSION_SENTINEL, MAX_OUTPUT_BYTES
+
+        with patch.object(RunbookExecutor, '_execute_rollback') as mock_rollback:
+            result = RunbookExecutor(engine, dry_run=False).execute("fusion_big")
+
+        assert result.success is True
+        assert [o['success'] for o in result.output] == [True, True, True]
+        assert result.output[0]['output'] == ''  # scrolled out of the kept tail
+        assert result.output[2]['output'] == 'x' * (MAX_OUTPUT_BYTES - len(FUSION_SENTINEL))
+        mock_rollback.assert_not_called()
+
+    def test_noop_rollback_skipped(self, runbook_engine):
+        """Test echo-only rollback placeholders are not executed."""
+        runbook_engine.create_runbook("noop_rollback_test", [
+            RunbookStep(name="ok", action_type="command", action="true",
+                        rollback_action="echo 'No rollback needed'"),
+            RunbookStep(name="fail", action_type="command", action="false", retry_count=1)
+        ])
+        executor = RunbookExecutor(runbook_engine, dry_run=False)
+
+        with patch.object(executor, '_execute_rollback') as mock_rollback:
+            result = executor.execute("noop_rollback_test")
+
+        assert result.success is False
+        mock_rollback.assert_not_called()
+        assert RunbookStep(name="x", action_type="command", action="true",
+                           rollback_action="echo x > /tmp/marker")._rollback_is_noop is False
+
+    def test_rollback_deduplicated(self, runbook_engine):
+        """Test repeated rollback commands run once unless dedupe is disabled."""
+        actions = [("systemctl reload nginx", None), ("certbot rollback", None),
+                   ("systemctl reload nginx", None)]
+
+        executor = RunbookExecutor(runbook_engine, dry_run=False)
+        with patch.object(executor, '_execute_rollback_async', new=Mock(return_value=None)) as mock_async, \
+                patch('src.sre_automation.runbook_automation.asyncio.run'):
+            executor._execute_rollback(actions)
+        assert mock_async.call_args.args[0] == [["systemctl reload nginx"], ["certbot rollback"]]
+
+        executor = RunbookExecutor(runbook_engine, dry_run=False, dedupe_rollback=False)
+        with patch.object(executor, '_execute_rollback_async', new=Mock(return_value=None)) as mock_async, \
+                patch('src.sre_automation.runbook_automation.asyncio.run'):
+            executor._execute_rollback(actions)
+        assert len(mock_async.call_args.args[0]) == 3
+
+    def test_rollback_runs_in_reverse_order(self, runbook_engine, tmp_path):
+        """Test rollbacks run LIFO, overlapping only within a parallel group."""
+        log = tmp_path / 'rollback.log'
+        actions = [(f"echo first >> {log}", None),
+                   (f"sleep 0.2; echo second >> {log}", None),
+                   (f"echo g1 >> {log}", "g"), (f"echo g2 >> {log}", "g")]
+
+        executor = RunbookExecutor(runbook_engine, dry_run=False)
+        with patch.object(executor, '_execute_rollback_async',
+                          wraps=executor._execute_rollback_async) as mock_async:
+            executor._execute_rollback(actions)
+
+        assert mock_async.call_args.args[0][0] == [f"echo g2 >> {log}", f"echo g1 >> {log}"]
+        assert log.read_text().split()[-2:] == ["second", "first"]
+
+    def test_rollback_inside_running_event_loop(self, runbook_engine, tmp_path):
+        """Test rollbacks still run when execute() is called from async code."""
+        import asyncio
+
+        log = tmp_path / 'rollback.log'
+        executor = RunbookExecutor(runbook_engine, dry_run=False)
+
+        async def caller():
+            executor._execute_rollback([(f"echo undone >> {log}", None)])
+
+        asyncio.run(caller())
+        assert log.read_text().split() == ["undone"]
+
+    def test_step_numbering_counts_steps(self, runbook_engine, caplog):
+        """Test progress logs number original steps, not groups."""
+        import logging
+
+        runbook_engine.create_runbook("numbering_test", [
+            RunbookStep(name="a", action_type="command", action="true", parallel_group="g"),
+            RunbookStep(name="b", action_type="command", action="true", parallel_group="g"),
+            RunbookStep(name="c", action_type="command", action="true")
+        ])
+        executor = RunbookExecutor(runbook_engine, dry_run=False)
+
+        with caplog.at_level(logging.INFO, logger='src.sre_automation.runbook_automation'):
+            executor.execute("numbering_test")
+
+        messages = [r.getMessage() for r in caplog.records if r.getMessage().startswith('Step ')]
+        assert messages == ["Step 1/3: a", "Step 2/3: b", "Step 3/3: c"]
+
+    def test_literal_success_criteria(self, runbook_engine):
+        """Test literal criteria skip the regex engine but regexes still work."""
+        from src.sre_automation.runbook_automation import _compile_criteria
+
+        executor = RunbookExecutor(runbook_engine, dry_run=False)
+        _compile_criteria.cache_clear()
+
+        assert executor._check_success_criteria("status: healthy", "healthy")
+        assert not executor._check_success_criteria("status: unhealthy?", "starting")
+        assert _compile_criteria.cache_info().misses == 0
+        assert executor._check_success_criteria("notAfter=2030", r"not\w+=\d+")
+
+    def test_command_output_capped(self):
+        """Test command output keeps only a bounded tail and honours timeouts."""
+        import subprocess
+        import sys
+        from src.sre_automation.runbook_automation import _run_capped
+
+        returncode, stdout, stderr, _ = _run_capped(
+            [sys.executable, '-c', 'import sys; print("x" * 5000 + "END"); sys.stderr.write("warn")'],
+            shell=False, timeout=30, max_bytes=100
+        )
+
+        assert returncode == 0
+        assert len(stdout) == 100 and stdout.endswith("END\n")
+        assert stderr == "warn"
+
+        with pytest.raises(subprocess.TimeoutExpired):
+            _run_capped("sleep 5", shell=True, timeout=0.2)
+
+    def test_runbook_groups_compiled_once(self, runbook_engine):
+        """Test step grouping is reused until the runbook is replaced."""
+        steps = [RunbookStep(name="Step", action_type="command", action="true")]
+        runbook_engine.create_runbook("compiled_test", steps)
+        executor = RunbookExecutor(runbook_engine, dry_run=True)
+
+        with patch.object(RunbookExecutor, '_group_steps', wraps=RunbookExecutor._group_steps) as mock_group:
+            executor.execute("compiled_test")
+            executor.execute("compiled_test")
+            assert mock_group.call_count == 1
+
+            runbook_engine.create_runbook("compiled_test", list(steps))
+            executor.execute("compiled_test")
+            assert mock_group.call_count == 2
+
     def test_execute_nonexistent_runbook(self, runbook_engine):
         """Test executing a runbook that doesn't exist."""
         executor = RunbookExecutor(runbook_engine, dry_run=False)
@@ -407,6 +735,28 @@ class TestSLOManager:
             assert alert.slo_name == "alert_test"
             assert alert.severity in ['warning', 'critical', 'page']
 
+    def test_check_and_alert_bulk(self, slo_manager):
+        """Test bulk checks match per-SLO budgets across window lengths."""
+        for name, window_days, good in [("bulk_bad", 7, 5), ("bulk_good", 30, 20), ("bulk_bad_30", 30, 10)]:
+            slo_manager.create_slo(SLO(name=name, service=name, sli_type="availability",
+                                       target=99.5, window_days=window_days,
+                                       measurement_query="test", alert_threshold=60.0))
+            for i in range(20):
+                slo_manager.record_measurement(slo_name=name, value=95.0, is_good=(i < good))
+
+        names = ["bulk_bad", "unknown_slo", "bulk_good", "bulk_bad_30"]
+        budgets = slo_manager._calculate_error_budgets(["bulk_bad", "bulk_good", "bulk_bad_30"])
+        assert budgets["bulk_bad"].consumed == 15
+        assert budgets["bulk_bad_30"].consumed == 10
+        assert budgets["bulk_good"].status == 'healthy'
+
+        alerts = slo_manager.check_and_alert_bulk(names)
+        assert list(alerts) == names
+        assert alerts["unknown_slo"] is None and alerts["bulk_good"] is None
+        assert alerts["bulk_bad"].slo_name == "bulk_bad"
+        assert alerts["bulk_bad_30"].slo_name == "bulk_bad_30"
+        assert {a.slo_name for a in slo_manager.get_active_alerts()} == {"bulk_bad", "bulk_bad_30"}
+
 
 # ============================================================================
 # JIT ACCESS MANAGER TESTS
@@ -575,13 +925,96 @@ class TestSOAREngine:
 class TestThreatIntelligence:
     """Tests for Threat Intelligence module."""
 
-    @patch('src.security_automation.threat_intelligence.requests.get')
+    @patch('requests.get')
     def test_check_ip_reputation_with_cache(self, mock_get, threat_intelligence):
         """Test checking IP reputation with caching."""
         reputation = threat_intelligence.check_ip_reputation("192.168.1.1")
         # Result depends on whether API key is set
         assert reputation is None or isinstance(reputation, IPReputation)
 
+    def test_cached_ip_reputation_round_trip(self, threat_intelligence):
+        """Test cached reputations are returned until they expire."""
+        reputation = IPReputation(
+            ip="203.0.113.7", reputation_score=20, is_malicious=True,
+            abuse_confidence=80, country="US", asn="Example", usage_type="datacenter",
+            reports=12, last_reported=None, categories=["scanner"]
+        )
+        threat_intelligence._cache_ip_reputation(reputation)
+
+        cached = threat_intelligence._get_cached_ip_reputation("203.0.113.7")
+        assert cached == reputation
+
+        threat_intelligence._conn.execute(
+            "UPDATE ip_reputation_cache SET expires_at = 0 WHERE ip = ?", ("203.0.113.7",)
+        )
+        assert threat_intelligence._get_cached_ip_reputation("203.0.113.7") is None
+
+    def test_stale_ip_reputation_served_while_refreshing(self, threat_intelligence):
+        """Test expired-but-recent entries are returned and refreshed in background."""
+        threat_intelligence.abuseipdb_api_key = "test-key"
+        stale = IPReputation(
+            ip="203.0.113.8", reputation_score=90, is_malicious=False,
+            abuse_confidence=10, country="US", asn="Example", usage_type="isp",
+            reports=1, last_reported=None, categories=[]
+        )
+        fresh = IPReputation(
+            ip="203.0.113.8", reputation_score=10, is_malicious=True,
+            abuse_confidence=90, country="US", asn="Example", usage_type="isp",
+            reports=50, last_reported=None, categories=["scanner"]
+        )
+        threat_intelligence._cache_ip_reputation(stale)
+        threat_intelligence._conn.execute(
+            "UPDATE ip_reputation_cache SET expires_at = ? WHERE ip = ?",
+            (int(datetime.now().timestamp()) - 60, "203.0.113.8")
+        )
+
+        with patch.object(threat_intelligence, '_check_abuseipdb', return_value=fresh) as mock_check:
+            assert threat_intelligence.check_ip_reputation("203.0.113.8") == stale
+            threat_intelligence._refresh_executor.shutdown(wait=True)
+            mock_check.assert_called_once_with("203.0.113.8")
+
+        assert threat_intelligence._get_cached_ip_reputation("203.0.113.8") == fresh
+
+    def test_token_bucket_rate_limits(self):
+        """Test token bucket allows a burst then waits for refill."""
+        bucket = TokenBucket(rate=10, capacity=2)
+        with patch('src.security_automation.threat_intelligence.time.sleep') as mock_sleep:
+            bucket.acquire()
+            bucket.acquire()
+            mock_sleep.assert_not_called()
+
+            bucket.acquire()
+            mock_sleep.assert_called_once()
+            assert 0 < mock_sleep.call_args[0][0] <= 0.1
+
+            mock_sleep.reset_mock()
+            bucket.drain(30)
+            bucket.acquire()
+            assert mock_sleep.call_args[0][0] >= 30
+
+    def test_check_file_hash_uses_binary_cache(self, threat_intelligence):
+        """Test VirusTotal hash results are cached under the binary digest."""
+        threat_intelligence.virustotal_api_key = "test-key"
+        file_hash = "ab" * 32
+
+        with patch('requests.get') as mock_get:
+            mock_response = Mock()
+            mock_response.status_code = 200
+            mock_response.json.return_value = {'data': {'attributes': {
+                'last_analysis_stats': {'malicious': 3, 'harmless': 60}
+            }}}
+            mock_get.return_value = mock_response
+
+            first = threat_intelligence.check_file_hash(file_hash.upper())
+            second = threat_intelligence.check_file_hash(file_hash)
+
+            assert mock_get.call_count == 1
+            assert first == second
+            assert second['is_malicious'] is True
+
+        stored = threat_intelligence._conn.execute("SELECT hash FROM file_hash_cache").fetchone()[0]
+        assert stored == bytes.fromhex(file_hash)
+
     def test_add_threat_indicator(self, threat_intelligence):
         """Test adding a threat indicator."""
         result = threat_intelligence.add_threat_indicator(
@@ -611,12 +1044,107 @@ class TestThreatIntelligence:
         assert indicator.value == "malicious.com"
         assert indicator.threat_type == "phishing"
 
+    def test_add_threat_indicator_merges_sources_and_metadata(self, threat_intelligence):
+        """Test re-adding an indicator merges sources and metadata."""
+        threat_intelligence.add_threat_indicator(
+            "ip", "10.0.0.9", "malware", "high", 80, "feed_a", {"first": 1}
+        )
+        threat_intelligence.add_threat_indicator(
+            "ip", "10.0.0.9", "c2", "critical", 95, "feed_b", {"second": 2}
+        )
+        threat_intelligence.add_threat_indicator(
+            "ip", "10.0.0.9", "c2", "critical", 95, "feed_a"
+        )
+
+        indicator = threat_intelligence.get_threat_indicator("ip", "10.0.0.9")
+        assert indicator.sources == ["feed_a", "feed_b"]
+        assert indicator.metadata == {"first": 1, "second": 2}
+        assert indicator.severity == "critical"
+        assert indicator.last_seen_ts >= indicator.first_seen_ts
+        assert indicator.first_seen == datetime.fromtimestamp(indicator.first_seen_ts, tz=timezone.utc)
+
+    def test_local_threat_feed_bloom_filter_fast_path(self, threat_intelligence):
+        """Test unknown values are rejected without a database lookup."""
+        threat_intelligence.add_threat_indicator(
+            "ip", "198.51.100.4", "scanner", "medium", 75, "test"
+        )
+
+        with patch.object(threat_intelligence, 'get_threat_indicator') as mock_get:
+            assert threat_intelligence._check_local_threat_feed("198.51.100.5") is None
+            mock_get.assert_not_called()
+
+        result = threat_intelligence._check_local_threat_feed("198.51.100.4")
+        assert result is not None
+        assert result['is_malicious'] is True
+
+    def test_local_threat_feed_sees_other_instances(self, threat_intelligence, temp_dir):
+        """Test indicators written through another connection are not filtered out."""
+        other = ThreatIntelligence(db_path=str(threat_intelligence.db_path))
+        try:
+            other.add_threat_indicator("domain", "evil.example", "phishing", "high", 90, "feed")
+            other.add_threat_indicator("ip", "203.0.113.7", "c2", "high", 90, "feed")
+        finally:
+            other.close()
+
+        assert threat_intelligence._check_local_threat_feed("evil.example", "domain") is not None
+        assert set(threat_intelligence.check_local_threat_feed_bulk(["203.0.113.7"])) == {"203.0.113.7"}
+
+    def test_ip_index_survives_restart_with_newer_indicators(self, threat_intelligence):
+        """Test IPs stored after the index was built are found after a restart."""
+        db_path = str(threat_intelligence.db_path)
+        threat_intelligence.add_threat_indicator("ip", "192.0.2.10", "malware", "high", 85, "feed")
+        threat_intelligence.build_ip_index()
+        threat_intelligence.add_threat_indicator("ip", "192.0.2.30", "c2", "critical", 95, "feed")
+        threat_intelligence.close()
+
+        restarted = ThreatIntelligence(db_path=db_path)
+        try:
+            assert restarted._check_local_threat_feed("192.0.2.30") is not None
+            assert set(restarted.check_local_threat_feed_bulk(["192.0.2.30", "192.0.2.31"])) == {"192.0.2.30"}
+            # The stale index was rebuilt on load
+            assert restarted._ip_index_may_contain("192.0.2.31") is False
+            assert not restarted._ip_index_pending
+        finally:
+            restarted.close()
+
+    def test_check_local_threat_feed_bulk(self, threat_intelligence):
+        """Test bulk lookup returns only values present in the local feed."""
+        threat_intelligence.add_threat_indicator("ip", "10.2.0.1", "malware", "high", 85, "feed")
+        threat_intelligence.add_threat_indicator("ip", "10.2.0.2", "scanner", "low", 30, "feed")
+
+        values = ["10.2.0.1", "10.2.0.2", "10.2.0.3"] + [f"10.3.{i // 256}.{i % 256}" for i in range(1500)]
+        results = threat_intelligence.check_local_threat_feed_bulk(values, indicator_type="ip")
+
+        assert set(results) == {"10.2.0.1", "10.2.0.2"}
+        assert results["10.2.0.1"]["is_malicious"] is True
+        assert results["10.2.0.2"]["is_malicious"] is False
+        assert results["10.2.0.1"]["sources"] == ["feed"]
+
+    def test_ip_index_rejects_unknown_ips(self, threat_intelligence):
+        """Test the mmapped IPv4 index answers negative lookups."""
+        threat_intelligence.add_threat_indicator("ip", "192.0.2.10", "malware", "high", 85, "feed")
+        threat_intelligence.add_threat_indicator("ip", "192.0.2.20", "malware", "high", 85, "feed")
+        assert threat_intelligence.build_ip_index() == 2
+        assert threat_intelligence.ip_index_path.exists()
+
+        assert threat_intelligence._ip_index_may_contain("192.0.2.10") is True
+        assert threat_intelligence._ip_index_may_contain("192.0.2.11") is False
+        assert threat_intelligence._ip_index_may_contain("2001:db8::1") is True
+
+        # Indicators added after the snapshot must not be missed
+        threat_intelligence.add_threat_indicator("ip", "192.0.2.30", "c2", "critical", 95, "feed")
+        assert threat_intelligence._check_local_threat_feed("192.0.2.30") is not None
+
     def test_import_threat_feed(self, threat_intelligence):
         """Test importing threat feed."""
-        with patch('src.security_automation.threat_intelligence.requests.get') as mock_get:
-            mock_response = Mock()
+        with patch('requests.get') as mock_get:
+            mock_response = MagicMock()
             mock_response.status_code = 200
-            mock_response.text = "192.168.1.1\n192.168.1.2\n# comment\n192.168.1.3\n"
+            mock_response.encoding = 'utf-8'
+            mock_response.iter_lines.return_value = iter(
+                ["192.168.1.1", "192.168.1.2", "# comment", "192.168.1.3", ""]
+            )
+            mock_response.__enter__.return_value = mock_response
             mock_get.return_value = mock_response
 
             count = threat_intelligence.import_threat_feed(
@@ -627,6 +1155,27 @@ class TestThreatIntelligence:
 
             assert count == 3  # Should import 3 IPs, skip comment
 
+    def test_import_threat_feed_skips_duplicates_and_malformed(self, threat_intelligence):
+        """Test feed import drops repeated and malformed IP lines."""
+        with patch('requests.get') as mock_get:
+            mock_response = MagicMock()
+            mock_response.status_code = 200
+            mock_response.encoding = 'utf-8'
+            mock_response.iter_lines.return_value = iter(
+                ["10.1.1.1", "10.1.1.1", "not-an-ip", "10.1.1.2", "999.1.1.1"]
+            )
+            mock_response.__enter__.return_value = mock_response
+            mock_get.return_value = mock_response
+
+            count = threat_intelligence.import_threat_feed(
+                feed_url="https://example.com/feed.txt",
+                feed_name="dup_feed",
+                feed_type="ip"
+            )
+
+            assert count == 2
+            assert threat_intelligence.get_threat_indicator("ip", "not-an-ip") is None
+
     def test_get_statistics(self, threat_intelligence):
         """Test getting threat intelligence statistics."""
         threat_intelligence.add_threat_indicator(
@@ -642,6 +1191,19 @@ class TestThreatIntelligence:
         assert isinstance(stats, dict)
         assert 'indicators_by_type' in stats or len(stats) == 0
 
+    def test_get_statistics_counts(self, threat_intelligence):
+        """Test statistics aggregate indicators by type and severity."""
+        threat_intelligence.add_threat_indicator("ip", "10.0.0.1", "malware", "critical", 95, "test")
+        threat_intelligence.add_threat_indicator("ip", "10.0.0.2", "scanner", "low", 40, "test")
+        threat_intelligence.add_threat_indicator("domain", "bad.example", "phishing", "critical", 90, "test")
+
+        stats = threat_intelligence.get_statistics()
+        assert stats['indicators_by_type'] == {'ip': 2, 'domain': 1}
+        assert stats['indicators_by_severity'] == {'critical': 2, 'low': 1}
+        assert stats['cached_ip_reputations'] == 0
+        assert stats['active_threat_feeds'] == 0
+        assert stats['total_feed_indicators'] == 0
+
 
 # ============================================================================
 # SELF HEALING SYSTEM TESTS
@@ -688,16 +1250,280 @@ class TestSelfHealingSystem:
 
         assert "custom_alert" in self_healing_system.remediation_map
 
+    def test_remediation_map_is_read_only(self, self_healing_system):
+        """Test the map can only change through register_remediation."""
+        with pytest.raises(TypeError):
+            self_healing_system.remediation_map["queue_backlog"] = "drain_queue"
+
+        self_healing_system.register_remediation("queue_backlog", "drain_queue")
+        assert self_healing_system.remediation_map["queue_backlog"] == "drain_queue"
+        assert self_healing_system._patterns[-1] == ("queue_backlog", "drain_queue")
+
     def test_monitor_and_heal(self, self_healing_system):
         """Test monitoring and healing."""
         actions = self_healing_system.monitor_and_heal(check_interval=1)
         assert isinstance(actions, list)
 
+    def test_monitor_and_heal_remediates_concurrently(self, self_healing_system):
+        """Test every SLO is swept and actions come back in SLO order."""
+        from src.sre_automation.slo_manager import Alert
+
+        slo_names = ["disk_usage_high", "healthy_slo", "memory_high"]
+
+        def check_and_alert(slo_name):
+            if slo_name == "healthy_slo":
+                return None
+            return Alert(alert_id=f"{slo_name}_alert", slo_name=slo_name, severity="warning",
+                         message="threshold exceeded", budget_consumed=50.0,
+                         burn_rate=1.5, triggered_at=datetime.now())
+
+        manager = self_healing_system.slo_manager
+        with patch.object(manager, 'slos', dict.fromkeys(slo_names)), \
+                patch.object(manager, 'check_and_alert_bulk',
+                             side_effect=lambda names: {n: check_and_alert(n) for n in names}):
+            actions = self_healing_system.monitor_and_heal()
+
+        assert [a.alert_id for a in actions] == ["disk_usage_high_alert", "memory_high_alert"]
+        assert set(self_healing_system._last_action_ts) == {"disk_usage_high", "memory_high"}
+
+    def test_monitor_and_heal_adapts_interval(self, self_healing_system):
+        """Test the polling interval drops after remediation and backs off when quiet."""
+        system = self_healing_system
+
+        firing = {"svc": MagicMock()}
+        with patch.object(system, '_maybe_remediate', return_value=None), \
+                patch.object(system.slo_manager, 'check_and_alert_bulk', return_value=firing):
+            system.monitor_and_heal(check_interval=60)
+            assert system.next_check_interval == 60
+            system.monitor_and_heal(check_interval=60)
+            assert system.next_check_interval == 90
+
+        with patch.object(system, '_maybe_remediate', return_value=MagicMock()), \
+                patch.object(system.slo_manager, 'check_and_alert_bulk', return_value=firing):
+            system.monitor_and_heal(check_interval=60)
+            assert system.next_check_interval == 15
+
+        system.next_check_interval = 500
+        with patch.object(system.slo_manager, 'slos', {}):
+            system.monitor_and_heal(check_interval=60)
+        assert system.next_check_interval == 600
+
+    def test_remediation_cooldown(self, self_healing_system):
+        """Test an SLO is not remediated again within the cooldown."""
+        from src.sre_automation.slo_manager import Alert
+        alert = Alert(
+            alert_id="disk_alert",
+            slo_name="disk_usage_high",
+            severity="warning",
+            message="Disk usage high",
+            budget_consumed=50.0,
+            burn_rate=1.5,
+            triggered_at=datetime.now()
+        )
+
+        assert self_healing_system._should_auto_remediate(alert) is True
+        self_healing_system.auto_remediate(alert)
+        assert self_healing_system._should_auto_remediate(alert) is False
+
+        self_healing_system._last_action_ts["disk_usage_high"] -= 301
+        assert self_healing_system._should_auto_remediate(alert) is True
+
+    def test_remediation_cooldown_ignores_wall_clock_jumps(self, self_healing_system):
+        """Test the cooldown runs on the monotonic clock, not wall-clock time."""
+        from src.sre_automation.slo_manager import Alert
+        alert = Alert(alert_id="disk_alert", slo_name="disk_usage_high", severity="warning",
+                      message="Disk usage high", budget_consumed=50.0, burn_rate=1.5,
+                      triggered_at=datetime.now())
+
+        self_healing_system.auto_remediate(alert)
+        with patch('time.time', return_value=time.time() + 3600):
+            assert self_healing_system._should_auto_remediate(alert) is False
+
+    def test_extract_context_from_alert(self, self_healing_system):
+        """Test alert messages are parsed into runbook context."""
+        from src.sre_automation.slo_manager import Alert
+        alert = Alert(
+            alert_id="cert_alert",
+            slo_name="certificate_expiring",
+            severity="warning",
+            message="TLS certificate for example.com on container web-1, expiring",
+            budget_consumed=10.0,
+            burn_rate=1.0,
+            triggered_at=datetime.now()
+        )
+
+        context = self_healing_system._extract_context_from_alert(alert)
+
+        assert context['domain'] == 'example.com'
+        assert context['container_name'] == 'web-1'
+        assert context['alert_id'] == 'cert_alert'
+
+    @pytest.mark.parametrize("use_automaton", [True, False])
+    def test_find_runbook_by_pattern(self, self_healing_system, use_automaton):
+        """Test pattern lookup keeps registration priority with and without the automaton."""
+        from src.sre_automation import self_healing
+        from src.sre_automation.slo_manager import Alert
+
+        if use_automaton and not self_healing.HAS_AHOCORASICK:
+            pytest.skip("pyahocorasick not installed")
+
+        self_healing_system.register_remediation("queue_backlog", "drain_queue")
+
+        def alert(message, slo_name="checkout"):
+            return Alert(alert_id="a1", slo_name=slo_name, severity="warning", message=message,
+                         budget_consumed=1.0, burn_rate=1.0, triggered_at=datetime.now())
+
+        with patch.object(self_healing, 'HAS_AHOCORASICK', use_automaton):
+            find = self_healing_system._find_runbook_for_alert
+            assert find(alert("Queue_Backlog growing; memory_high too")) == 'high_memory_remediation'
+            assert find(alert("all good", slo_name="orders_queue_backlog")) == 'drain_queue'
+            assert find(alert("nothing relevant")) is None
+
+    def test_alert_message_lowered_once(self, self_healing_system):
+        """Test context extraction and runbook matching share one lowering of the message."""
+        from src.sre_automation import self_healing
+        from src.sre_automation.slo_manager import Alert
+
+        alert = Alert(alert_id="a1", slo_name="Checkout", severity="warning",
+                      message="Container WEB-7 MEMORY_HIGH", budget_consumed=1.0,
+                      burn_rate=1.0, triggered_at=datetime.now())
+
+        misses = self_healing._lowered.cache_info().misses
+        context = self_healing_system._extract_context_from_alert(alert)
+        runbook = self_healing_system._find_runbook_for_alert(alert)
+
+        assert context['container_name'] == 'web-7'
+        assert runbook == 'high_memory_remediation'
+        assert self_healing._lowered.cache_info().misses - misses == 2  # message, SLO name
+
+    def test_find_runbook_cache_invalidated_on_register(self, self_healing_system):
+        """Test repeated lookups hit the cache until the remediation map changes."""
+        from src.sre_automation.slo_manager import Alert
+
+        alert = Alert(alert_id="a1", slo_name="checkout", severity="warning",
+                      message="queue_backlog growing", budget_consumed=1.0,
+                      burn_rate=1.0, triggered_at=datetime.now())
+
+        assert self_healing_system._find_runbook_for_alert(alert) is None
+        assert self_healing_system._find_runbook_for_alert(alert) is None
+        assert self_healing_system._match_patterns.cache_info().hits == 1
+
+        self_healing_system.register_remediation("queue_backlog", "drain_queue")
+        assert self_healing_system._find_runbook_for_alert(alert) == 'drain_queue'
+
     def test_get_success_rate(self, self_healing_system):
         """Test calculating success rate."""
         success_rate = self_healing_system.get_success_rate()
         assert 0.0 <= success_rate <= 100.0
 
+    @pytest.mark.parametrize("use_orjson", [True, False])
+    def test_export_self_healing_report(self, self_healing_system, temp_dir, use_orjson):
+        """Test the streamed report is valid JSON with summary and recent actions."""
+        from src.sre_automation import self_healing
+        from src.sre_automation.slo_manager import Alert
+
+        if use_orjson and not self_healing.HAS_ORJSON:
+            pytest.skip("orjson not installed")
+
+        for i in range(2):
+            self_healing_system.auto_remediate(Alert(
+                alert_id=f"disk_{i}", slo_name="disk_usage_high", severity="warning",
+                message="Disk usage high", budget_consumed=50.0, burn_rate=1.5,
+                triggered_at=datetime.now()))
+
+        output_path = f"{temp_dir}/self_healing.json"
+        with patch.object(self_healing, 'HAS_ORJSON', use_orjson):
+            assert self_healing_system.export_report(output_path) is True
+
+        with open(output_path) as f:
+            report = json.load(f)
+        assert report['total_actions'] == 2
+        assert [a['alert_id'] for a in report['actions']] == ["disk_0", "disk_1"]
+
+    def test_remediation_action_is_frozen_and_slotted(self):
+        """Test remediation actions are immutable and carry no per-instance dict."""
+        import dataclasses
+        from src.sre_automation.self_healing import RemediationAction
+
+        action = RemediationAction(
+            action_id="a1", alert_id="alert1", runbook_name="disk_cleanup",
+            triggered_at=datetime.now(), completed_at=None, success=True,
+            result=None, human_intervention_required=False)
+
+        assert not hasattr(action, '__dict__')
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            action.success = False
+
+    def test_success_rate_counts_beyond_history_bound(self, self_healing_system):
+        """Test outcome counters cover actions evicted from the bounded history."""
+        from collections import deque
+        from src.sre_automation.slo_manager import Alert
+
+        system = self_healing_system
+        system.action_history = deque(maxlen=2)
+        outcomes = [True, False, True, True]
+        results = [MagicMock(success=ok, execution_time=0.1, error_message=None) for ok in outcomes]
+
+        with patch.object(system.runbook_executor, 'execute', side_effect=results):
+            for i in range(len(outcomes)):
+                system.auto_remediate(Alert(
+                    alert_id=f"disk_{i}", slo_name="disk_usage_high", severity="warning",
+                    message="Disk usage high", budget_consumed=50.0, burn_rate=1.5,
+                    triggered_at=datetime.now()))
+
+        assert len(system.action_history) == 2
+        assert [a.alert_id for a in system.get_action_history(5)] == ["disk_2", "disk_3"]
+        assert system.get_success_rate() == 75.0
+
+    @pytest.mark.parametrize("severity,succeeded,expected", [
+        ("warning", True, ["auto_remediation"]),
+        ("warning", False, ["auto_remediation", "escalate_to_oncall", "create_ticket"]),
+        ("critical", False, ["auto_remediation", "escalate_to_oncall", "page_oncall"]),
+        ("page", True, ["page_oncall"]),
+        ("info", True, []),
+    ])
+    def test_route_alert_by_severity(self, self_healing_system, severity, succeeded, expected):
+        """Test the router runs each severity's handlers in order."""
+        from src.sre_automation.self_healing import AlertRouter
+        from src.sre_automation.slo_manager import Alert
+
+        router = AlertRouter(self_healing_system)
+        alert = Alert(alert_id="disk_alert", slo_name="disk_usage_high", severity=severity,
+                      message="Disk usage high", budget_consumed=50.0, burn_rate=1.5,
+                      triggered_at=datetime.now())
+        result = MagicMock(success=succeeded, execution_time=0.1, error_message="boom")
+
+        with patch.object(self_healing_system.runbook_executor, 'execute', return_value=result):
+            routing = router.route_alert(alert)
+
+        assert [a['type'] for a in routing['actions']] == expected
+
+    def test_route_alerts_batch(self, self_healing_system):
+        """Test batch routing keeps input order and cooldown between duplicates."""
+        from src.sre_automation.self_healing import AlertRouter
+        from src.sre_automation.slo_manager import Alert
+
+        def alert(alert_id, slo_name, severity):
+            return Alert(alert_id=alert_id, slo_name=slo_name, severity=severity,
+                         message="threshold exceeded", budget_consumed=50.0,
+                         burn_rate=1.5, triggered_at=datetime.now())
+
+        alerts = [alert("d1", "disk_usage_high", "warning"),
+                  alert("m1", "memory_high", "critical"),
+                  alert("d2", "disk_usage_high", "warning"),
+                  alert("d3", "disk_usage_high", "critical")]
+        result = MagicMock(success=True, execution_time=0.1, error_message=None)
+
+        with patch.object(self_healing_system.runbook_executor, 'execute',
+                          return_value=result) as mock_execute:
+            routings = AlertRouter(self_healing_system).route_alerts(alerts)
+
+        assert [r['alert_id'] for r in routings] == ["d1", "m1", "d2", "d3"]
+        assert [[a['type'] for a in r['actions']] for r in routings] == [
+            ["auto_remediation"], ["auto_remediation"], ["create_ticket"], ["page_oncall"]]
+        # One remediation per SLO, even across severities
+        assert mock_execute.call_count == 2
+
 
 # ============================================================================
 # PROMETHEUS METRICS TESTS